@@ -0,0 +1,95 @@
+"""
+Script para evaluar el modelo de probabilidad de cierre con un backtest
+
+Entrena con los proyectos decididos hasta una fecha de corte y puntúa, con
+su antigüedad a esa fecha, los que estaban abiertos entonces y se decidieron
+después. Compara la log-loss con y sin la antigüedad como variable: si la
+antigüedad filtrara la etiqueta, mejoraría el entrenamiento pero no este
+backtest.
+
+Uso:
+    python evaluar_probabilidad_cierre.py [proyectos.csv] [--corte AAAA-MM-DD]
+
+Sin archivo, lee la tabla proyectos de Supabase (.streamlit/secrets.toml).
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.derived_columns import preparar_proyectos
+from utils.win_probability import WinProbabilityModel, fecha_decision
+
+
+def cargar_proyectos(archivo=None):
+    """Lee los proyectos de un CSV exportado o de Supabase"""
+    if archivo:
+        return pd.read_csv(archivo)
+    from utils.supabase_client import get_supabase_client
+    respuesta = get_supabase_client().select("proyectos").execute()
+    return pd.DataFrame(respuesta.data) if respuesta.data else pd.DataFrame()
+
+
+def log_loss(y, p):
+    """Log-loss media de probabilidades p para etiquetas y (0/1)"""
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def backtest(proyectos_data, fecha_corte):
+    """
+    Log-loss de las cotizaciones abiertas a la fecha de corte
+
+    Args:
+        proyectos_data: DataFrame de proyectos
+        fecha_corte: Fecha del backtest
+
+    Returns:
+        dict: Número de cotizaciones evaluadas y log-loss por variante
+    """
+    fecha_corte = pd.Timestamp(fecha_corte).normalize()
+    proyectos = preparar_proyectos(proyectos_data)
+    decision = fecha_decision(proyectos)
+    inicio = pd.to_datetime(proyectos['fecha_cotizacion'], errors='coerce')
+    evaluados = proyectos[(inicio <= fecha_corte) & (decision > fecha_corte)]
+    y = evaluados['es_venta'].to_numpy(dtype=float)
+
+    # A la fecha de corte seguían abiertos: sin status final ni fechas de decisión
+    abiertos = evaluados.drop(columns=[c for c in ('fecha_facturacion', 'updated_at', 'motivo_perdida')
+                                       if c in evaluados.columns])
+    abiertos = preparar_proyectos(abiertos.assign(status='EN PROCESO'))
+
+    resultado = {'evaluados': len(evaluados)}
+    if len(evaluados) == 0:
+        return resultado
+    for nombre, con_antiguedad in (('sin_antiguedad', False), ('con_antiguedad', True)):
+        modelo = WinProbabilityModel(antiguedad=con_antiguedad).entrenar(proyectos, fecha_corte)
+        resultado[nombre] = log_loss(y, modelo.puntuar(abiertos, fecha_corte).to_numpy())
+        resultado[f'{nombre}_usada'] = modelo.antiguedad
+    resultado['tasa_global'] = log_loss(y, np.full(len(y), modelo.tasa_global))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('archivo', nargs='?', help='CSV con la tabla proyectos')
+    parser.add_argument('--corte', default=(datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'),
+                        help='Fecha del backtest (por defecto, hace 90 días)')
+    args = parser.parse_args()
+
+    resultado = backtest(cargar_proyectos(args.archivo), args.corte)
+    print(f"Backtest al {args.corte}: {resultado['evaluados']} cotización(es) abiertas y decididas después")
+    print("=" * 60)
+    if resultado['evaluados'] == 0:
+        print("No hay cotizaciones para evaluar en esa fecha.")
+        return
+    print(f"Log-loss tasa global:      {resultado['tasa_global']:.4f}")
+    print(f"Log-loss sin antigüedad:   {resultado['sin_antiguedad']:.4f}")
+    print(f"Log-loss con antigüedad:   {resultado['con_antiguedad']:.4f}")
+    if not resultado['con_antiguedad_usada']:
+        print("⚠ Los perdidos no tienen fecha de decisión (updated_at): la antigüedad no se usó.")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from utils.dashboard_config import setup_page_config, apply_custom_styles
 from utils.data_loader import inicializar_conexion
 from utils.dashboard_filters import DashboardFilters
 from utils.dashboard_metrics import MetricsCalculator
+from utils.period_comparison import PeriodAggregates
+from utils.sales_forecast import resumen_pronostico
 from utils import dashboard_charts as charts
 
 
@@ -18,15 +20,97 @@ apply_custom_styles()
 
 st.title(":material/dashboard: Dashboard Ejecutivo")
 
+# ========== CÁLCULOS CACHEADOS ==========
+# Se cachean por versión de datos + filtros: una re-ejecución que no cambia
+# ninguno de los dos (p. ej. volver a la página) reutiliza el resultado.
+@st.cache_data(show_spinner=False, max_entries=16)
+def datos_filtrados(version, seleccion, _data_loader, _filtros):
+    """Aplica los filtros de fecha/asesor a citas, prospección y proyectos"""
+    return _filtros.aplicar_filtros(
+        _data_loader.citas_data, _data_loader.prospeccion_data, _data_loader.proyectos_data,
+        *seleccion
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def metricas_dashboard(version, seleccion, _data_loader, _filtros):
+    """Calcula las métricas de ventas y de actividad del dashboard"""
+    fecha_inicio, fecha_fin, asesor_seleccionado = seleccion
+    citas_filtradas, prospeccion_filtrada, proyectos_filtrados = datos_filtrados(
+        version, seleccion, _data_loader, _filtros
+    )
+    calculator = MetricsCalculator(
+        _data_loader.citas_data, _data_loader.prospeccion_data,
+        _data_loader.proyectos_data, _data_loader.metas_data
+    )
+    metricas_ventas = calculator.metricas_ventas_cotizaciones(
+        proyectos_filtrados, asesor_seleccionado, _data_loader.obtener_lista_asesores(),
+        fecha_inicio, fecha_fin
+    )
+    metricas = calculator.metricas_principales(
+        citas_filtradas, prospeccion_filtrada, proyectos_filtrados
+    )
+    return metricas_ventas, metricas
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def figura_citas_por_mes(version, seleccion, _data_loader, _filtros):
+    """Gráfico de evolución de citas por mes"""
+    citas_filtradas, _, _ = datos_filtrados(version, seleccion, _data_loader, _filtros)
+    return charts.figura_citas_por_mes(citas_filtradas)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def figura_proyectos_estado(version, seleccion, _data_loader, _filtros):
+    """Gráfico de distribución de proyectos por estado"""
+    _, _, proyectos_filtrados = datos_filtrados(version, seleccion, _data_loader, _filtros)
+    return charts.figura_proyectos_estado(proyectos_filtrados)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def agregados_periodo(version, _data_loader):
+    """Agregado por asesor y día compartido por todos los comparativos de una versión"""
+    return PeriodAggregates(
+        _data_loader.citas_data, _data_loader.prospeccion_data,
+        _data_loader.proyectos_data, _data_loader.metas_data
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def comparativo_periodos(version, seleccion, _data_loader):
+    """KPIs del periodo contra el periodo anterior y el año anterior"""
+    calculator = MetricsCalculator(
+        _data_loader.citas_data, _data_loader.prospeccion_data,
+        _data_loader.proyectos_data, _data_loader.metas_data,
+        agregados_periodo=agregados_periodo(version, _data_loader)
+    )
+    return calculator.comparativo_periodos(*seleccion)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def pronostico_ventas(version, _data_loader):
+    """Proyección de cierre de mes y trimestre de todos los asesores"""
+    calculator = MetricsCalculator(
+        _data_loader.citas_data, _data_loader.prospeccion_data,
+        _data_loader.proyectos_data, _data_loader.metas_data
+    )
+    return calculator.pronostico_ventas(_data_loader.obtener_lista_asesores())
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def ranking_asesores(version, fecha_inicio, fecha_fin, _data_loader):
+    """Ranking de todos los asesores (no depende del filtro de asesor)"""
+    calculator = MetricsCalculator(
+        _data_loader.citas_data, _data_loader.prospeccion_data,
+        _data_loader.proyectos_data, _data_loader.metas_data
+    )
+    return calculator.metricas_por_asesor(_data_loader.obtener_lista_asesores(), fecha_inicio, fecha_fin)
+
+
 # Conexión a Supabase y carga de datos
 try:
     data_loader = inicializar_conexion()
     
-    citas_data = data_loader.citas_data
-    prospeccion_data = data_loader.prospeccion_data
-    proyectos_data = data_loader.proyectos_data
-    metas_data = data_loader.metas_data
-    
     # Obtener lista de asesores
     todos_asesores = data_loader.obtener_lista_asesores()
     asesores_opciones = ["Todos"] + todos_asesores
@@ -34,152 +118,181 @@ try:
     # ========== FILTROS ==========
     filtros = DashboardFilters()
     fecha_inicio, fecha_fin, asesor_seleccionado = filtros.mostrar_filtros(asesores_opciones)
-    
-    # Aplicar filtros a los datos
-    citas_filtradas, prospeccion_filtrada, proyectos_filtrados = filtros.aplicar_filtros(
-        citas_data, prospeccion_data, proyectos_data,
-        fecha_inicio, fecha_fin, asesor_seleccionado
-    )
+    seleccion = (fecha_inicio, fecha_fin, asesor_seleccionado)
     
     st.markdown("---")
     
-    # ========== MÉTRICAS CRÍTICAS ==========
-    calculator = MetricsCalculator(citas_data, prospeccion_data, proyectos_data, metas_data)
-    
-    st.markdown("#### :material/trending_up: Métricas Críticas del Mes")
-    
-    # Ventas actuales vs Meta
-    metricas_ventas = calculator.metricas_ventas_cotizaciones(
-        proyectos_filtrados, asesor_seleccionado, todos_asesores, fecha_inicio, fecha_fin
-    )
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            label=":material/flag: Meta de Ventas",
-            value=f"${metricas_ventas['meta_total']:,.2f}"
-        )
-    
-    with col2:
-        st.metric(
-            label=":material/attach_money: Ventas Actuales",
-            value=f"${metricas_ventas['ventas_totales']:,.2f}",
-            delta=metricas_ventas['delta_ventas'],
-            delta_color=metricas_ventas['color_ventas']
-        )
+    # Cada sección es un fragmento que declara sus entradas como argumentos
+    # (versión de datos y filtros). Un widget dentro de una sección solo
+    # re-ejecuta esa sección; el resto de la página queda intacta.
     
-    with col3:
-        metricas = calculator.metricas_principales(
-            citas_filtradas, prospeccion_filtrada, proyectos_filtrados
-        )
-        st.metric(
-            label=":material/account_balance_wallet: Total Cartera",
-            value=f"${metricas['total_cartera']:,.2f}"
-        )
-    
-    st.markdown("---")
-    
-    # ========== INDICADORES DE ACTIVIDAD ==========
-    st.markdown("#### :material/insights: Actividad General")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            label=":material/event: Citas",
-            value=metricas['total_citas']
-        )
+    # ========== MÉTRICAS CRÍTICAS ==========
+    @st.fragment
+    def seccion_metricas(version, seleccion):
+        metricas_ventas, metricas = metricas_dashboard(version, seleccion, data_loader, filtros)
+        pronostico = resumen_pronostico(pronostico_ventas(version, data_loader), seleccion[2])
+        
+        st.markdown("#### :material/trending_up: Métricas Críticas del Mes")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                label=":material/flag: Meta de Ventas",
+                value=f"${metricas_ventas['meta_total']:,.2f}"
+            )
+        
+        with col2:
+            st.metric(
+                label=":material/attach_money: Ventas Actuales",
+                value=f"${metricas_ventas['ventas_totales']:,.2f}",
+                delta=metricas_ventas['delta_ventas'],
+                delta_color=metricas_ventas['color_ventas']
+            )
+        
+        with col3:
+            charts.mostrar_proyeccion(pronostico, 'mes', ":material/query_stats: Proyección Cierre de Mes")
+        
+        with col4:
+            st.metric(
+                label=":material/account_balance_wallet: Total Cartera",
+                value=f"${metricas['total_cartera']:,.2f}"
+            )
+        
+        st.markdown("---")
+        
+        # ========== INDICADORES DE ACTIVIDAD ==========
+        st.markdown("#### :material/insights: Actividad General")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                label=":material/event: Citas",
+                value=metricas['total_citas']
+            )
 
-    with col2:
-        st.metric(
-            label=":material/group: Prospectos",
-            value=metricas['total_prospectos']
-        )
+        with col2:
+            st.metric(
+                label=":material/group: Prospectos",
+                value=metricas['total_prospectos']
+            )
 
-    with col3:
-        st.metric(
-            label=":material/folder: Proyectos/Cotizaciones",
-            value=metricas['total_proyectos']
-        )
+        with col3:
+            st.metric(
+                label=":material/folder: Proyectos/Cotizaciones",
+                value=metricas['total_proyectos']
+            )
 
-    with col4:
-        st.metric(
-            label=":material/receipt: Ticket Promedio",
-            value=f"${metricas['ticket_promedio']:,.2f}"
-        )
-    
-    st.markdown("---")
+        with col4:
+            st.metric(
+                label=":material/receipt: Ticket Promedio",
+                value=f"${metricas['ticket_promedio']:,.2f}"
+            )
     
-    # ========== EVOLUCIÓN DE CITAS ==========
-    st.markdown("#### :material/show_chart: Evolución de Citas por Mes")
+    # ========== TENDENCIA ==========
+    @st.fragment
+    def seccion_tendencia(version, seleccion):
+        st.markdown("#### :material/compare_arrows: Tendencia vs Periodos Anteriores")
+        charts.mostrar_comparativo_periodos(comparativo_periodos(version, seleccion, data_loader))
     
-    # Gráfico de área de citas por mes
-    charts.mostrar_grafico_citas_por_mes(citas_filtradas)
+    # ========== RANKING DE ASESORES ==========
+    # Compara a todo el equipo en una sola pasada; solo depende de las fechas
+    @st.fragment
+    def seccion_ranking(version, fecha_inicio, fecha_fin):
+        st.markdown("#### :material/leaderboard: Ranking de Asesores")
+        charts.mostrar_ranking_asesores(ranking_asesores(version, fecha_inicio, fecha_fin, data_loader))
     
-    st.markdown("---")
+    # ========== EVOLUCIÓN DE CITAS ==========
+    @st.fragment
+    def seccion_evolucion_citas(version, seleccion):
+        st.markdown("#### :material/show_chart: Evolución de Citas por Mes")
+        
+        # Gráfico de área de citas por mes
+        charts.mostrar_grafico_citas_por_mes(
+            None, figura=figura_citas_por_mes(version, seleccion, data_loader, filtros)
+        )
     
     # ========== ESTADO DEL PIPELINE ==========
-    st.markdown("#### :material/donut_small: Estado del Pipeline")
-    
-    # Gráfico de distribución de proyectos por estado
-    charts.mostrar_grafico_proyectos_estado(proyectos_filtrados)
-    
-    st.markdown("---")
+    @st.fragment
+    def seccion_pipeline(version, seleccion):
+        st.markdown("#### :material/donut_small: Estado del Pipeline")
+        
+        # Gráfico de distribución de proyectos por estado
+        charts.mostrar_grafico_proyectos_estado(
+            None, figura=figura_proyectos_estado(version, seleccion, data_loader, filtros)
+        )
     
     # ========== PROYECTOS CRÍTICOS ==========
-    st.markdown("#### :material/priority_high: Últimos Proyectos/Cotizaciones")
+    # Depende además del número de filas: cambiarlo solo re-ejecuta esta sección
+    @st.fragment
+    def seccion_ultimos_proyectos(version, seleccion):
+        _, _, proyectos_filtrados = datos_filtrados(version, seleccion, data_loader, filtros)
+        
+        st.markdown("#### :material/priority_high: Últimos Proyectos/Cotizaciones")
     
-    if len(proyectos_filtrados) > 0:
-        # Seleccionar columnas importantes
-        columnas_mostrar = []
-        for col in ['fecha_cotizacion', 'asesor', 'proyecto/cotización', 'cliente', 'total', 'status', 'motivo_perdida']:
-            if col in proyectos_filtrados.columns:
-                columnas_mostrar.append(col)
-        df = proyectos_filtrados[columnas_mostrar]
-        col_num_proyectos = st.columns([1,2,2])
-
-        with col_num_proyectos[0]:
-            proyectos_mostrar = st.number_input("Proyectos a mostrar", min_value=1, step=1, value=10)
-
-        if columnas_mostrar:
-            st.dataframe(
-                df.head(proyectos_mostrar), 
-                width='stretch',
-                hide_index=True,
+        if len(proyectos_filtrados) > 0:
+            # Seleccionar columnas importantes
+            columnas_mostrar = []
+            for col in ['fecha_cotizacion', 'asesor', 'proyecto/cotización', 'cliente', 'total', 'status', 'motivo_perdida']:
+                if col in proyectos_filtrados.columns:
+                    columnas_mostrar.append(col)
+            df = proyectos_filtrados[columnas_mostrar]
+            col_num_proyectos = st.columns([1,2,2])
+
+            with col_num_proyectos[0]:
+                proyectos_mostrar = st.number_input("Proyectos a mostrar", min_value=1, step=1, value=10)
+
+            if columnas_mostrar:
+                st.dataframe(
+                    df.head(proyectos_mostrar), 
+                    width='stretch',
+                    hide_index=True,
+                    column_config={
+                        "fecha_cotizacion": st.column_config.DateColumn("Fecha de cotización", format="DD/MM/YYYY"),
+                        "asesor": "Asesor",
+                        "proyecto/cotización": "Proyecto/Cotización",
+                        "cliente": "Cliente",
+                        "total": st.column_config.NumberColumn("Total", format="$ %.2f"),
+                        "status": "Status",
+                        "motivo_perdida": "Motivo de Pérdida"
+                    }
+                )
+            else:
+                st.dataframe(proyectos_filtrados.head(proyectos_mostrar), width='stretch', hide_index=True,
                 column_config={
-                    "fecha_cotizacion": st.column_config.DateColumn("Fecha de cotización", format="DD/MM/YYYY"),
+                    "fecha": st.column_config.DateColumn("Fecha", format="DD/MM/YYYY"),
                     "asesor": "Asesor",
                     "proyecto/cotización": "Proyecto/Cotización",
                     "cliente": "Cliente",
                     "total": st.column_config.NumberColumn("Total", format="$ %.2f"),
                     "status": "Status",
-                    "motivo_perdida": "Motivo de Pérdida"
-                }
-            )
+                    'motivo_perdida': 'Motivo de Pérdida'
+                })
         else:
-            st.dataframe(proyectos_filtrados.head(proyectos_mostrar), width='stretch', hide_index=True,
-            column_config={
-                "fecha": st.column_config.DateColumn("Fecha", format="DD/MM/YYYY"),
-                "asesor": "Asesor",
-                "proyecto/cotización": "Proyecto/Cotización",
-                "cliente": "Cliente",
-                "total": st.column_config.NumberColumn("Total", format="$ %.2f"),
-                "status": "Status",
-                'motivo_perdida': 'Motivo de Pérdida'
-            })
-    else:
-        st.markdown("""
-        <div style="text-align:center;padding:40px 24px;border:2px dashed #cbd5e1;
-                    border-radius:14px;background:#f8fafc;margin:16px 0;">
-            <div style="font-size:2.8rem;margin-bottom:10px;line-height:1;">📊</div>
-            <div style="font-size:1rem;font-weight:600;color:#334155;margin-bottom:6px;">
-                No hay proyectos para mostrar
-            </div>
-            <div style="font-size:.85rem;color:#94a3b8;">
-                Ajusta los filtros de fecha o asesor para ver resultados.
-            </div>
-        </div>""", unsafe_allow_html=True)
+            st.markdown("""
+            <div style="text-align:center;padding:40px 24px;border:2px dashed #cbd5e1;
+                        border-radius:14px;background:#f8fafc;margin:16px 0;">
+                <div style="font-size:2.8rem;margin-bottom:10px;line-height:1;">📊</div>
+                <div style="font-size:1rem;font-weight:600;color:#334155;margin-bottom:6px;">
+                    No hay proyectos para mostrar
+                </div>
+                <div style="font-size:.85rem;color:#94a3b8;">
+                    Ajusta los filtros de fecha o asesor para ver resultados.
+                </div>
+            </div>""", unsafe_allow_html=True)
+    
+    seccion_metricas(data_loader.version, seleccion)
+    st.markdown("---")
+    seccion_tendencia(data_loader.version, seleccion)
+    st.markdown("---")
+    seccion_ranking(data_loader.version, fecha_inicio, fecha_fin)
+    st.markdown("---")
+    seccion_evolucion_citas(data_loader.version, seleccion)
+    st.markdown("---")
+    seccion_pipeline(data_loader.version, seleccion)
+    st.markdown("---")
+    seccion_ultimos_proyectos(data_loader.version, seleccion)
 
 except Exception as e:
     st.error(f"Error al cargar datos: {str(e)}")
@@ -1,12 +1,9 @@
 import streamlit as st
-from styles.tablejs import estilo_tabla_js
-from styles.table_helpers import avatar_html, ASESOR_CORTO, dataframe_to_excel
-from utils.supabase_client import get_supabase_client
-import pandas as pd
-from datetime import datetime, date
-import random
-import time
+from datetime import date
 
+from styles.table_helpers import ASESOR_CORTO
+from styles.table_render import celda_avatar, celda_badge
+from utils.crud import Campo, TablaCRUD
 from utils.opciones import ASESORES
 
 st.set_page_config(page_title="Prospección", page_icon="🎯", layout="wide")
@@ -47,317 +44,36 @@ st.markdown("""
 
 st.title(":material/emoji_events: Gestión de Prospección")
 
-client = get_supabase_client()
-
-# ── SESSION STATE ─────────────────────────────────────
-if 'search_query_prospeccion' not in st.session_state:
-    st.session_state.search_query_prospeccion = ""
-if 'show_edit_dialog_prospeccion' not in st.session_state:
-    st.session_state.show_edit_dialog_prospeccion = False
-if 'edit_index_prospeccion' not in st.session_state:
-    st.session_state.edit_index_prospeccion = None
-
-# ── DATA ──────────────────────────────────────────────
-@st.cache_data(ttl=5)
-def load_data():
-    try:
-        response = client.select("prospeccion").execute()
-        if response.data:
-            data = pd.DataFrame(response.data)
-            data = data.rename(columns={
-                'prospecto_id': 'ID DE PROSPECTO',
-                'asesor':       'ASESOR',
-                'fecha':        'FECHA',
-                'prospecto':    'PROSPECTO',
-                'tipo':         'TIPO',
-                'accion':       'ACCIÓN',
-            })
-            return data
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error al cargar datos: {str(e)}")
-        return pd.DataFrame()
-
-def save_data(row_data, row_id=None):
-    try:
-        if row_id:
-            client.update("prospeccion", row_data, {"id": row_id})
-        else:
-            client.insert("prospeccion", row_data)
-        st.cache_data.clear()
-        return True
-    except Exception as e:
-        st.error(f"Error al guardar datos: {str(e)}")
-        return False
-
-def delete_data(row_id):
-    try:
-        client.delete("prospeccion", {"id": row_id})
-        st.cache_data.clear()
-        return True
-    except Exception as e:
-        st.error(f"Error al eliminar datos: {str(e)}")
-        return False
-
-def generar_id():
-    numero = random.randint(1000000000000, 9999999999999)
-    return f"ID-{numero}"
-
-# ── DIALOGS ───────────────────────────────────────────
-@st.dialog(":material/warning: Confirmar Eliminación")
-def confirm_delete(idx):
-    data = load_data()
-    if idx not in data.index:
-        st.error("Registro no encontrado")
-        return
-
-    row = data.loc[idx]
-    st.warning("¿Estás seguro de que deseas eliminar este prospecto?")
-    st.info(f"**Prospecto:** {row.get('PROSPECTO', '')}\n\n**Asesor:** {row.get('ASESOR', '')}\n\n**Fecha:** {row.get('FECHA', '')}")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button(":material/delete: Sí, Eliminar", use_container_width=True, type="primary"):
-            row_id = row.get('id', '')
-            if row_id and delete_data(row_id):
-                st.success(":material/check_circle: Registro eliminado exitosamente")
-                time.sleep(1)
-                st.rerun()
-    with col2:
-        if st.button(":material/cancel: Cancelar", use_container_width=True):
-            st.rerun()
-
-@st.dialog(":material/edit: Editar Prospecto")
-def edit_dialog(idx):
-    data = load_data()
-    if idx not in data.index:
-        st.error("Registro no encontrado")
-        return
-
-    row = data.loc[idx]
-    st.info(f"**ID:** {row.get('ID DE PROSPECTO', '')}")
-
-    with st.form("form_editar_prospecto"):
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            asesor_edit = st.selectbox(
-                "Asesor *", ASESORES,
-                index=ASESORES.index(row.get('ASESOR', '').upper()) if row.get('ASESOR', '').upper() in ASESORES else 0
-            ).upper()
-            try:
-                fecha_edit = st.date_input("Fecha *", value=pd.to_datetime(row.get('FECHA', date.today())))
-            except:
-                fecha_edit = st.date_input("Fecha *", value=date.today())
-
-        with col2:
-            prospecto_edit = st.text_input("Prospecto *", value=row.get('PROSPECTO', '')).upper()
-            tipo_options = ["VENTA", "RENTA"]
-            tipo_edit = st.selectbox(
-                "Tipo", tipo_options,
-                index=tipo_options.index(row.get('TIPO', 'VENTA')) if row.get('TIPO', 'VENTA') in tipo_options else 0
-            )
-
-        with col3:
-            accion_edit = st.text_area("Acción *", value=row.get('ACCIÓN', '')).upper()
-
-        col_btn1, col_btn2 = st.columns(2)
-        with col_btn1:
-            guardar = st.form_submit_button(":material/save: Guardar Cambios", use_container_width=True)
-        with col_btn2:
-            cancelar = st.form_submit_button(":material/cancel: Cancelar", use_container_width=True)
-
-        if guardar:
-            if asesor_edit and prospecto_edit and accion_edit:
-                row_id = row.get('id', '')
-                updated_data = {
-                    'prospecto_id': row.get('ID DE PROSPECTO', ''),
-                    'asesor':       asesor_edit.upper(),
-                    'fecha':        fecha_edit.strftime('%Y-%m-%d'),
-                    'prospecto':    prospecto_edit.upper(),
-                    'tipo':         tipo_edit,
-                    'accion':       accion_edit.upper(),
-                }
-                if save_data(updated_data, row_id):
-                    st.success(":material/check_circle: Prospecto actualizado exitosamente!")
-                    st.session_state.show_edit_dialog_prospeccion = False
-                    st.session_state.edit_index_prospeccion = None
-                    st.rerun()
-            else:
-                st.error(":material/warning: Por favor completa los campos obligatorios (*)")
-
-        if cancelar:
-            st.session_state.show_edit_dialog_prospeccion = False
-            st.session_state.edit_index_prospeccion = None
-            st.rerun()
+# ── ESQUEMA ───────────────────────────────────────────
+PROSPECCION = TablaCRUD(
+    'prospeccion',
+    [
+        Campo('prospecto_id', 'ID DE PROSPECTO', 'ID', tipo='id'),
+        Campo('asesor', 'ASESOR', 'Asesor', tipo='opcion', opciones=ASESORES, requerido=True,
+              buscar=True, formato=celda_avatar(ASESOR_CORTO)),
+        Campo('fecha', 'FECHA', 'Fecha', tipo='fecha', requerido=True, por_defecto=date.today, buscar=True),
+        Campo('prospecto', 'PROSPECTO', 'Prospecto', requerido=True, buscar=True),
+        Campo('tipo', 'TIPO', 'Tipo', tipo='opcion', opciones=["VENTA", "RENTA"], buscar=True,
+              formato=celda_badge({'VENTA': 'badge-soft-primary'}, 'badge-soft-purple')),
+        Campo('accion', 'ACCIÓN', 'Acción', tipo='texto_largo', requerido=True, buscar=True),
+    ],
+    singular='prospecto', plural='prospectos', hoja='Prospección',
+    disposicion=[['asesor', 'fecha'], ['prospecto', 'tipo'], ['accion']],
+    resumen=['PROSPECTO', 'ASESOR', 'FECHA'],
+)
 
 # ── FORMULARIO NUEVO PROSPECTO ────────────────────────
 st.markdown("#### :material/add: Agregar Nuevo Prospecto")
-
-with st.container():
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        asesor = st.selectbox("Asesor *", ASESORES, key="asesor_prospecto").upper()
-        fecha = st.date_input("Fecha *", value=date.today(), key="fecha_prospecto")
-
-    with col2:
-        prospecto = st.text_input("Prospecto *", key="nombre_prospecto").upper()
-        tipo = st.selectbox("Tipo", ["VENTA", "RENTA"], key="tipo_prospecto")
-
-    with col3:
-        accion = st.text_area("Acción *", key="accion_prospecto").upper()
-
-    if st.button(":material/save: Guardar Prospecto", key="guardar_prospecto", type="primary", use_container_width=True):
-        if asesor and prospecto and accion:
-            nuevo_id = generar_id()
-            nuevo_prospecto = {
-                'prospecto_id': nuevo_id,
-                'asesor':       asesor.upper(),
-                'fecha':        fecha.strftime('%Y-%m-%d'),
-                'prospecto':    prospecto.upper(),
-                'tipo':         tipo,
-                'accion':       accion.upper(),
-            }
-            if save_data(nuevo_prospecto):
-                st.success(":material/check_circle: Prospecto agregado exitosamente!")
-                time.sleep(1)
-                st.rerun()
-        else:
-            st.error(":material/warning: Por favor completa los campos obligatorios (*)")
+PROSPECCION.formulario_alta()
 
 st.markdown("---")
 
 # ── TABLA ─────────────────────────────────────────────
 st.markdown("#### :material/list: Lista de Prospectos")
 
-ICON_EDIT = '<svg viewBox="0 0 16 16" fill="currentColor"><path d="M12.146.146a.5.5 0 0 1 .708 0l3 3a.5.5 0 0 1 0 .708l-10 10a.5.5 0 0 1-.168.11l-5 2a.5.5 0 0 1-.65-.65l2-5a.5.5 0 0 1 .11-.168zm.708 1.707L11.207 3.5l1.293 1.293 1.647-1.647zM10.5 4.207 3.5 11.207v.5h.5l7-7z"/></svg>'
-ICON_DELETE = '<svg viewBox="0 0 16 16" fill="currentColor"><path d="M5.5 5.5A.5.5 0 0 1 6 6v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5m2.5 0a.5.5 0 0 1 .5.5v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5m3 .5a.5.5 0 0 0-1 0v6a.5.5 0 0 0 1 0z"/><path d="M14.5 3a1 1 0 0 1-1 1H13v9a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V4h-.5a1 1 0 0 1-1-1V2a1 1 0 0 1 1-1H6a1 1 0 0 1 1-1h2a1 1 0 0 1 1 1h3.5a1 1 0 0 1 1 1zM4.118 4 4 4.059V13a1 1 0 0 0 1 1h6a1 1 0 0 0 1-1V4.059L11.882 4zM2.5 3h11V2h-11z"/></svg>'
-
-def generar_tabla(data, btnedit=None, btndelete=None):
-    columnas_visibles = [col for col in data.columns if col not in ['id', 'ID DE PROSPECTO', 'created_at', 'updated_at']]
-    tabla_html = '<div class="table-card"><table class="responsive-table">\n<thead>\n<tr>\n'
-
-    for col in columnas_visibles:
-        tabla_html += f'    <th>{col}</th>\n'
-    tabla_html += '    <th>Acción</th>\n</tr>\n</thead>\n<tbody>\n'
-
-    for index, row in data.iterrows():
-        tabla_html += '    <tr>\n'
-
-        for col in columnas_visibles:
-            if col == 'TIPO':
-                badge_class = "badge-soft-primary" if row.get('TIPO', '') == 'VENTA' else "badge-soft-purple"
-                tabla_html += f'    <td data-value="{row.get(col, "")}"><span class="badge-soft {badge_class}">{row.get(col, "")}</span></td>\n'
-            elif col == 'ASESOR':
-                nombre = ASESOR_CORTO.get(row.get('ASESOR', ''), row.get('ASESOR', ''))
-                tabla_html += f'    <td data-value="{nombre}">{avatar_html(nombre)}</td>\n'
-            else:
-                tabla_html += f'    <td>{row.get(col, "")}</td>\n'
-
-        acciones = '    <td>'
-        if btnedit:
-            acciones += f'<a data-link="edit_{row["ID DE PROSPECTO"]}" class="btn-icon" title="Editar">{ICON_EDIT}</a>'
-        if btndelete:
-            acciones += f'<a data-link="delete_{row["ID DE PROSPECTO"]}" class="btn-icon btn-icon-danger" title="Eliminar">{ICON_DELETE}</a>'
-        acciones += '</td>\n'
-        tabla_html += acciones
-        tabla_html += '    </tr>\n'
-
-    tabla_html += '</tbody>\n</table></div>'
-    return tabla_html
-
-def to_excel(data):
-    export_cols = ['ID DE PROSPECTO', 'ASESOR', 'FECHA', 'PROSPECTO', 'TIPO', 'ACCIÓN']
-    available_cols = [c for c in export_cols if c in data.columns]
-    export_df = data[available_cols].copy()
-    export_df.columns = ['ID', 'Asesor', 'Fecha', 'Prospecto', 'Tipo', 'Acción'][:len(available_cols)]
-    for col in ['ID', 'Asesor', 'Prospecto', 'Tipo', 'Acción']:
-        if col in export_df.columns:
-            export_df[col] = export_df[col].astype(str).str.upper()
-    return dataframe_to_excel(export_df, sheet_name='Prospección')
-
-JS = estilo_tabla_js()
-
-material_table = st.components.v2.component(
-    name="material_table_prospeccion",
-    js=JS,
-    isolate_styles=False,
-)
-
-data = load_data()
+data = PROSPECCION.cargar()
 
 if not data.empty:
-    # ── BÚSQUEDA + DESCARGA (server-side, sobre el dataset completo) ──
-    col_search, col_download = st.columns([5, 1], vertical_alignment="bottom")
-    with col_search:
-        busqueda = st.text_input(
-            ":material/search: Buscar",
-            placeholder="Buscar por prospecto, asesor, tipo...",
-            key="search_input_prospeccion"
-        )
-
-    if busqueda:
-        data_filtrada = data[
-            data['PROSPECTO'].str.contains(busqueda, case=False, na=False) |
-            data['ASESOR'].str.contains(busqueda, case=False, na=False) |
-            data['FECHA'].astype(str).str.contains(busqueda, case=False, na=False) |
-            data['TIPO'].str.contains(busqueda, case=False, na=False) |
-            data['ACCIÓN'].str.contains(busqueda, case=False, na=False)
-        ]
-    else:
-        data_filtrada = data
-
-    data_filtrada = data_filtrada.copy()
-    data_filtrada['FECHA'] = data_filtrada['FECHA'].fillna("")
-
-    with col_download:
-        excel_data = to_excel(data_filtrada)
-        st.download_button(
-            label=":material/download: Excel",
-            data=excel_data,
-            file_name=f"prospeccion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            width='stretch'
-        )
-
-    # ── RENDER TABLA ───────────────────────────────────
-    # Se manda TODO data_filtrada (no una página): los filtros de header y el
-    # orden operan en el navegador sobre el 100% de las filas, y la paginación
-    # (Anterior/Siguiente) se calcula en JS después de aplicarlos.
-    paragraph_html = generar_tabla(data_filtrada, btnedit=True, btndelete=True)
-
-    resultado = material_table(
-        data=paragraph_html,
-        on_clicked_change=lambda: None,
-        key=f"table_prospeccion_{busqueda}"
-    )
-
-    # ── MANEJAR CLICKS DE BOTONES ─────────────────────
-    if resultado and resultado.get("clicked"):
-        clicked = resultado["clicked"]
-
-        if clicked.startswith("edit_"):
-            prospecto_id = clicked.replace("edit_", "")
-            match = data[data['ID DE PROSPECTO'] == prospecto_id]
-            if not match.empty:
-                edit_dialog(match.index[0])
-
-        elif clicked.startswith("delete_"):
-            prospecto_id = clicked.replace("delete_", "")
-            match = data[data['ID DE PROSPECTO'] == prospecto_id]
-            if not match.empty:
-                confirm_delete(match.index[0])
-
+    PROSPECCION.mostrar_tabla(data, placeholder="Buscar por prospecto, asesor, tipo...")
 else:
-    st.markdown("""
-    <div style="text-align:center;padding:52px 24px;border:2px dashed #cbd5e1;
-                border-radius:14px;background:#f8fafc;margin:24px 0;">
-        <div style="font-size:3.2rem;margin-bottom:12px;line-height:1;">🎯</div>
-        <div style="font-size:1.1rem;font-weight:600;color:#334155;margin-bottom:8px;">
-            No hay prospectos registrados
-        </div>
-        <div style="font-size:.9rem;color:#94a3b8;">
-            Agrega tu primer prospecto usando el formulario de arriba.
-        </div>
-    </div>""", unsafe_allow_html=True)
+    PROSPECCION.mostrar_vacio("🎯")
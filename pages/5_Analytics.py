@@ -9,6 +9,9 @@ from utils.dashboard_config import setup_page_config, apply_custom_styles
 from utils.data_loader import inicializar_conexion
 from utils.dashboard_filters import DashboardFilters
 from utils.dashboard_metrics import MetricsCalculator
+from utils.metric_registry import MetricRegistry
+from utils.sales_forecast import resumen_pronostico
+from utils.funnel import FunnelIndex
 from utils import dashboard_charts as charts
 
 
@@ -18,6 +21,55 @@ apply_custom_styles()
 
 st.title(":material/analytics: Analytics")
 
+SECCION_VENTAS = ":material/attach_money: Ventas"
+SECCION_ACTIVIDAD = ":material/trending_up: Actividad Comercial"
+SECCION_CICLO = ":material/timelapse: Ciclo de Venta"
+SECCION_PERDIDAS = ":material/money_off: Pérdidas"
+SECCION_CLIENTES = ":material/groups: Clientes"
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def pronostico_ventas(version, _calculator, todos_asesores):
+    """Proyección de cierre de mes y trimestre de todos los asesores, por versión de datos"""
+    return _calculator.pronostico_ventas(todos_asesores)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def simulacion_trimestre(version, _calculator, todos_asesores, asesor_seleccionado):
+    """Simulación Monte Carlo del pipeline contra la meta del trimestre, por versión de datos"""
+    return _calculator.simulacion_trimestre(todos_asesores, asesor_seleccionado)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def perdidas(version, _calculator, _proyectos_filtrados, seleccion):
+    """Pérdidas por motivo, asesor y mes, por versión de datos y filtros"""
+    return _calculator.metricas_perdidas(_proyectos_filtrados, seleccion[0], seleccion[1])
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def pareto_clientes(version, _calculator, _proyectos_filtrados, seleccion):
+    """Concentración de ventas por cliente, por versión de datos y filtros"""
+    return _calculator.analisis_pareto(_proyectos_filtrados, seleccion[0], seleccion[1])
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def cohortes_clientes(version, _calculator):
+    """Cohortes de clientes y LTV sobre toda la historia, por versión de datos"""
+    return _calculator.cohortes_clientes()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def metricas_giro(version, _calculator, _datos_filtrados, seleccion):
+    """Citas, conversión y ventas por giro, por versión de datos y filtros"""
+    citas_filtradas, _, proyectos_filtrados = _datos_filtrados
+    return _calculator.metricas_por_giro(citas_filtradas, proyectos_filtrados)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def indice_embudo(version, _data_loader):
+    """Índice de entidades del embudo, construido una vez por versión de datos"""
+    return FunnelIndex(_data_loader.citas_data, _data_loader.prospeccion_data, _data_loader.proyectos_data)
+
+
 # Conexión a Supabase y carga de datos
 try:
     data_loader = inicializar_conexion()
@@ -35,25 +87,89 @@ try:
     filtros = DashboardFilters()
     fecha_inicio, fecha_fin, asesor_seleccionado = filtros.mostrar_filtros(asesores_opciones)
     
-    # Aplicar filtros a los datos
-    citas_filtradas, prospeccion_filtrada, proyectos_filtrados = filtros.aplicar_filtros(
-        citas_data, prospeccion_data, proyectos_data,
-        fecha_inicio, fecha_fin, asesor_seleccionado
-    )
-    
     st.markdown("---")
     
-    # ========== CALCULADOR ==========
-    calculator = MetricsCalculator(citas_data, prospeccion_data, proyectos_data, metas_data)
+    # ========== REGISTRO DE MÉTRICAS ==========
+    # Cada KPI se calcula solo cuando una sección lo pide, y una sola vez por
+    # ejecución aunque lo pidan varias secciones.
+    registro = MetricRegistry()
+    registro.valor('calculator', MetricsCalculator(citas_data, prospeccion_data, proyectos_data, metas_data))
+    registro.valor('todos_asesores', todos_asesores)
+    registro.valor('seleccion', (fecha_inicio, fecha_fin, asesor_seleccionado))
+    
+    @registro.metrica('datos_filtrados')
+    def _datos_filtrados(seleccion):
+        return filtros.aplicar_filtros(citas_data, prospeccion_data, proyectos_data, *seleccion)
+    
+    @registro.metrica('metricas_ventas')
+    def _metricas_ventas(calculator, datos_filtrados, seleccion, todos_asesores):
+        fecha_inicio, fecha_fin, asesor_seleccionado = seleccion
+        return calculator.metricas_ventas_cotizaciones(
+            datos_filtrados[2], asesor_seleccionado, todos_asesores, fecha_inicio, fecha_fin
+        )
+    
+    @registro.metrica('metricas_ytd')
+    def _metricas_ytd(calculator, seleccion, todos_asesores):
+        return calculator.metricas_ventas_acumuladas_ytd(seleccion[2], todos_asesores)
+    
+    @registro.metrica('metricas_trimestre')
+    def _metricas_trimestre(calculator, datos_filtrados):
+        return calculator.metricas_ventas_trimestrales(datos_filtrados[2])
+    
+    @registro.metrica('pronostico')
+    def _pronostico(calculator, todos_asesores, seleccion):
+        return resumen_pronostico(
+            pronostico_ventas(data_loader.version, calculator, todos_asesores), seleccion[2]
+        )
+    
+    @registro.metrica('simulacion_trimestre')
+    def _simulacion_trimestre(calculator, todos_asesores, seleccion):
+        return simulacion_trimestre(data_loader.version, calculator, todos_asesores, seleccion[2])
+    
+    @registro.metrica('metricas_estado')
+    def _metricas_estado(calculator, datos_filtrados):
+        return calculator.metricas_proyectos_por_estado(datos_filtrados[2])
+    
+    @registro.metrica('metricas_principales')
+    def _metricas_principales(calculator, datos_filtrados):
+        return calculator.metricas_principales(*datos_filtrados)
+    
+    @registro.metrica('metricas_citas')
+    def _metricas_citas(calculator, seleccion):
+        return calculator.metricas_citas_semanales(*seleccion)
+    
+    @registro.metrica('metricas_ciclo')
+    def _metricas_ciclo(calculator, datos_filtrados, seleccion):
+        return calculator.metricas_ciclo_venta(datos_filtrados[2], seleccion[0], seleccion[1])
+    
+    @registro.metrica('metricas_perdidas')
+    def _metricas_perdidas(calculator, datos_filtrados, seleccion):
+        return perdidas(data_loader.version, calculator, datos_filtrados[2], seleccion)
+    
+    @registro.metrica('pareto_clientes')
+    def _pareto_clientes(calculator, datos_filtrados, seleccion):
+        return pareto_clientes(data_loader.version, calculator, datos_filtrados[2], seleccion)
+    
+    @registro.metrica('cohortes_clientes')
+    def _cohortes_clientes(calculator):
+        return cohortes_clientes(data_loader.version, calculator)
+    
+    @registro.metrica('metricas_giro')
+    def _metricas_giro(calculator, datos_filtrados, seleccion):
+        return metricas_giro(data_loader.version, calculator, datos_filtrados, seleccion)
     
-    # ========== TABS DE ANALYTICS ==========
-    tab1, tab2 = st.tabs([
-        ":material/attach_money: Ventas", 
-        ":material/trending_up: Actividad Comercial"
-    ])
+    @registro.metrica('embudo')
+    def _embudo(seleccion):
+        # El índice se construye solo si se pide el embudo, y una vez por versión de datos
+        calculator = MetricsCalculator(
+            citas_data, prospeccion_data, proyectos_data, metas_data,
+            indice_embudo=indice_embudo(data_loader.version, data_loader)
+        )
+        return calculator.embudo_enlazado(*seleccion)
     
-    # ==================== TAB 1: VENTAS ====================
-    with tab1:
+    # ==================== SECCIÓN 1: VENTAS ====================
+    @st.fragment
+    def seccion_ventas():
         st.markdown("### :material/monetization_on: Análisis de Ventas")
         st.caption("¿Estoy cumpliendo mis metas comerciales?")
         
@@ -62,9 +178,7 @@ try:
         # Performance Mensual
         st.markdown("#### :material/calendar_today: Performance Mensual")
         
-        metricas_ventas = calculator.metricas_ventas_cotizaciones(
-            proyectos_filtrados, asesor_seleccionado, todos_asesores, fecha_inicio, fecha_fin
-        )
+        metricas_ventas = registro['metricas_ventas']
         
         col_v1, col_v2, col_v3 = st.columns(3)
         
@@ -96,9 +210,7 @@ try:
         st.markdown("#### :material/bar_chart: Performance Acumulada del Año")
         st.caption(f"Ventas y metas acumuladas desde Enero hasta el mes actual")
         
-        metricas_ytd = calculator.metricas_ventas_acumuladas_ytd(
-            asesor_seleccionado, todos_asesores
-        )
+        metricas_ytd = registro['metricas_ytd']
         
         col_ytd1, col_ytd2, col_ytd3 = st.columns(3)
         
@@ -131,15 +243,18 @@ try:
         # Performance Trimestral
         st.markdown("#### :material/calendar_month: Performance Trimestral")
         
-        metricas_trimestre = calculator.metricas_ventas_trimestrales(proyectos_filtrados)
-        charts.mostrar_metricas_ventas_trimestrales(metricas_trimestre)
+        metricas_trimestre = registro['metricas_trimestre']
+        charts.mostrar_metricas_ventas_trimestrales(metricas_trimestre, registro['pronostico'])
+        
+        with st.expander(":material/casino: Simulación del pipeline contra la meta del trimestre"):
+            charts.mostrar_simulacion_trimestre(registro['simulacion_trimestre'])
         
         st.markdown("---")
         
         # Análisis de Proyectos
         st.markdown("#### :material/assessment: Análisis de Proyectos/Cotizaciones")
         
-        metricas_estado = calculator.metricas_proyectos_por_estado(proyectos_filtrados)
+        metricas_estado = registro['metricas_estado']
         
         col1, col2, col3 = st.columns(3)
         
@@ -166,9 +281,7 @@ try:
         # Contexto: Ticket Promedio
         st.markdown("#### :material/paid: Calidad de Ventas")
         
-        metricas = calculator.metricas_principales(
-            citas_filtradas, prospeccion_filtrada, proyectos_filtrados
-        )
+        metricas = registro['metricas_principales']
         
         col_t1, col_t2 = st.columns(2)
         
@@ -184,8 +297,9 @@ try:
                 value=f"${metricas['total_cartera']:,.2f}"
             )
     
-    # ==================== TAB 2: ACTIVIDAD COMERCIAL ====================
-    with tab2:
+    # ==================== SECCIÓN 2: ACTIVIDAD COMERCIAL ====================
+    @st.fragment
+    def seccion_actividad():
         st.markdown("### :material/trending_up: Actividad Comercial")
         st.caption("¿Mi equipo está ejecutando bien?")
         
@@ -194,9 +308,7 @@ try:
         # Cumplimiento de Citas
         st.markdown("#### :material/calendar_today: Cumplimiento de Citas")
         
-        metricas_citas = calculator.metricas_citas_semanales(
-            fecha_inicio, fecha_fin, asesor_seleccionado
-        )
+        metricas_citas = registro['metricas_citas']
         
         if metricas_citas:
             col_c1, col_c2 = st.columns(2)
@@ -220,9 +332,7 @@ try:
         # Pipeline de Oportunidades
         st.markdown("#### :material/filter_list: Pipeline de Oportunidades")
         
-        metricas = calculator.metricas_principales(
-            citas_filtradas, prospeccion_filtrada, proyectos_filtrados
-        )
+        metricas = registro['metricas_principales']
         
         col_p1, col_p2, col_p3 = st.columns(3)
         
@@ -249,17 +359,30 @@ try:
         # Comparativa de Módulos (Embudo)
         st.markdown("#### :material/insights: Embudo Comercial")
         
-        charts.mostrar_graficos(
-            metricas['total_citas'],
-            metricas['total_prospectos'],
-            metricas['total_proyectos']
-        )
+        charts.mostrar_embudo_enlazado(registro['embudo'])
+        
+        with st.expander("Ver totales por módulo"):
+            charts.mostrar_graficos(
+                metricas['total_citas'],
+                metricas['total_prospectos'],
+                metricas['total_proyectos']
+            )
+        
+        st.markdown("---")
+        
+        # Actividad por Giro
+        st.markdown("#### :material/factory: Actividad por Giro")
+        st.caption("Citas por giro de negocio y cuántos prospectos llegaron a proyecto")
+        
+        charts.mostrar_metricas_por_giro(registro['metricas_giro'])
         
         st.markdown("---")
         
         # Actividad Reciente
         st.markdown("#### :material/description: Actividad Reciente")
         
+        citas_filtradas, prospeccion_filtrada, proyectos_filtrados = registro['datos_filtrados']
+        
         tab_citas, tab_prosp, tab_proy = st.tabs([
             "Últimas Citas", 
             "Últimos Prospectos", 
@@ -291,7 +414,12 @@ try:
                                      "accion_seguir": "Acción a Seguir",
                                      "ultimo_contacto": "Último Contacto",
                                      "created_at": None,
-                                     "updated_at": None
+                                     "updated_at": None,
+                                     "semana_iso": None,
+                                     "asesor_norm": None,
+                                     "prospecto_norm": None,
+                                     "giro_cat": None,
+                                     "entidad_id": None
                                  })
             else:
                 st.info("No hay citas registradas")
@@ -317,7 +445,9 @@ try:
                                      "tipo": "Tipo",
                                      "accion": "Acción",
                                      "created_at": None,
-                                     "updated_at": None
+                                     "updated_at": None,
+                                     "prospecto_norm": None,
+                                     "entidad_id": None
                         })
             else:
                 st.info("No hay prospectos registrados")
@@ -349,11 +479,79 @@ try:
                                      "motivo_perdida": "Motivo de Pérdida",
                                      "observaciones": "Observaciones",
                                      "created_at": None,
-                                     "updated_at": None
+                                     "updated_at": None,
+                                     "fecha_venta": None,
+                                     "status_norm": None,
+                                     "asesor_norm": None,
+                                     "es_venta": None,
+                                     "cohorte": None,
+                                     "dias_ciclo": None,
+                                     "motivo_perdida_cat": None,
+                                     "cliente_norm": None,
+                                     "entidad_id": None
                                  })
             else:
                 st.info("No hay proyectos registrados")
 
+    # ==================== SECCIÓN 3: CICLO DE VENTA ====================
+    @st.fragment
+    def seccion_ciclo():
+        st.markdown("### :material/timelapse: Ciclo de Venta")
+        st.caption("¿Cuánto tarda una cotización en convertirse en factura?")
+        
+        st.markdown("---")
+        
+        charts.mostrar_ciclo_venta(registro['metricas_ciclo'])
+
+    # ==================== SECCIÓN 4: PÉRDIDAS ====================
+    @st.fragment
+    def seccion_perdidas():
+        st.markdown("### :material/money_off: Análisis de Pérdidas")
+        st.caption("¿Por qué estamos perdiendo proyectos?")
+        
+        st.markdown("---")
+        
+        charts.mostrar_analisis_perdidas(registro['metricas_perdidas'])
+
+    # ==================== SECCIÓN 5: CLIENTES ====================
+    @st.fragment
+    def seccion_clientes():
+        st.markdown("### :material/groups: Clientes")
+        st.caption("¿Qué tan concentradas están nuestras ventas?")
+        
+        st.markdown("---")
+        
+        st.markdown("#### :material/leaderboard: Concentración de Ventas (Pareto)")
+        charts.mostrar_pareto_clientes(registro['pareto_clientes'])
+        
+        st.markdown("---")
+        
+        st.markdown("#### :material/replay: Cohortes y Recompra")
+        st.caption("Clientes agrupados por el mes de su primera venta, sobre toda la historia")
+        charts.mostrar_cohortes_clientes(registro['cohortes_clientes'])
+
+    # ========== SECCIONES DE ANALYTICS ==========
+    # Solo se ejecuta la sección seleccionada; cada sección es un fragmento,
+    # así que interactuar dentro de una no vuelve a ejecutar la página completa.
+    seccion = st.segmented_control(
+        "Sección",
+        options=[SECCION_VENTAS, SECCION_ACTIVIDAD, SECCION_CICLO, SECCION_PERDIDAS, SECCION_CLIENTES],
+        default=SECCION_VENTAS,
+        key="analytics_seccion",
+        label_visibility="collapsed"
+    )
+    
+    if seccion == SECCION_ACTIVIDAD:
+        seccion_actividad()
+    elif seccion == SECCION_CICLO:
+        seccion_ciclo()
+    elif seccion == SECCION_PERDIDAS:
+        seccion_perdidas()
+    elif seccion == SECCION_CLIENTES:
+        seccion_clientes()
+    else:
+        seccion_ventas()
+
 except Exception as e:
     st.error(f"Error al cargar datos: {str(e)}")
     st.info("Asegúrate de que las tablas CITAS, PROSPECCION, PROYECTOS y METAS existan en tu base de datos.")
@@ -1,4 +1,6 @@
 import hashlib
+from functools import lru_cache
+from html import escape
 from io import BytesIO
 
 import pandas as pd
@@ -18,15 +20,21 @@ PALETTE = [
     {"bg": "#e7e9eb", "fg": "#41464b"},
 ]
 
-def color_for(value):
-    idx = int(hashlib.md5(str(value).encode()).hexdigest(), 16) % len(PALETTE)
+# El color se pide en cada rerun por cada valor distinto (avatares en los dos
+# modos de tabla), así que se memoriza por proceso en un LRU acotado
+@lru_cache(maxsize=4096)
+def _color(texto):
+    idx = int(hashlib.md5(texto.encode()).hexdigest(), 16) % len(PALETTE)
     return PALETTE[idx]
 
+def color_for(value):
+    return _color(str(value))
+
 def badge_html(value, css_class="badge-soft"):
     if not value:
         return ""
     c = color_for(value)
-    return f'<span class="{css_class}" style="background:{c["bg"]};color:{c["fg"]};">{value}</span>'
+    return f'<span class="{css_class}" style="background:{c["bg"]};color:{c["fg"]};">{escape(str(value))}</span>'
 
 ASESOR_CORTO = {
     'HUGO ENRIQUE PÉREZ RAMÍREZ':     'HUGO PÉREZ',
@@ -60,12 +68,12 @@ def avatar_html(name):
     if not name:
         return ""
     parts = str(name).split()
-    initials = "".join(p[0] for p in parts[:2]).upper()
+    initials = escape("".join(p[0] for p in parts[:2]).upper())
     c = color_for(name)
     return (
         '<span style="display:inline-flex;align-items:center;gap:8px;">'
         f'<span style="display:inline-flex;align-items:center;justify-content:center;'
         f'width:24px;height:24px;border-radius:50%;background:{c["bg"]};color:{c["fg"]};'
         f'font-size:10.5px;font-weight:700;flex-shrink:0;">{initials}</span>'
-        f'<span>{name}</span></span>'
+        f'<span>{escape(str(name))}</span></span>'
     )
@@ -0,0 +1,228 @@
+"""
+Paginación, orden y filtros de tablas resueltos en el servidor
+
+El componente material_table manda su estado (página, tamaño, orden y
+filtros de encabezado) con setTriggerValue('consulta', ...); la página lo
+guarda en session_state y responde solo con las filas de la página pedida.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+TAMANO_PAGINA = 15
+# Celdas (filas × columnas visibles) hasta las que la tabla completa se manda
+# al navegador en formato columnar (styles.table_render.tabla_columnar); el
+# payload viaja en cada rerun, así que se acota su tamaño: unas 4.000 filas de
+# 10 columnas, del orden de 0.5 MB. Arriba de esto, modo servidor
+LIMITE_CELDAS_NAVEGADOR = 40_000
+
+
+def _quitar_acentos(serie):
+    return serie.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+
+
+class TableIndex:
+    """
+    Índice de una tabla para responder consultas de página sin recorrer filas
+
+    Al construirse factoriza cada columna visible: los códigos sirven para
+    filtrar con una máscara booleana por valor y los rangos para ordenar con
+    ``np.lexsort`` (numérico si toda la columna es numérica, texto sin
+    acentos ni mayúsculas en otro caso). Una consulta es entonces un par de
+    operaciones vectorizadas y un corte de la página.
+
+    Ejemplo:
+        indice = TableIndex(data, ['ASESOR', 'FECHA'], mapeos={'ASESOR': ASESOR_CORTO})
+        resultado = indice.consultar(pagina=0, tamano=15)
+        data.iloc[resultado['filas']]
+    """
+
+    def __init__(self, data, columnas, mapeos=None):
+        """
+        Construye el índice
+
+        Args:
+            data: DataFrame con las filas de la tabla
+            columnas: Columnas que se pueden filtrar u ordenar
+            mapeos: Diccionario columna -> dict para traducir el valor mostrado
+                (p. ej. el nombre corto del asesor)
+        """
+        mapeos = mapeos or {}
+        self.num_filas = len(data)
+        self.valores = {}
+        self._codigos = {}
+        self._rangos = {}
+        self._vacios = {}
+
+        for columna in columnas:
+            if columna not in data.columns:
+                continue
+            serie = data[columna]
+            numerica = pd.api.types.is_numeric_dtype(serie)
+            if not numerica:
+                serie = serie.fillna('').astype(str)
+
+            # Todo el trabajo por valor se hace sobre los únicos y se expande con los códigos
+            codigos, unicos = pd.factorize(serie, sort=True)
+            codigos = np.where(codigos < 0, len(unicos), codigos)
+            texto = pd.Series(np.append(pd.Series(unicos).astype(str).to_numpy(dtype=object), ''), dtype=object)
+            if columna in mapeos:
+                texto = texto.map(mapeos[columna]).fillna(texto)
+
+            codigos_texto, valores = pd.factorize(texto, sort=True)
+            codigos_fila = codigos_texto[codigos]
+            # Solo las opciones que aparecen en alguna fila
+            presentes = np.bincount(codigos_fila, minlength=len(valores)) > 0
+            nuevos = np.cumsum(presentes) - 1
+            self._codigos[columna] = nuevos[codigos_fila]
+            self.valores[columna] = valores[presentes].tolist()
+
+            vacio = (texto == '').to_numpy()
+            if numerica:
+                rango = np.arange(len(texto))
+            else:
+                numeros = pd.to_numeric(texto, errors='coerce')
+                if (~vacio).any() and numeros[~vacio].notna().all():
+                    llave = numeros
+                else:
+                    llave = _quitar_acentos(texto.str.lower())
+                rango, _ = pd.factorize(llave, sort=True)
+            self._rangos[columna] = rango[codigos]
+            # Vacíos al final en ambos sentidos
+            self._vacios[columna] = vacio[codigos]
+
+    def _mascaras(self, filtros):
+        """Máscara booleana de filas por cada columna filtrada"""
+        mascaras = {}
+        for columna, aceptados in (filtros or {}).items():
+            if columna not in self._codigos:
+                continue
+            permitido = np.isin(self.valores[columna], list(aceptados))
+            mascaras[columna] = permitido[self._codigos[columna]] if len(permitido) else \
+                np.zeros(self.num_filas, dtype=bool)
+        return mascaras
+
+    def conteos(self, filtros=None):
+        """
+        Filas por valor de cada columna para los menús de filtro
+
+        Cada columna se cuenta bajo los filtros de las demás (no el suyo),
+        con un ``np.bincount`` de sus códigos: el menú dice cuántas filas
+        quedarían al marcar cada valor.
+
+        Args:
+            filtros: Diccionario columna -> valores aceptados
+
+        Returns:
+            dict: columna -> lista de conteos, en el orden de ``valores``
+        """
+        mascaras = self._mascaras(filtros)
+        resultado = {}
+        for columna, codigos in self._codigos.items():
+            mascara = np.ones(self.num_filas, dtype=bool)
+            for otra, filas in mascaras.items():
+                if otra != columna:
+                    mascara &= filas
+            resultado[columna] = np.bincount(codigos[mascara], minlength=len(self.valores[columna])).tolist()
+        return resultado
+
+    def consultar(self, pagina=0, tamano=TAMANO_PAGINA, orden=None, filtros=None):
+        """
+        Resuelve una consulta de página
+
+        Args:
+            pagina: Número de página (desde 0); se ajusta al rango válido
+            tamano: Filas por página
+            orden: Lista de {'col', 'asc'}; la primera es la llave principal
+            filtros: Diccionario columna -> valores aceptados (lista vacía = ninguno)
+
+        Returns:
+            dict: filas (posiciones de la página), total (filas que pasan los
+            filtros), pagina, paginas y tamano
+        """
+        mascara = np.ones(self.num_filas, dtype=bool)
+        for filas in self._mascaras(filtros).values():
+            mascara &= filas
+
+        filas = np.flatnonzero(mascara)
+        llaves = []
+        for criterio in reversed(orden or []):
+            rangos = self._rangos.get(criterio.get('col'))
+            if rangos is None:
+                continue
+            rangos = rangos[filas]
+            llaves.append(rangos if criterio.get('asc', True) else -rangos)
+            llaves.append(self._vacios[criterio['col']][filas])
+        if llaves:
+            filas = filas[np.lexsort(llaves)]
+
+        tamano = max(1, int(tamano))
+        total = len(filas)
+        paginas = max(1, -(-total // tamano))
+        pagina = min(max(0, int(pagina)), paginas - 1)
+        return {
+            'filas': filas[pagina * tamano:(pagina + 1) * tamano],
+            'total': total,
+            'pagina': pagina,
+            'paginas': paginas,
+            'tamano': tamano,
+        }
+
+    def payload(self, html, resultado, consulta):
+        """
+        Arma los datos del componente en modo servidor
+
+        Args:
+            html: HTML de la tabla con solo las filas de la página
+            resultado: Diccionario devuelto por consultar
+            consulta: Consulta que se resolvió (orden y filtros vigentes)
+
+        Returns:
+            dict: Payload para material_table
+        """
+        return {
+            'modo': 'servidor',
+            'html': html,
+            'total': resultado['total'],
+            'registros': self.num_filas,
+            'pagina': resultado['pagina'],
+            'tamano': resultado['tamano'],
+            'orden': consulta.get('orden') or [],
+            'filtros': consulta.get('filtros') or {},
+            'opciones': self.valores,
+            'conteos': self.conteos(consulta.get('filtros')),
+        }
+
+
+def consulta_tabla(tabla, busqueda=""):
+    """
+    Consulta vigente de una tabla (se reinicia a la primera página si cambia la búsqueda)
+
+    Args:
+        tabla: Nombre de la tabla ('citas', 'prospeccion', 'proyectos')
+        busqueda: Texto de búsqueda actual
+
+    Returns:
+        dict: pagina, tamano, orden y filtros
+    """
+    clave = f"consulta_{tabla}"
+    consulta = st.session_state.get(clave) or {'pagina': 0, 'tamano': TAMANO_PAGINA, 'orden': [], 'filtros': {}}
+    if consulta.get('busqueda', "") != busqueda:
+        consulta = {**consulta, 'pagina': 0, 'busqueda': busqueda}
+        st.session_state[clave] = consulta
+    return consulta
+
+
+def guardar_consulta(tabla, key):
+    """
+    Callback del componente: guarda la consulta que mandó el navegador
+
+    Args:
+        tabla: Nombre de la tabla
+        key: Key del componente en session_state
+    """
+    resultado = st.session_state.get(key) or {}
+    consulta = resultado.get('consulta')
+    if consulta:
+        anterior = st.session_state.get(f"consulta_{tabla}") or {}
+        st.session_state[f"consulta_{tabla}"] = {**consulta, 'busqueda': anterior.get('busqueda', "")}
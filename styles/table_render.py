@@ -0,0 +1,279 @@
+"""
+Render columnar de las tablas de captura
+
+Cada columna se formatea como vector: como celdas <td> (``tabla_html``,
+para el modo servidor) o como datos columnares con los valores repetidos
+codificados en diccionario (``tabla_columnar``, que el componente pinta con
+sus plantillas en el navegador). Los valores se escapan siempre.
+"""
+import hashlib
+from html import escape
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+
+from .table_helpers import avatar_html, color_for
+
+
+def _por_valor(serie, funcion):
+    """Aplica funcion una vez por valor distinto y expande el resultado a todas las filas"""
+    codigos, unicos = pd.factorize(serie)
+    resultado = np.empty(len(unicos) + 1, dtype=object)
+    resultado[:-1] = [funcion(valor) for valor in unicos.tolist()]
+    resultado[-1] = funcion(None)
+    return resultado[codigos]
+
+
+def _texto(serie):
+    return serie.where(serie.notna(), '').astype(str)
+
+
+def _diccionario(texto):
+    """Codifica una columna de texto como diccionario de valores + códigos por fila"""
+    codigos, dic = pd.factorize(texto)
+    return {'dic': dic.tolist(), 'codigos': codigos.tolist()}
+
+
+class Celda:
+    """Formato de texto escapado; base de los demás formatos de columna"""
+
+    tipo = 'texto'
+
+    def html(self, serie):
+        """
+        Formatea la columna como celdas HTML
+
+        Args:
+            serie: Valores de la columna
+
+        Returns:
+            np.ndarray: Una celda <td> por fila
+        """
+        return _por_valor(_texto(serie), lambda valor: f'<td>{escape(valor or "")}</td>')
+
+    def columnar(self, serie):
+        """
+        Formatea la columna para el modo de datos del componente
+
+        Los textos con valores repetidos viajan como diccionario + códigos;
+        los casi únicos (nombres, notas), como lista plana.
+
+        Args:
+            serie: Valores de la columna
+
+        Returns:
+            dict: tipo y valores (o dic y codigos)
+        """
+        texto = _texto(serie)
+        if texto.nunique() * 2 <= len(texto):
+            return {'tipo': self.tipo, **_diccionario(texto)}
+        return {'tipo': self.tipo, 'valores': texto.tolist()}
+
+
+class CeldaMoneda(Celda):
+    """Celda numérica con formato $1,234.56 (vacíos como $0.00)"""
+
+    tipo = 'moneda'
+
+    def _numeros(self, serie):
+        return pd.to_numeric(serie, errors='coerce').fillna(0).astype(float)
+
+    def html(self, serie):
+        return _por_valor(
+            self._numeros(serie),
+            lambda valor: f'<td class="cell-numeric" data-value="{valor or 0}">${valor or 0:,.2f}</td>'
+        )
+
+    def columnar(self, serie):
+        return {'tipo': self.tipo, 'valores': self._numeros(serie).tolist()}
+
+
+class CeldaPorcentaje(Celda):
+    """Probabilidad como porcentaje; vacíos como — con data-value -1 para ordenar al final"""
+
+    tipo = 'porcentaje'
+
+    def html(self, serie):
+        def formato(valor):
+            if valor is None or pd.isna(valor):
+                return '<td class="cell-numeric" data-value="-1">—</td>'
+            return f'<td class="cell-numeric" data-value="{valor:.4f}">{valor:.0%}</td>'
+        return _por_valor(pd.to_numeric(serie, errors='coerce'), formato)
+
+    def columnar(self, serie):
+        numeros = pd.to_numeric(serie, errors='coerce')
+        return {'tipo': self.tipo, 'valores': numeros.astype(object).where(numeros.notna(), None).tolist()}
+
+
+class CeldaBadge(Celda):
+    """Badge con clase CSS por valor"""
+
+    tipo = 'badge'
+
+    def __init__(self, clases, defecto):
+        """
+        Args:
+            clases: Diccionario valor -> clase CSS
+            defecto: Clase para valores fuera del diccionario
+        """
+        self.clases = clases
+        self.defecto = defecto
+
+    def html(self, serie):
+        def formato(valor):
+            valor = valor or ""
+            texto = escape(valor)
+            return (f'<td data-value="{texto}"><span class="badge-soft {self.clases.get(valor, self.defecto)}">'
+                    f'{texto}</span></td>')
+        return _por_valor(_texto(serie), formato)
+
+    def columnar(self, serie):
+        columna = _diccionario(_texto(serie))
+        columna['clases'] = [self.clases.get(valor, self.defecto) for valor in columna['dic']]
+        return {'tipo': self.tipo, **columna}
+
+
+class CeldaAvatar(Celda):
+    """Avatar con iniciales (p. ej. asesores, con su nombre corto)"""
+
+    tipo = 'avatar'
+
+    def __init__(self, mapeo=None):
+        """
+        Args:
+            mapeo: Diccionario valor -> nombre mostrado (opcional)
+        """
+        self.mapeo = mapeo or {}
+
+    def _nombres(self, serie):
+        texto = _texto(serie)
+        return texto.map(self.mapeo).fillna(texto) if self.mapeo else texto
+
+    def html(self, serie):
+        return _por_valor(
+            self._nombres(serie),
+            lambda nombre: f'<td data-value="{escape(nombre or "")}">{avatar_html(nombre or "")}</td>'
+        )
+
+    def columnar(self, serie):
+        columna = _diccionario(self._nombres(serie))
+        colores = [color_for(nombre) for nombre in columna['dic']]
+        columna['colores'] = [[color['bg'], color['fg']] for color in colores]
+        return {'tipo': self.tipo, **columna}
+
+
+celda_texto = Celda()
+celda_moneda = CeldaMoneda()
+celda_porcentaje = CeldaPorcentaje()
+
+
+def celda_badge(clases, defecto):
+    """Formato de badges con clase CSS por valor (ver CeldaBadge)"""
+    return CeldaBadge(clases, defecto)
+
+
+def celda_avatar(mapeo=None):
+    """Formato de avatar con iniciales (ver CeldaAvatar)"""
+    return CeldaAvatar(mapeo)
+
+
+def accion(prefijo, icono, titulo, clase="btn-icon"):
+    """
+    Define un botón de acción por fila (data-link="<prefijo>_<id>")
+
+    Args:
+        prefijo: Prefijo del data-link que recibe la página ('edit', 'delete', ...)
+        icono: SVG del botón
+        titulo: Texto del tooltip
+        clase: Clases CSS del botón
+
+    Returns:
+        dict: prefijo, icono, titulo y clase
+    """
+    return {'prefijo': prefijo, 'icono': icono, 'titulo': titulo, 'clase': clase}
+
+
+def _serie(data, col):
+    return data[col] if col in data.columns else pd.Series('', index=data.index)
+
+
+def tabla_html(data, columnas, formatos=None, acciones=(), id_col=None):
+    """
+    Genera el HTML de una tabla a partir de sus columnas
+
+    Args:
+        data: DataFrame con las filas a pintar
+        columnas: Columnas visibles, en orden
+        formatos: Diccionario columna -> formato (por defecto celda_texto)
+        acciones: Botones por fila creados con accion()
+        id_col: Columna con el ID que va en el data-link de las acciones
+
+    Returns:
+        str: HTML de la tabla
+    """
+    formatos = formatos or {}
+    encabezado = ''.join(f'<th>{escape(str(col))}</th>' for col in columnas)
+    if acciones:
+        encabezado += '<th>Acción</th>'
+
+    celdas = [formatos.get(col, celda_texto).html(_serie(data, col)) for col in columnas]
+
+    if acciones and len(data) > 0:
+        ids = np.array([escape(valor, quote=True) for valor in _texto(data[id_col])], dtype=object)
+        botones = np.full(len(data), '<td>', dtype=object)
+        for a in acciones:
+            botones += (f'<a data-link="{a["prefijo"]}_' + ids +
+                        f'" class="{a["clase"]}" title="{a["titulo"]}">{a["icono"]}</a>')
+        celdas.append(botones + '</td>')
+
+    # Un solo join sobre todas las celdas, fila por fila
+    n = len(data)
+    return ''.join(chain(
+        ('<div class="table-card"><table class="responsive-table"><thead><tr>', encabezado, '</tr></thead><tbody>'),
+        chain.from_iterable(zip(repeat('<tr>', n), *celdas, repeat('</tr>', n))),
+        ('</tbody></table></div>',),
+    ))
+
+
+def _version(data, columnas):
+    """Huella del contenido de las columnas: cambia si cambia cualquier valor o fila"""
+    presentes = [col for col in dict.fromkeys(columnas) if col in data.columns]
+    if not presentes:
+        return hashlib.md5(b'').hexdigest()
+    huellas = pd.util.hash_pandas_object(data[presentes].astype(str), index=False)
+    return hashlib.md5(huellas.to_numpy().tobytes()).hexdigest()
+
+
+def tabla_columnar(data, columnas, formatos=None, acciones=(), id_col=None):
+    """
+    Genera el payload del componente en modo de datos
+
+    En lugar de HTML por fila viajan los valores de cada columna (los
+    repetidos como diccionario + códigos) y una sola vez la definición de
+    las acciones; el navegador arma las celdas con sus plantillas. La
+    versión permite al componente saltarse los reruns sin cambios y, si
+    cambió, actualizar solo las filas (por ID) que son distintas.
+
+    Args:
+        data: DataFrame con las filas de la tabla
+        columnas: Columnas visibles, en orden
+        formatos: Diccionario columna -> formato (por defecto celda_texto)
+        acciones: Botones por fila creados con accion()
+        id_col: Columna con el ID de cada fila (para las acciones)
+
+    Returns:
+        dict: modo, version, filas, columnas (nombre, tipo y valores), ids y acciones
+    """
+    formatos = formatos or {}
+    return {
+        'modo': 'datos',
+        'version': _version(data, [*columnas, id_col]),
+        'filas': len(data),
+        'columnas': [
+            {'nombre': col, **formatos.get(col, celda_texto).columnar(_serie(data, col))}
+            for col in columnas
+        ],
+        'ids': _texto(data[id_col]).tolist() if id_col in data.columns else [],
+        'acciones': list(acciones),
+    }
@@ -1,19 +1,455 @@
 def estilo_tabla_js():
     JS = """
+    // ── MOTOR DE DATOS ────────────────────────────────────────────────────────
+    // Filtra, ordena y saca los valores únicos de las columnas del modo de
+    // datos. Es autocontenido: el componente lo levanta como Web Worker (con
+    // su propia copia de las columnas) y solo si el navegador no lo permite
+    // corre en el hilo principal. Mensajes:
+    //   {tipo: 'datos', columnas, filas}          carga la tabla
+    //   {id, tipo: 'consulta', filtros, orden}    -> {id, vista: Int32Array}
+    //   {id, tipo: 'valores', col, filtros}       -> {id, valores, conteos}
+    // ── FORMATO DE NÚMEROS ────────────────────────────────────────────────────
+    // Igual que Python en table_render: repr() del float para el data-value de
+    // moneda y redondeo al par sobre el valor binario exacto (como format()),
+    // que toFixed e Intl no hacen en los empates (0.125 -> 0.12, 2.675 -> 2.67).
+    // Lo usan el motor (etiquetas de filtro) y las plantillas de celda.
+    function formatoNumeros() {
+        function redondeoPar(v, decimales, agrupar = false) {
+            const negativo = v < 0 || Object.is(v, -0);
+            const x = Math.abs(v);
+            if (x >= 1e21) return String(v);
+            let texto = x.toFixed(decimales);
+            const exacto = x.toFixed(100);
+            const corte = exacto.indexOf('.') + 1 + decimales;
+            if (/^50*$/.test(exacto.slice(corte)) && +exacto[corte - 1 - (decimales ? 0 : 1)] % 2 === 0) {
+                texto = exacto.slice(0, decimales ? corte : corte - 1);
+            }
+            if (agrupar) {
+                const [entero, fraccion] = texto.split('.');
+                texto = entero.replace(/\\B(?=(\\d{3})+(?!\\d))/g, ',') + (fraccion === undefined ? '' : '.' + fraccion);
+            }
+            return (negativo ? '-' : '') + texto;
+        }
+
+        function reprFloat(v) {
+            if (!isFinite(v)) return v > 0 ? 'inf' : v < 0 ? '-inf' : 'nan';
+            const [mantisa, e] = Math.abs(v).toExponential().split('e');
+            const exp = +e;
+            const digitos = mantisa.replace('.', '');
+            let texto;
+            if (exp < -4 || exp >= 16) {
+                texto = (digitos.length > 1 ? digitos[0] + '.' + digitos.slice(1) : digitos) +
+                    'e' + (exp < 0 ? '-' : '+') + String(Math.abs(exp)).padStart(2, '0');
+            } else if (exp < 0) {
+                texto = '0.' + '0'.repeat(-exp - 1) + digitos;
+            } else if (digitos.length <= exp + 1) {
+                texto = digitos + '0'.repeat(exp + 1 - digitos.length) + '.0';
+            } else {
+                texto = digitos.slice(0, exp + 1) + '.' + digitos.slice(exp + 1);
+            }
+            return (v < 0 || Object.is(v, -0) ? '-' : '') + texto;
+        }
+
+        return {
+            // f'{valor or 0}' y f'${valor or 0:,.2f}'
+            valorMoneda: v => v ? reprFloat(v) : '0',
+            moneda: v => '$' + redondeoPar(v || 0, 2, true),
+            // f'{valor:.4f}' y f'{valor:.0%}' (format multiplica por 100 en float)
+            valorPorcentaje: v => redondeoPar(v, 4),
+            porcentaje: v => redondeoPar(v * 100, 0) + '%',
+        };
+    }
+
+    function motorTabla(self) {
+        let columnas = [];
+        let numFilas = 0;
+        let llavesOrden = [];
+
+        const numeros = formatoNumeros();
+
+        function valor(col, i) {
+            return col.codigos ? col.dic[col.codigos[i]] : col.valores[i];
+        }
+
+        // Texto con el que se filtra cada valor: el mismo que se ve en la celda
+        function etiqueta(col, v) {
+            if (col.tipo === 'moneda') return numeros.moneda(v);
+            if (col.tipo === 'porcentaje') return v === null || v === undefined ? '—' : numeros.porcentaje(v);
+            return String(v ?? '');
+        }
+
+        // ── ÍNDICE DE VALORES DISTINTOS ───────────────────────────────────────
+        // Se arma en una sola pasada al recibir los datos: por columna, las
+        // etiquetas distintas (dic), el código de cada fila, el conteo por valor
+        // y, si la columna tiene pocos valores, un bitset de filas por valor.
+        // Filtrar es entonces unir los bitsets aceptados de cada columna e
+        // intersectar las columnas; las de muchos valores usan sus códigos.
+        const MAX_BITSETS = 256;
+        let indice = [];
+        let palabras = 0;
+
+        function indexar() {
+            palabras = (numFilas + 31) >>> 5;
+            indice = columnas.map(col => {
+                // Las columnas con diccionario propio ya traen etiquetas y códigos
+                const propio = !!col.codigos && col.tipo !== 'moneda' && col.tipo !== 'porcentaje';
+                const distintos = propio ? col.dic.length : 0;
+                return {
+                    col,
+                    dic: propio ? col.dic : [],
+                    codigos: propio ? col.codigos : new Int32Array(numFilas),
+                    posiciones: propio ? null : new Map(),
+                    bits: distintos <= MAX_BITSETS
+                        ? Array.from({ length: distintos }, () => new Uint32Array(palabras)) : null,
+                };
+            });
+
+            for (let i = 0; i < numFilas; i++) {
+                const palabra = i >>> 5, bit = 1 << (i & 31);
+                for (const ix of indice) {
+                    let k;
+                    if (ix.posiciones) {
+                        const texto = etiqueta(ix.col, valor(ix.col, i));
+                        k = ix.posiciones.get(texto);
+                        if (k === undefined) {
+                            k = ix.dic.length;
+                            ix.posiciones.set(texto, k);
+                            ix.dic.push(texto);
+                            if (ix.bits && ix.bits.length < MAX_BITSETS) ix.bits.push(new Uint32Array(palabras));
+                            else ix.bits = null;
+                        }
+                        ix.codigos[i] = k;
+                    } else {
+                        k = ix.codigos[i];
+                    }
+                    if (ix.bits) ix.bits[k][palabra] |= bit;
+                }
+            }
+
+            indice.forEach(ix => {
+                ix.posiciones = null;
+                ix.conteos = new Int32Array(ix.dic.length);
+                if (ix.bits) ix.bits.forEach((b, k) => { ix.conteos[k] = contarBits(b); });
+                else for (let i = 0; i < numFilas; i++) ix.conteos[ix.codigos[i]]++;
+            });
+        }
+
+        function contarBits(bits) {
+            let n = 0;
+            for (let w = 0; w < bits.length; w++) {
+                let v = bits[w] - ((bits[w] >>> 1) & 0x55555555);
+                v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+                n += (((v + (v >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+            }
+            return n;
+        }
+
+        function todasLasFilas() {
+            const mascara = new Uint32Array(palabras).fill(0xFFFFFFFF);
+            if (numFilas & 31) mascara[palabras - 1] = (1 << (numFilas & 31)) - 1;
+            return mascara;
+        }
+
+        // Filas que pasan el filtro de una columna, como bitset
+        function mascaraColumna(c, aceptados) {
+            const ix = indice[c];
+            const seleccion = new Set(aceptados);
+            const elegidos = [];
+            ix.dic.forEach((v, k) => { if (seleccion.has(v)) elegidos.push(k); });
+            const mascara = new Uint32Array(palabras);
+            if (ix.bits) {
+                // Se unen los bitsets de los valores aceptados o, si son más, los
+                // de los rechazados y se invierte
+                const invertir = elegidos.length > ix.dic.length / 2;
+                const unir = invertir ? ix.dic.map((_, k) => k).filter(k => !seleccion.has(ix.dic[k])) : elegidos;
+                for (const k of unir) {
+                    const bits = ix.bits[k];
+                    for (let w = 0; w < palabras; w++) mascara[w] |= bits[w];
+                }
+                if (invertir) {
+                    const todas = todasLasFilas();
+                    for (let w = 0; w < palabras; w++) mascara[w] = ~mascara[w] & todas[w];
+                }
+            } else {
+                const permitido = new Uint8Array(ix.dic.length);
+                elegidos.forEach(k => { permitido[k] = 1; });
+                for (let i = 0; i < numFilas; i++) {
+                    if (permitido[ix.codigos[i]]) mascara[i >>> 5] |= 1 << (i & 31);
+                }
+            }
+            return mascara;
+        }
+
+        // Intersección de los filtros (filtros: [[columna, valores aceptados]]),
+        // opcionalmente sin el de una columna
+        function mascaraFiltros(filtros, excepto = -1) {
+            const mascara = todasLasFilas();
+            for (const [c, aceptados] of filtros) {
+                if (c === excepto) continue;
+                const columna = mascaraColumna(c, aceptados);
+                for (let w = 0; w < palabras; w++) mascara[w] &= columna[w];
+            }
+            return mascara;
+        }
+
+        function filtrarFilas(filtros) {
+            if (filtros.length === 0) {
+                const filas = new Int32Array(numFilas);
+                for (let i = 0; i < numFilas; i++) filas[i] = i;
+                return filas;
+            }
+            const mascara = mascaraFiltros(filtros);
+            const filas = new Int32Array(contarBits(mascara));
+            let j = 0;
+            for (let w = 0; w < palabras; w++) {
+                let v = mascara[w];
+                while (v) {
+                    const bajo = v & -v;
+                    filas[j++] = (w << 5) + (31 - Math.clz32(bajo));
+                    v ^= bajo;
+                }
+            }
+            return filas;
+        }
+
+        // Valores distintos de una columna (en el orden de la columna) con
+        // cuántas filas tienen cada uno entre las que pasan los filtros de las
+        // demás columnas
+        function valoresColumna(c, filtros) {
+            const ix = indice[c];
+            let conteos = ix.conteos;
+            const otros = filtros.filter(([otra]) => otra !== c);
+            if (otros.length) {
+                const mascara = mascaraFiltros(otros);
+                conteos = new Int32Array(ix.dic.length);
+                if (ix.bits) {
+                    const cruce = new Uint32Array(palabras);
+                    ix.bits.forEach((bits, k) => {
+                        for (let w = 0; w < palabras; w++) cruce[w] = bits[w] & mascara[w];
+                        conteos[k] = contarBits(cruce);
+                    });
+                } else {
+                    for (let i = 0; i < numFilas; i++) {
+                        if (mascara[i >>> 5] & (1 << (i & 31))) conteos[ix.codigos[i]]++;
+                    }
+                }
+            }
+            // Mismo orden que la columna ascendente: la llave de cada valor es la
+            // de su primera fila (collator o número/fecha; vacíos al final)
+            const llaves = llavesColumna(c);
+            const llaveValor = new Float64Array(ix.dic.length).fill(NaN);
+            const visto = new Uint8Array(ix.dic.length);
+            for (let i = 0; i < numFilas; i++) {
+                const k = ix.codigos[i];
+                if (!visto[k]) { visto[k] = 1; llaveValor[k] = llaves[i]; }
+            }
+            const orden = ix.dic.map((_, k) => k).sort((a, b) => {
+                const x = llaveValor[a], y = llaveValor[b];
+                if (x !== x || y !== y) return (x !== x) - (y !== y) || a - b;
+                return x - y || a - b;
+            });
+            return { valores: orden.map(k => ix.dic[k]), conteos: orden.map(k => conteos[k]) };
+        }
+
+        // Cada columna se clasifica una vez (número, fecha o texto) sobre sus
+        // valores distintos y sus llaves quedan en un Float64Array por fila:
+        // los textos como su rango según el collator en español (acentos y
+        // mayúsculas no cuentan), los vacíos como NaN (siempre al final).
+        const collator = new Intl.Collator('es', { sensitivity: 'base', numeric: true });
+        const RE_FECHA_ISO = /^(\\d{4})-(\\d{2})-(\\d{2})(?:[ T](\\d{2}):(\\d{2})(?::(\\d{2}))?)?/;
+        const RE_FECHA_DMY = /^(\\d{1,2})\\/(\\d{1,2})\\/(\\d{4})$/;
+
+        function aFecha(texto) {
+            let m = RE_FECHA_ISO.exec(texto);
+            if (m) return Date.UTC(+m[1], m[2] - 1, +m[3], +(m[4] || 0), +(m[5] || 0), +(m[6] || 0));
+            m = RE_FECHA_DMY.exec(texto);
+            if (m) return Date.UTC(+m[3], m[2] - 1, +m[1]);
+            return NaN;
+        }
+
+        function aNumero(texto) {
+            const limpio = String(texto).replace(/[$,%\\s]/g, '');
+            return limpio === '' ? NaN : Number(limpio);
+        }
+
+        function tipoOrden(col, distintos) {
+            if (col.tipo === 'moneda' || col.tipo === 'porcentaje') return 'numero';
+            const llenos = distintos.filter(v => String(v).trim() !== '');
+            if (llenos.length === 0) return 'texto';
+            if (llenos.every(v => !isNaN(aNumero(v)))) return 'numero';
+            if (llenos.every(v => !isNaN(aFecha(String(v).trim())))) return 'fecha';
+            return 'texto';
+        }
+
+        function llavesColumna(c) {
+            if (llavesOrden[c]) return llavesOrden[c];
+            const col = columnas[c];
+            const llaves = new Float64Array(numFilas);
+            if (col.tipo === 'moneda') {
+                for (let i = 0; i < numFilas; i++) llaves[i] = col.valores[i] || 0;
+            } else if (col.tipo === 'porcentaje') {
+                for (let i = 0; i < numFilas; i++) llaves[i] = col.valores[i] ?? NaN;
+            } else {
+                // Texto: la llave se calcula por valor distinto y se expande con los códigos
+                const { dic, codigos } = indice[c];
+                const tipo = tipoOrden(col, dic);
+                let rangos;
+                if (tipo === 'numero') {
+                    rangos = dic.map(aNumero);
+                } else if (tipo === 'fecha') {
+                    rangos = dic.map(v => aFecha(String(v).trim()));
+                } else {
+                    const posiciones = dic.map((_, k) => k).sort((a, b) => collator.compare(dic[a], dic[b]));
+                    rangos = new Float64Array(dic.length);
+                    posiciones.forEach((k, p) => {
+                        // Valores iguales para el collator comparten rango (empatan)
+                        const anterior = posiciones[p - 1];
+                        rangos[k] = p > 0 && collator.compare(dic[anterior], dic[k]) === 0 ? rangos[anterior] : p;
+                    });
+                    dic.forEach((v, k) => { if (String(v).trim() === '') rangos[k] = NaN; });
+                }
+                for (let i = 0; i < numFilas; i++) llaves[i] = rangos[codigos[i]];
+            }
+            llavesOrden[c] = llaves;
+            return llaves;
+        }
+
+        // Orden estable sobre índices: compara las llaves de cada criterio
+        // ({col, asc}) en orden y desempata por posición original
+        function ordenarFilas(filas, orden) {
+            if (orden.length === 0) return filas;
+            const criterios = orden.map(o => ({ llaves: llavesColumna(o.col), signo: o.asc ? 1 : -1 }));
+            return filas.sort((a, b) => {
+                for (const { llaves, signo } of criterios) {
+                    const x = llaves[a], y = llaves[b];
+                    const xVacio = x !== x, yVacio = y !== y;
+                    if (xVacio || yVacio) {
+                        if (xVacio && yVacio) continue;
+                        return xVacio ? 1 : -1;
+                    }
+                    if (x !== y) return x < y ? -signo : signo;
+                }
+                return a - b;
+            });
+        }
+
+        self.onmessage = e => {
+            const m = e.data;
+            if (m.tipo === 'datos') {
+                columnas = m.columnas;
+                numFilas = m.filas;
+                llavesOrden = [];
+                indexar();
+            } else if (m.tipo === 'consulta') {
+                const vista = ordenarFilas(filtrarFilas(m.filtros), m.orden);
+                self.postMessage({ id: m.id, vista }, [vista.buffer]);
+            } else if (m.tipo === 'valores') {
+                self.postMessage({ id: m.id, ...valoresColumna(m.col, m.filtros) });
+            }
+        };
+    }
+
     export default function(component) {
         const { data, setTriggerValue, parentElement } = component;
 
+        // Modo servidor: Python manda solo la página pedida (html) más los
+        // totales y las opciones de filtro; el resto del estado vive en Python.
+        const servidor = data !== null && typeof data === 'object' && data.modo === 'servidor';
+        // Modo de datos: Python manda la tabla completa por columnas (los valores
+        // repetidos como diccionario + códigos); aquí se filtra, se ordena y se
+        // pinta con scroll virtual: solo las filas visibles existen en el DOM.
+        const modoDatos = !servidor;
+
+        // Misma tabla con datos nuevos (rerun tras editar o buscar): la diferencia
+        // se aplica por ID sobre el montaje vigente y se conserva su estado
+        if (parentElement.__actualizar && parentElement.__actualizar(component)) return;
+
+        // Quitar lo que dejó el montaje anterior fuera de parentElement
+        if (parentElement.__limpiar) parentElement.__limpiar();
         parentElement.innerHTML = '';
 
         const newElement = document.createElement('div');
         parentElement.appendChild(newElement);
-        newElement.innerHTML = data;
+        newElement.innerHTML = servidor ? data.html : esqueletoDatos(data);
 
-        let PAGE_SIZE = 15;
-        let currentPage = 0;
+        let PAGE_SIZE = servidor ? data.tamano : 15;
+        let currentPage = servidor ? data.pagina : 0;
 
         const FUNNEL_SVG = '<svg viewBox="0 0 16 16" fill="currentColor" style="width:11px;height:11px;display:block;"><path d="M1.5 1.5A.5.5 0 0 1 2 1h12a.5.5 0 0 1 .5.5v2a.5.5 0 0 1-.128.334L10 8.692V13.5a.5.5 0 0 1-.342.474l-3 1A.5.5 0 0 1 6 14.5V8.692L1.628 3.834A.5.5 0 0 1 1.5 3.5z"/></svg>';
 
+        // ── PLANTILLAS DEL MODO DE DATOS ──────────────────────────────────────
+        function esc(valor) {
+            return String(valor ?? '').replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+
+        const numeros = formatoNumeros();
+
+        // Mismas iniciales que avatar_html: primera letra de las dos primeras palabras
+        function iniciales(nombre) {
+            return String(nombre).split(/\\s+/).filter(Boolean).slice(0, 2).map(p => p[0]).join('').toUpperCase();
+        }
+
+        // Una plantilla por tipo de columna: reciben el valor y, si la columna
+        // viene como diccionario, la posición del valor (para clase o color).
+        const plantillas = {
+            texto: v => `<td>${esc(v)}</td>`,
+            moneda: v => `<td class="cell-numeric" data-value="${numeros.valorMoneda(v)}">${numeros.moneda(v)}</td>`,
+            porcentaje: v => v === null || v === undefined
+                ? '<td class="cell-numeric" data-value="-1">—</td>'
+                : `<td class="cell-numeric" data-value="${numeros.valorPorcentaje(v)}">${numeros.porcentaje(v)}</td>`,
+            badge: (v, k, col) => `<td data-value="${esc(v)}"><span class="badge-soft ${col.clases[k]}">${esc(v)}</span></td>`,
+            avatar: (v, k, col) => {
+                if (!v) return '<td data-value=""></td>';
+                const [bg, fg] = col.colores[k];
+                return `<td data-value="${esc(v)}"><span style="display:inline-flex;align-items:center;gap:8px;">` +
+                    `<span style="display:inline-flex;align-items:center;justify-content:center;` +
+                    `width:24px;height:24px;border-radius:50%;background:${bg};color:${fg};` +
+                    `font-size:10.5px;font-weight:700;flex-shrink:0;">${esc(iniciales(v))}</span>` +
+                    `<span>${esc(v)}</span></span></td>`;
+            }
+        };
+
+        // ── MODO DE DATOS: columnas y filas ───────────────────────────────────
+        let columnas = modoDatos ? data.columnas : [];
+        let numFilas = modoDatos ? data.filas : 0;
+        let ids      = modoDatos ? data.ids || [] : [];
+        const botones  = (modoDatos ? data.acciones || [] : []).map(a => [
+            `<a data-link="${esc(a.prefijo)}_`,
+            `" class="${esc(a.clase)}" title="${esc(a.titulo)}">${a.icono}</a>`
+        ]);
+        // Fragmentos por valor distinto de las columnas con diccionario (se arman al primer uso)
+        let fragmentos = columnas.map(() => null);
+
+        function celda(c, i) {
+            const col = columnas[c];
+            const plantilla = plantillas[col.tipo] || plantillas.texto;
+            if (!col.codigos) return plantilla(col.valores[i], null, col);
+            if (!fragmentos[c]) fragmentos[c] = col.dic.map((v, k) => plantilla(v, k, col));
+            return fragmentos[c][col.codigos[i]];
+        }
+
+        // Contenido (<td>s) de la fila i de los datos
+        function filaHTML(i) {
+            let fila = '';
+            for (let c = 0; c < columnas.length; c++) fila += celda(c, i);
+            if (botones.length) {
+                const id = esc(ids[i]);
+                fila += '<td>' + botones.map(([antes, despues]) => antes + id + despues).join('') + '</td>';
+            }
+            return fila;
+        }
+
+        function esqueletoDatos(datos) {
+            let encabezado = datos.columnas.map(c => `<th>${esc(c.nombre)}</th>`).join('');
+            if ((datos.acciones || []).length) encabezado += '<th>Acción</th>';
+            return '<style>.tabla-virtual td { white-space: nowrap; }' +
+                '.tabla-virtual thead th { position: sticky; top: 0; z-index: 3; }</style>' +
+                '<div class="table-card"><table class="responsive-table tabla-virtual"><thead><tr>' +
+                encabezado + '</tr></thead><tbody></tbody></table></div>';
+        }
+
         // ── SCROLL HORIZONTAL: envolver la tabla en un div scrolleable ────────
         const table = newElement.querySelector('table');
         const scrollWrapper = document.createElement('div');
@@ -35,46 +471,227 @@ def estilo_tabla_js():
         if (thead) thead.style.overflow = 'visible';
 
         const headers = Array.from(table.querySelectorAll('thead th'));
-        const allRows = Array.from(table.querySelectorAll('tbody tr'));
         const tbody   = table.querySelector('tbody');
 
-        const skipFilterColumns = ['Acción', 'Teléfono', 'Email'];
+        const skipFilterColumns = ['Acción', 'Teléfono', 'Email', 'PROB. CIERRE'];
         const skipSortColumns   = ['Acción'];
 
+        const headerNames = headers.map(h => h.textContent.trim());
         const activeFilters = {};
-        let sortState = { col: null, asc: true };
-
-        // Celdas con contenido enriquecido (avatares, badges) exponen el valor
-        // real en data-value para que filtro/orden no lean el texto compuesto.
-        function cellText(row, colIndex) {
-            const cell = row.cells[colIndex];
-            if (!cell) return '';
-            return cell.dataset.value !== undefined ? cell.dataset.value : cell.textContent.trim();
-        }
-
-        // ── FILTRAR + ORDENAR (sobre TODAS las filas, no solo la página) ───────
-        function getFilteredRows() {
-            return allRows.filter(row =>
-                Object.entries(activeFilters).every(([colIndex, selectedValues]) => {
-                    if (selectedValues.size === 0) return true;
-                    return selectedValues.has(cellText(row, colIndex));
-                })
-            );
-        }
-
-        function sortRows(rows) {
-            if (sortState.col === null) return rows;
-            const colIndex = sortState.col;
-            return [...rows].sort((a, b) => {
-                const aText = cellText(a, colIndex).toLowerCase();
-                const bText = cellText(b, colIndex).toLowerCase();
-                const aNum  = parseFloat(aText.replace(/[$,]/g, ''));
-                const bNum  = parseFloat(bText.replace(/[$,]/g, ''));
-                const isNumeric = !isNaN(aNum) && !isNaN(bNum);
-
-                return sortState.asc
-                    ? (isNumeric ? aNum - bNum : aText.localeCompare(bText))
-                    : (isNumeric ? bNum - aNum : bText.localeCompare(aText));
+        // Criterios de orden [{col, asc}]: el primero es la llave principal;
+        // shift+clic en un encabezado agrega llaves secundarias
+        let sortState = [];
+
+        if (servidor) {
+            (data.orden || []).forEach(o => {
+                const i = headerNames.indexOf(o.col);
+                if (i >= 0) sortState.push({ col: i, asc: o.asc !== false });
+            });
+            Object.entries(data.filtros || {}).forEach(([name, values]) => {
+                const i = headerNames.indexOf(name);
+                if (i >= 0) activeFilters[i] = values.length === 0 ? new Set(['__ninguno__']) : new Set(values);
+            });
+        }
+
+        // ── CONSULTA AL SERVIDOR: página, orden y filtros van a Python ───────
+        function consultar() {
+            const filtros = {};
+            Object.entries(activeFilters).forEach(([i, values]) => {
+                if (values.size === 0) return;
+                filtros[headerNames[i]] = values.has('__ninguno__') ? [] : [...values];
+            });
+            setTriggerValue('consulta', {
+                pagina: currentPage,
+                tamano: PAGE_SIZE,
+                orden: sortState.map(o => ({ col: headerNames[o.col], asc: o.asc })),
+                filtros
+            });
+        }
+
+        // Cada cambio de estado: en modo servidor se pide la página, si no se
+        // recalcula la vista y se vuelve al inicio del scroll
+        function actualizar(conservarScroll = false) {
+            if (servidor) return consultar();
+            const numero = ++consultaVigente;
+            pedir({ tipo: 'consulta', filtros: filtrosMotor(), orden: sortState }).then(r => {
+                // Si mientras tanto se pidió otra consulta, esta respuesta ya no sirve
+                if (numero !== consultaVigente) return;
+                vista = r.vista;
+                if (!conservarScroll) scrollWrapper.scrollTop = 0;
+                render();
+            });
+        }
+
+        // ── MOTOR EN WEB WORKER (modo de datos) ───────────────────────────────
+        // El Worker guarda su copia de las columnas; filtrar, ordenar y sacar
+        // valores únicos corre allá y la vista (Int32Array) vuelve transferida.
+        // Si el navegador no permite el Worker (p. ej. por CSP), el mismo motor
+        // corre aquí con la misma interfaz de mensajes.
+        let motor = null;
+        let urlMotor = null;
+        let consultaVigente = 0;
+        let siguienteId = 0;
+        const pendientes = new Map();
+
+        function recibir(e) {
+            const pendiente = pendientes.get(e.data.id);
+            if (!pendiente) return;
+            pendientes.delete(e.data.id);
+            pendiente.resolver(e.data);
+        }
+
+        function motorLocal() {
+            const principal = { onmessage: null, terminate() {} };
+            const interno = { postMessage: m => setTimeout(() => principal.onmessage({ data: m })) };
+            motorTabla(interno);
+            principal.postMessage = m => setTimeout(() => interno.onmessage({ data: m }));
+            principal.onmessage = recibir;
+            return principal;
+        }
+
+        function mensajeDatos() {
+            return { tipo: 'datos', columnas, filas: numFilas };
+        }
+
+        function iniciarMotor() {
+            try {
+                urlMotor = URL.createObjectURL(new Blob([`${formatoNumeros.toString()}\\n(${motorTabla.toString()})(self);`], { type: 'text/javascript' }));
+                motor = new Worker(urlMotor);
+                motor.onmessage = recibir;
+                motor.onerror = () => {
+                    // El Worker no pudo arrancar: se pasa al motor local y se reenvía lo pendiente
+                    motor.terminate();
+                    motor = motorLocal();
+                    motor.postMessage(mensajeDatos());
+                    pendientes.forEach(p => motor.postMessage(p.mensaje));
+                };
+            } catch (e) {
+                motor = motorLocal();
+            }
+            motor.postMessage(mensajeDatos());
+        }
+
+        function pedir(mensaje) {
+            const id = ++siguienteId;
+            return new Promise(resolver => {
+                pendientes.set(id, { resolver, mensaje: { ...mensaje, id } });
+                motor.postMessage({ ...mensaje, id });
+            });
+        }
+
+        // Filtros activos como [[columna, valores aceptados]]
+        function filtrosMotor() {
+            return Object.entries(activeFilters)
+                .filter(([, valores]) => valores.size > 0)
+                .map(([c, valores]) => [Number(c), [...valores]]);
+        }
+
+        // Valores de una columna y filas por valor (bajo los filtros de las demás)
+        function valoresUnicos(colIndex) {
+            if (servidor) {
+                const nombre = headerNames[colIndex];
+                return Promise.resolve({
+                    valores: data.opciones[nombre] || [],
+                    conteos: (data.conteos || {})[nombre] || null
+                });
+            }
+            return pedir({ tipo: 'valores', col: colIndex, filtros: filtrosMotor() });
+        }
+
+        // ── SCROLL VIRTUAL (modo de datos) ────────────────────────────────────
+        // El área tiene alto fijo; dos filas espaciadoras ocupan el alto de las
+        // filas que no se pintan y los <tr> de la ventana se reciclan al desplazar.
+        const ALTO_VISTA  = 560;   // alto máximo del área con scroll (px)
+        const FILAS_EXTRA = 12;    // filas pintadas arriba y abajo de las visibles
+        let altoFila = 41;
+        let altoMedido = false;
+        let vista = [];            // índices de fila filtrados y ordenados
+        let filasDOM = [];         // <tr> de la ventana actual, en orden
+
+        // Llave de cada <tr>: el ID del registro (sobrevive a cambios de datos)
+        function llaveFila(i) {
+            return ids.length ? ids[i] : i;
+        }
+
+        function espaciador() {
+            const tr = document.createElement('tr');
+            const td = document.createElement('td');
+            td.colSpan = headers.length;
+            td.style.cssText = 'padding:0; border:0; background:transparent;';
+            tr.appendChild(td);
+            return tr;
+        }
+        const espacioArriba = modoDatos ? espaciador() : null;
+        const espacioAbajo  = modoDatos ? espaciador() : null;
+        if (modoDatos) {
+            scrollWrapper.style.overflowY = 'auto';
+            scrollWrapper.style.maxHeight = ALTO_VISTA + 'px';
+            tbody.append(espacioArriba, espacioAbajo);
+        }
+
+        function ventana() {
+            const alto = thead ? thead.offsetHeight : 0;
+            let inicio = Math.max(0, Math.floor(Math.max(0, scrollWrapper.scrollTop - alto) / altoFila) - FILAS_EXTRA);
+            inicio -= inicio % 2;   // inicio par: el zebra (nth-child) no cambia al desplazar
+            const fin = Math.min(vista.length, inicio + Math.ceil(ALTO_VISTA / altoFila) + 2 * FILAS_EXTRA);
+            return [inicio, fin];
+        }
+
+        function pintarVentana() {
+            const [inicio, fin] = ventana();
+
+            // Las filas que siguen en la ventana conservan su <tr>; los que
+            // salieron se reutilizan para las filas nuevas.
+            const anteriores = new Map(filasDOM.map(tr => [tr.__llave, tr]));
+            const nuevas = [];
+            for (let k = inicio; k < fin; k++) {
+                const llave = llaveFila(vista[k]);
+                const tr = anteriores.get(llave);
+                if (tr) anteriores.delete(llave);
+                nuevas.push(tr || null);
+            }
+            const libres = [...anteriores.values()];
+            for (let k = 0; k < nuevas.length; k++) {
+                if (nuevas[k]) continue;
+                const tr = libres.pop() || document.createElement('tr');
+                tr.innerHTML = filaHTML(vista[inicio + k]);
+                tr.__fila = vista[inicio + k];
+                tr.__llave = llaveFila(tr.__fila);
+                nuevas[k] = tr;
+            }
+            libres.forEach(tr => tr.remove());
+
+            // Orden en el DOM: solo se mueven los <tr> fuera de lugar
+            let anterior = espacioArriba;
+            nuevas.forEach(tr => {
+                if (anterior.nextSibling !== tr) tbody.insertBefore(tr, anterior.nextSibling);
+                anterior = tr;
+            });
+            filasDOM = nuevas;
+
+            espacioArriba.firstChild.style.height = (inicio * altoFila) + 'px';
+            espacioAbajo.firstChild.style.height  = ((vista.length - fin) * altoFila) + 'px';
+
+            // Alto real de fila (promedio de la primera ventana pintada): si
+            // difiere del estimado se repinta una vez
+            if (!altoMedido && filasDOM.length) {
+                const medido = filasDOM.reduce((suma, tr) => suma + tr.offsetHeight, 0) / filasDOM.length;
+                if (medido > 0) {
+                    altoMedido = true;
+                    if (Math.abs(medido - altoFila) > 0.5) {
+                        altoFila = medido;
+                        pintarVentana();
+                    }
+                }
+            }
+        }
+
+        let scrollPendiente = false;
+        if (modoDatos) {
+            scrollWrapper.addEventListener('scroll', () => {
+                if (scrollPendiente) return;
+                scrollPendiente = true;
+                requestAnimationFrame(() => { scrollPendiente = false; render(); });
             });
         }
 
@@ -95,7 +712,7 @@ def estilo_tabla_js():
             border:1px solid #ced4da; border-radius:6px; padding:4px 8px;
             font-size:12px; color:#495057; background:#fff; cursor:pointer;
         `;
-        [15, 25, 50, 100].forEach(n => {
+        [...new Set([15, 25, 50, 100, PAGE_SIZE])].sort((a, b) => a - b).forEach(n => {
             const opt = document.createElement('option');
             opt.value = String(n);
             opt.textContent = `${n} filas`;
@@ -105,7 +722,7 @@ def estilo_tabla_js():
         pageSizeSelect.addEventListener('change', () => {
             PAGE_SIZE = parseInt(pageSizeSelect.value, 10);
             currentPage = 0;
-            render();
+            actualizar();
         });
 
         const btnPrev = document.createElement('button');
@@ -125,46 +742,49 @@ def estilo_tabla_js():
         pagerPageInfo.style.cssText = 'color:#495057; font-weight:500;';
 
         pagerControls.append(pageSizeSelect, btnPrev, pagerPageInfo, btnNext);
+        // Con scroll virtual no hay páginas: solo se muestra el rango visible
+        if (modoDatos) pagerControls.style.display = 'none';
         pager.append(pagerInfo, pagerControls);
         scrollWrapper.parentNode.insertBefore(pager, scrollWrapper.nextSibling);
 
-        btnPrev.addEventListener('click', () => { if (currentPage > 0) { currentPage--; render(); } });
-        btnNext.addEventListener('click', () => { currentPage++; render(); });
+        btnPrev.addEventListener('click', () => { if (currentPage > 0) { currentPage--; actualizar(); } });
+        btnNext.addEventListener('click', () => { currentPage++; actualizar(); });
 
-        // ── RENDER: filtra → ordena → pagina → pinta ──────────────────────────
+        // ── RENDER ────────────────────────────────────────────────────────────
         function render() {
-            const filtered = getFilteredRows();
-            const sorted   = sortRows(filtered);
-            const totalItems = sorted.length;
-            const totalPages = Math.max(1, Math.ceil(totalItems / PAGE_SIZE));
-
-            if (currentPage >= totalPages) currentPage = totalPages - 1;
-            if (currentPage < 0) currentPage = 0;
-
-            const start = currentPage * PAGE_SIZE;
-            const pageRows = sorted.slice(start, start + PAGE_SIZE);
-            const pageRowSet = new Set(pageRows);
-
-            sorted.forEach(row => tbody.appendChild(row));
-            allRows.forEach(row => { row.style.display = pageRowSet.has(row) ? '' : 'none'; });
-
-            const rangeStart = totalItems === 0 ? 0 : start + 1;
-            const rangeEnd   = Math.min(start + PAGE_SIZE, totalItems);
-            pagerInfo.textContent = `${rangeStart}–${rangeEnd} de ${totalItems} registro${totalItems === 1 ? '' : 's'}`;
-            pagerPageInfo.textContent = `${currentPage + 1}/${totalPages}`;
-
-            btnPrev.disabled = currentPage === 0;
-            btnNext.disabled = currentPage >= totalPages - 1;
-            [btnPrev, btnNext].forEach(b => {
-                b.style.opacity = b.disabled ? '0.5' : '1';
-                b.style.cursor  = b.disabled ? 'default' : 'pointer';
-            });
+            if (modoDatos) {
+                pintarVentana();
+                const total = vista.length;
+                const alto = thead ? thead.offsetHeight : 0;
+                const primera = Math.min(total, Math.floor(Math.max(0, scrollWrapper.scrollTop) / altoFila));
+                const ultima = Math.min(total, primera + Math.max(1, Math.floor((scrollWrapper.clientHeight - alto) / altoFila)));
+                pagerInfo.textContent = `${total === 0 ? 0 : primera + 1}–${ultima} de ${total} registro${total === 1 ? '' : 's'}`;
+            } else {
+                // En modo servidor las filas ya son la página: solo se pinta el paginador
+                const totalItems = data.total;
+                const totalPages = Math.max(1, Math.ceil(totalItems / PAGE_SIZE));
+                const start = currentPage * PAGE_SIZE;
+
+                const rangeStart = totalItems === 0 ? 0 : start + 1;
+                const rangeEnd   = Math.min(start + PAGE_SIZE, totalItems);
+                pagerInfo.textContent = `${rangeStart}–${rangeEnd} de ${totalItems} registro${totalItems === 1 ? '' : 's'}`;
+                pagerPageInfo.textContent = `${currentPage + 1}/${totalPages}`;
+
+                btnPrev.disabled = currentPage === 0;
+                btnNext.disabled = currentPage >= totalPages - 1;
+                [btnPrev, btnNext].forEach(b => {
+                    b.style.opacity = b.disabled ? '0.5' : '1';
+                    b.style.cursor  = b.disabled ? 'default' : 'pointer';
+                });
+            }
 
             headers.forEach((h, i) => {
                 const span = h.querySelector('.sort-indicator');
                 if (!span) return;
-                if (sortState.col === i) {
-                    span.textContent = sortState.asc ? '▲' : '▼';
+                const posicion = sortState.findIndex(o => o.col === i);
+                if (posicion >= 0) {
+                    // Con varias llaves se numera su prioridad
+                    span.textContent = (sortState[posicion].asc ? '▲' : '▼') + (sortState.length > 1 ? posicion + 1 : '');
                     span.style.opacity = '1';
                 } else {
                     span.textContent = '⇅';
@@ -174,9 +794,9 @@ def estilo_tabla_js():
         }
 
         // ── UPDATE BUTTON APPEARANCE ──────────────────────────────────────────
-        function updateFilterBtn(btn, colIndex, uniqueValues, checkboxes) {
+        function updateFilterBtn(btn, checkboxes) {
             const selectedCount = checkboxes.filter(c => c.checked).length;
-            const total         = uniqueValues.length;
+            const total         = checkboxes.length;
             const isFiltered    = selectedCount < total;
 
             if (isFiltered) {
@@ -195,13 +815,18 @@ def estilo_tabla_js():
             try { return window.top.document; } catch(e) { return document; }
         }
 
+        // Dropdowns creados en este montaje (viven en el documento top)
+        const dropdowns = [];
+        // Vacían la lista de valores de cada dropdown cuando cambian los datos
+        const reiniciosDropdown = [];
+
         // ── BUILD DROPDOWN ────────────────────────────────────────────────────
         // Se adjunta al <body> del documento TOP para salir completamente
         // de los límites del iframe de Streamlit.
+        // La lista de valores se arma al abrirlo por primera vez: con tablas
+        // grandes no se crean miles de checkboxes por columna al montar.
         function buildDropdown(th, colIndex) {
-            const uniqueValues = [...new Set(
-                allRows.map(row => cellText(row, colIndex))
-            )].sort();
+            let uniqueValues = null;
 
             const wrapper = document.createElement('div');
             wrapper.style.cssText = 'position:relative; display:inline-block; margin-left:6px;';
@@ -259,67 +884,108 @@ def estilo_tabla_js():
             dropdown.appendChild(hr);
 
             const checkboxes = [];
-            uniqueValues.forEach(val => {
-                const label = topDoc.createElement('label');
-                label.style.cssText = `
-                    display:flex; align-items:center; gap:8px; padding:5px 4px;
-                    cursor:pointer; color:#343a40; border-radius:5px; transition:background 0.1s;
-                `;
-                label.onmouseenter = () => label.style.background = '#f8f9fa';
-                label.onmouseleave = () => label.style.background = '';
-
-                const cb = topDoc.createElement('input');
-                cb.type    = 'checkbox';
-                cb.value   = val;
-                cb.checked = true;
-                cb.style.cssText = 'accent-color:#0d6efd; width:14px; height:14px; flex-shrink:0;';
-                checkboxes.push(cb);
-
-                const text = topDoc.createElement('span');
-                text.style.fontSize = '12.5px';
-
-                const statusColors = {
-                    'PERDIDO':    { bg: '#f8d7da', fg: '#842029' },
-                    'GANADO':     { bg: '#d1e7dd', fg: '#0f5132' },
-                    'EN PROCESO': { bg: '#fff3cd', fg: '#664d03' }
-                };
-                if (statusColors[val]) {
-                    const c = statusColors[val];
-                    text.innerHTML = `<span style="background:${c.bg};color:${c.fg};
-                        padding:2px 9px;border-radius:999px;font-size:11px;font-weight:600;">${val}</span>`;
-                } else {
-                    text.textContent = val || '(vacío)';
+            // Los valores llegan del motor (o de las opciones del servidor) al abrir
+            // Al abrir de nuevo solo se refrescan los conteos "(n)"
+            let cargando = null;
+            const conteosSpan = [];
+            function mostrarConteos(conteos) {
+                if (conteos) conteosSpan.forEach((span, k) => { span.textContent = `(${conteos[k]})`; });
+            }
+            function poblar() {
+                if (cargando) {
+                    cargando.then(() => valoresUnicos(colIndex)).then(r => mostrarConteos(r.conteos));
+                    return cargando;
                 }
+                const aviso = topDoc.createElement('div');
+                aviso.style.cssText = 'font-size:12px; color:#6c757d; padding:5px 4px;';
+                aviso.textContent = 'Cargando…';
+                dropdown.appendChild(aviso);
+                const filtro = activeFilters[colIndex];
+                const esta = cargando = valoresUnicos(colIndex).then(({ valores, conteos }) => {
+                    aviso.remove();
+                    // Los datos cambiaron mientras se cargaba: la lista ya no sirve
+                    if (cargando !== esta) return;
+                    uniqueValues = valores;
+                    uniqueValues.forEach(val => {
+                        const label = topDoc.createElement('label');
+                        label.style.cssText = `
+                            display:flex; align-items:center; gap:8px; padding:5px 4px;
+                            cursor:pointer; color:#343a40; border-radius:5px; transition:background 0.1s;
+                        `;
+                        label.onmouseenter = () => label.style.background = '#f8f9fa';
+                        label.onmouseleave = () => label.style.background = '';
+
+                        const cb = topDoc.createElement('input');
+                        cb.type    = 'checkbox';
+                        cb.value   = val;
+                        cb.checked = !filtro || filtro.size === 0 || filtro.has(val);
+                        cb.style.cssText = 'accent-color:#0d6efd; width:14px; height:14px; flex-shrink:0;';
+                        checkboxes.push(cb);
+
+                        const text = topDoc.createElement('span');
+                        text.style.fontSize = '12.5px';
+
+                        const statusColors = {
+                            'PERDIDO':    { bg: '#f8d7da', fg: '#842029' },
+                            'GANADO':     { bg: '#d1e7dd', fg: '#0f5132' },
+                            'EN PROCESO': { bg: '#fff3cd', fg: '#664d03' }
+                        };
+                        if (statusColors[val]) {
+                            const c = statusColors[val];
+                            text.innerHTML = `<span style="background:${c.bg};color:${c.fg};
+                                padding:2px 9px;border-radius:999px;font-size:11px;font-weight:600;">${val}</span>`;
+                        } else {
+                            text.textContent = val || '(vacío)';
+                        }
 
-                cb.addEventListener('change', () => {
-                    const selected = checkboxes.filter(c => c.checked).map(c => c.value);
-                    activeFilters[colIndex] = selected.length === uniqueValues.length
-                        ? new Set() : new Set(selected);
-                    updateFilterBtn(btn, colIndex, uniqueValues, checkboxes);
-                    currentPage = 0;
-                    render();
+                        cb.addEventListener('change', () => {
+                            const selected = checkboxes.filter(c => c.checked).map(c => c.value);
+                            activeFilters[colIndex] = selected.length === uniqueValues.length
+                                ? new Set() : new Set(selected);
+                            updateFilterBtn(btn, checkboxes);
+                            currentPage = 0;
+                            actualizar();
+                        });
+
+                        const conteo = topDoc.createElement('span');
+                        conteo.style.cssText = 'margin-left:auto; padding-left:10px; font-size:11px; color:#adb5bd;';
+                        conteosSpan.push(conteo);
+
+                        label.append(cb, text, conteo);
+                        dropdown.appendChild(label);
+                        etiquetas.push(label);
+                    });
+                    mostrarConteos(conteos);
                 });
+                return cargando;
+            }
 
-                label.append(cb, text);
-                dropdown.appendChild(label);
+            // Con datos nuevos la lista se vuelve a armar al abrir (el filtro se conserva)
+            const etiquetas = [];
+            reiniciosDropdown.push(() => {
+                cargando = null;
+                etiquetas.forEach(l => l.remove());
+                etiquetas.length = 0;
+                checkboxes.length = 0;
+                conteosSpan.length = 0;
             });
 
             btnTodos.addEventListener('click', e => {
                 e.stopPropagation();
                 checkboxes.forEach(cb => cb.checked = true);
                 activeFilters[colIndex] = new Set();
-                updateFilterBtn(btn, colIndex, uniqueValues, checkboxes);
+                updateFilterBtn(btn, checkboxes);
                 currentPage = 0;
-                render();
+                actualizar();
             });
 
             btnNinguno.addEventListener('click', e => {
                 e.stopPropagation();
                 checkboxes.forEach(cb => cb.checked = false);
                 activeFilters[colIndex] = new Set(['__ninguno__']);
-                updateFilterBtn(btn, colIndex, uniqueValues, checkboxes);
+                updateFilterBtn(btn, checkboxes);
                 currentPage = 0;
-                render();
+                actualizar();
             });
 
             btn.addEventListener('click', e => {
@@ -329,6 +995,7 @@ def estilo_tabla_js():
                 topDoc.querySelectorAll('.st-filter-dropdown').forEach(d => d.style.display = 'none');
 
                 if (!isOpen) {
+                    poblar();
                     // Coordenadas del botón en el viewport del iframe
                     const btnRect = btn.getBoundingClientRect();
 
@@ -374,8 +1041,12 @@ def estilo_tabla_js():
 
             // Adjuntar al body del doc top — completamente fuera del iframe
             topDoc.body.appendChild(dropdown);
+            dropdowns.push(dropdown);
             wrapper.append(btn);
             th.appendChild(wrapper);
+            if (activeFilters[colIndex] && activeFilters[colIndex].size > 0) {
+                poblar().then(() => updateFilterBtn(btn, checkboxes));
+            }
         }
 
         // ── BUILD SORT ────────────────────────────────────────────────────────
@@ -392,13 +1063,15 @@ def estilo_tabla_js():
                 if (e.target.tagName === 'INPUT') return;
                 if (e.target.classList.contains('filter-btn')) return;
 
-                if (sortState.col === colIndex) {
-                    sortState.asc = !sortState.asc;
+                const actual = sortState.findIndex(o => o.col === colIndex);
+                if (e.shiftKey) {
+                    // Shift+clic: agrega la columna como llave secundaria (o invierte la suya)
+                    if (actual >= 0) sortState[actual].asc = !sortState[actual].asc;
+                    else sortState.push({ col: colIndex, asc: true });
                 } else {
-                    sortState.col = colIndex;
-                    sortState.asc = true;
+                    sortState = [{ col: colIndex, asc: actual === 0 ? !sortState[0].asc : true }];
                 }
-                render();
+                actualizar();
             });
         }
 
@@ -411,7 +1084,8 @@ def estilo_tabla_js():
                 width:5px; height:100%;
                 cursor:col-resize; user-select:none; z-index:10;
             `;
-            th.style.position = 'relative';
+            // En modo de datos el encabezado es sticky (también posicionado)
+            if (!modoDatos) th.style.position = 'relative';
             th.appendChild(handle);
 
             let startX, startWidth;
@@ -453,6 +1127,12 @@ def estilo_tabla_js():
             buildResizable(th);
         });
 
+        if (modoDatos) {
+            // Vista inicial sin filtros ni orden: no hace falta esperar al motor
+            vista = new Int32Array(numFilas);
+            for (let i = 0; i < numFilas; i++) vista[i] = i;
+            iniciarMotor();
+        }
         render();
 
         // Cerrar dropdowns al hacer click fuera (tanto en top doc como en iframe)
@@ -461,10 +1141,89 @@ def estilo_tabla_js():
         topDoc.addEventListener('click', closeAll);
         document.addEventListener('click', closeAll);
 
+        // ── ACTUALIZACIÓN INCREMENTAL (modo de datos) ─────────────────────────
+        // Python manda la versión del contenido; si cambió y las columnas son
+        // las mismas, se comparan las filas por ID: solo se repintan los <tr>
+        // de registros nuevos o modificados y la vista, el scroll, el orden y
+        // los filtros siguen como estaban.
+        let versionDatos = modoDatos ? data.version : null;
+        let disparar = setTriggerValue;
+        const accionesJSON = JSON.stringify(modoDatos ? data.acciones || [] : []);
+
+        function valorCelda(col, i) {
+            return col.codigos ? col.dic[col.codigos[i]] : col.valores[i];
+        }
+
+        function mismaEstructura(nuevo) {
+            return nuevo !== null && typeof nuevo === 'object' && nuevo.modo === 'datos'
+                && ids.length === numFilas && (nuevo.ids || []).length === nuevo.filas
+                && nuevo.columnas.length === columnas.length
+                && nuevo.columnas.every((col, c) => col.nombre === columnas[c].nombre && col.tipo === columnas[c].tipo)
+                && JSON.stringify(nuevo.acciones || []) === accionesJSON;
+        }
+
+        function aplicarDatos(componente) {
+            const nuevo = componente.data;
+            if (!mismaEstructura(nuevo)) return false;
+            disparar = componente.setTriggerValue;
+            if (nuevo.version !== undefined && nuevo.version === versionDatos) return true;
+
+            const anteriores = new Map();
+            for (let i = 0; i < numFilas; i++) anteriores.set(ids[i], i);
+            const posiciones = new Map();
+            const cambiados = new Set();
+            for (let j = 0; j < nuevo.filas; j++) {
+                const id = nuevo.ids[j];
+                posiciones.set(id, j);
+                const i = anteriores.get(id);
+                if (i === undefined || nuevo.columnas.some((col, c) => valorCelda(col, j) !== valorCelda(columnas[c], i))) {
+                    cambiados.add(id);
+                }
+            }
+
+            // Vista provisional: la actual sin los registros borrados; el motor
+            // la recalcula (con los nuevos) bajo el mismo orden y filtros
+            const provisional = [];
+            for (const i of vista) {
+                const j = posiciones.get(ids[i]);
+                if (j !== undefined) provisional.push(j);
+            }
+
+            columnas = nuevo.columnas;
+            numFilas = nuevo.filas;
+            ids = nuevo.ids;
+            fragmentos = columnas.map(() => null);
+            versionDatos = nuevo.version;
+
+            filasDOM.forEach(tr => {
+                const j = posiciones.get(tr.__llave);
+                if (j === undefined) return;
+                tr.__fila = j;
+                if (cambiados.has(tr.__llave)) tr.innerHTML = filaHTML(j);
+            });
+            vista = Int32Array.from(provisional);
+            render();
+
+            motor.postMessage(mensajeDatos());
+            reiniciosDropdown.forEach(reiniciar => reiniciar());
+            actualizar(true);
+            return true;
+        }
+        parentElement.__actualizar = modoDatos ? aplicarDatos : null;
+
+        parentElement.__limpiar = () => {
+            if (motor) motor.terminate();
+            if (urlMotor) URL.revokeObjectURL(urlMotor);
+            dropdowns.forEach(d => d.remove());
+            topDoc.removeEventListener('click', closeAll);
+            document.removeEventListener('click', closeAll);
+        };
+
         // ── BOTONES DE ACCIÓN ─────────────────────────────────────────────────
-        const links = newElement.querySelectorAll('a');
-        links.forEach(link => {
-            link.onclick = () => setTriggerValue('clicked', link.getAttribute('data-link'));
+        // Delegado en la tabla: sirve para los <tr> que se reciclan al desplazar
+        table.addEventListener('click', e => {
+            const link = e.target.closest('a[data-link]');
+            if (link) disparar('clicked', link.getAttribute('data-link'));
         });
     }
     """
@@ -0,0 +1,123 @@
+"""
+Cohortes de clientes por mes de primera venta: recompra y valor de vida (LTV)
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import preparar_proyectos
+
+
+def _mes_ordinal(fechas):
+    """Fechas a meses desde 1970-01 (enteros)"""
+    return fechas.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+
+
+def _a_mes(ordinales):
+    """Meses desde 1970-01 a datetime64 del primer día del mes"""
+    return np.asarray(ordinales, dtype=np.int64).astype('datetime64[M]').astype('datetime64[ns]')
+
+
+def cohortes_clientes(proyectos_data, hoy=None):
+    """
+    Agrupa a los clientes por el mes de su primer proyecto GANADO
+
+    Todo se calcula sobre la clave canónica de cliente (``entidad_id`` si
+    existe, si no el nombre normalizado) con ``np.bincount``,
+    ``np.minimum.at``/``np.maximum.at`` y un ``groupby`` + ``cumsum`` por
+    cohorte y meses desde la primera compra, sin ciclos por cliente.
+
+    Un cliente recompra si tiene otro proyecto GANADO en un mes posterior
+    al de su primera compra.
+
+    Args:
+        proyectos_data: DataFrame de proyectos (historia completa)
+        hoy: Fecha de corte para acotar la curva de cada cohorte (opcional)
+
+    Returns:
+        dict: cohortes (cohorte, clientes, recompra, tasa_recompra, valor,
+        valor_por_cliente), valor_acumulado (cohorte x meses desde la primera
+        compra, valor acumulado por cliente; NaN donde aún no hay historia) y
+        ltv (una fila por cliente, ordenada por valor)
+    """
+    columnas_cohortes = ['cohorte', 'clientes', 'recompra', 'tasa_recompra', 'valor', 'valor_por_cliente']
+    columnas_ltv = ['cliente', 'cohorte', 'ultima_compra', 'compras', 'meses_con_compra', 'valor',
+                    'ticket_promedio']
+    vacio = {
+        'cohortes': pd.DataFrame(columns=columnas_cohortes),
+        'valor_acumulado': pd.DataFrame(),
+        'ltv': pd.DataFrame(columns=columnas_ltv),
+    }
+
+    if len(proyectos_data) > 0 and 'es_venta' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+    if len(proyectos_data) == 0 or 'es_venta' not in proyectos_data.columns:
+        return vacio
+
+    ganados = proyectos_data[
+        proyectos_data['es_venta'] & proyectos_data['fecha_venta'].notna() & (proyectos_data['cliente_norm'] != '')
+    ]
+    if len(ganados) == 0:
+        return vacio
+
+    clave = ganados['entidad_id'] if 'entidad_id' in ganados.columns else ganados['cliente_norm']
+    codigos, _ = pd.factorize(clave)
+    num_clientes = int(codigos.max()) + 1
+    meses = _mes_ordinal(ganados['fecha_venta'])
+    montos = pd.to_numeric(ganados['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    # Por cliente: mes de primera y última compra, compras y valor
+    primera = np.full(num_clientes, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(primera, codigos, meses)
+    ultima = np.full(num_clientes, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(ultima, codigos, meses)
+    compras = np.bincount(codigos, minlength=num_clientes)
+    valor = np.bincount(codigos, weights=montos, minlength=num_clientes)
+    recompra = ultima > primera
+
+    # Meses distintos con compra por cliente
+    meses_distintos = pd.DataFrame({'cliente': codigos, 'mes': meses}).drop_duplicates()
+    meses_con_compra = np.bincount(meses_distintos['cliente'].to_numpy(), minlength=num_clientes)
+
+    # Nombre mostrado: el de la primera fila de cada cliente
+    primera_fila = np.full(num_clientes, len(codigos), dtype=np.int64)
+    np.minimum.at(primera_fila, codigos, np.arange(len(codigos)))
+    nombres = ganados['cliente_norm'].to_numpy(dtype=object)[primera_fila]
+
+    # Resumen por cohorte
+    cohortes, cohorte_cliente = np.unique(primera, return_inverse=True)
+    clientes_cohorte = np.bincount(cohorte_cliente)
+    recompra_cohorte = np.bincount(cohorte_cliente, weights=recompra).astype(np.int64)
+    valor_cohorte = np.bincount(cohorte_cliente, weights=valor)
+    resumen = pd.DataFrame({
+        'cohorte': _a_mes(cohortes),
+        'clientes': clientes_cohorte,
+        'recompra': recompra_cohorte,
+        'tasa_recompra': recompra_cohorte / clientes_cohorte * 100,
+        'valor': valor_cohorte,
+        'valor_por_cliente': valor_cohorte / clientes_cohorte,
+    })
+
+    # Valor acumulado por cliente según meses desde la primera compra
+    cohorte_fila = primera[codigos]
+    curva = pd.DataFrame({'cohorte': cohorte_fila, 'mes': meses - cohorte_fila, 'monto': montos}) \
+        .groupby(['cohorte', 'mes'])['monto'].sum().unstack(fill_value=0.0)
+    curva = curva.reindex(columns=np.arange(int(curva.columns.max()) + 1), fill_value=0.0).cumsum(axis=1)
+    curva = curva.div(pd.Series(clientes_cohorte, index=cohortes), axis=0)
+    mes_corte = _mes_ordinal(pd.Series([pd.Timestamp(hoy) if hoy is not None else pd.Timestamp.now()]))[0]
+    sin_historia = curva.columns.to_numpy()[None, :] > (mes_corte - curva.index.to_numpy())[:, None]
+    curva = curva.mask(sin_historia)
+    curva.index = _a_mes(curva.index)
+    curva.index.name = 'cohorte'
+    curva.columns.name = 'meses'
+
+    ltv = pd.DataFrame({
+        'cliente': nombres,
+        'cohorte': _a_mes(primera),
+        'ultima_compra': _a_mes(ultima),
+        'compras': compras,
+        'meses_con_compra': meses_con_compra,
+        'valor': valor,
+        'ticket_promedio': valor / compras,
+    }).sort_values('valor', ascending=False, kind='stable').reset_index(drop=True)
+
+    return {'cohortes': resumen, 'valor_acumulado': curva, 'ltv': ltv}
@@ -0,0 +1,111 @@
+"""
+Concentración de ventas por cliente: Pareto / ABC con top-K parcial
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import preparar_proyectos
+
+
+# Participación acumulada que cierra cada clase ABC
+UMBRALES_ABC = {'A': 80.0, 'B': 95.0}
+
+
+def _top_k(montos, k):
+    """Índices de los k montos mayores, ordenados de mayor a menor (sin ordenar el resto)"""
+    k = min(k, len(montos))
+    if k == 0:
+        return np.array([], dtype=np.int64)
+    indices = np.argpartition(-montos, k - 1)[:k]
+    return indices[np.argsort(-montos[indices], kind='stable')]
+
+
+def _clientes_hasta(montos, total, porcentaje, k_inicial):
+    """
+    Número de clientes (de mayor a menor) necesarios para acumular un porcentaje del total
+
+    Se duplica k y se repite ``np.argpartition`` hasta que el top-k alcanza el
+    porcentaje, así que solo se ordenan los primeros k clientes.
+    """
+    n = len(montos)
+    k = max(1, min(k_inicial, n))
+    while True:
+        acumulado = np.cumsum(montos[_top_k(montos, k)]) / total * 100
+        alcanzado = np.flatnonzero(acumulado >= porcentaje - 1e-9)
+        if len(alcanzado) > 0 or k >= n:
+            return int(alcanzado[0]) + 1 if len(alcanzado) > 0 else n
+        k = min(k * 2, n)
+
+
+def analisis_pareto(proyectos_data, fecha_inicio=None, fecha_fin=None, top=20):
+    """
+    Calcula la concentración del total GANADO por cliente
+
+    Las ventas se suman por cliente canónico (``entidad_id`` si existe, si no
+    el nombre normalizado) con ``np.bincount``; el top-K se obtiene con
+    ``np.argpartition``, de modo que no se ordena la lista completa de clientes.
+
+    Args:
+        proyectos_data: DataFrame de proyectos (con o sin columnas derivadas)
+        fecha_inicio: Fecha de inicio del filtro por fecha de venta (opcional)
+        fecha_fin: Fecha de fin del filtro por fecha de venta (opcional)
+        top: Número de clientes en la tabla top-K
+
+    Returns:
+        dict: total, num_clientes, clientes_a, clientes_b (clientes necesarios
+        para el 80% y el 95% de las ventas) y top (DataFrame con cliente,
+        ventas, proyectos, participacion, participacion_acumulada y clase)
+    """
+    columnas = ['cliente', 'ventas', 'proyectos', 'participacion', 'participacion_acumulada', 'clase']
+    vacio = {'total': 0.0, 'num_clientes': 0, 'clientes_a': 0, 'clientes_b': 0,
+             'top': pd.DataFrame(columns=columnas)}
+
+    if len(proyectos_data) > 0 and 'es_venta' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+    if len(proyectos_data) == 0 or 'es_venta' not in proyectos_data.columns:
+        return vacio
+
+    mascara = proyectos_data['es_venta'] & (proyectos_data['cliente_norm'] != '')
+    if fecha_inicio is not None and fecha_fin is not None:
+        mascara &= (
+            (proyectos_data['fecha_venta'] >= pd.Timestamp(fecha_inicio)) &
+            (proyectos_data['fecha_venta'] <= pd.Timestamp(fecha_fin))
+        )
+    ganados = proyectos_data[mascara]
+    if len(ganados) == 0:
+        return vacio
+
+    clave = ganados['entidad_id'] if 'entidad_id' in ganados.columns else ganados['cliente_norm']
+    codigos, _ = pd.factorize(clave)
+    montos = np.bincount(codigos, weights=pd.to_numeric(ganados['total'], errors='coerce').fillna(0).to_numpy(dtype=float))
+    conteos = np.bincount(codigos)
+    nombres = ganados['cliente_norm'].to_numpy(dtype=object)
+    # Nombre mostrado: el de la primera fila de cada cliente
+    primera_fila = np.full(len(montos), len(codigos), dtype=np.int64)
+    np.minimum.at(primera_fila, codigos, np.arange(len(codigos)))
+
+    total = float(montos.sum())
+    if total <= 0:
+        return {**vacio, 'num_clientes': len(montos)}
+
+    indices = _top_k(montos, top)
+    participacion = montos[indices] / total * 100
+    acumulada = np.cumsum(participacion)
+    clase = np.where(acumulada - participacion < UMBRALES_ABC['A'], 'A',
+                     np.where(acumulada - participacion < UMBRALES_ABC['B'], 'B', 'C'))
+
+    clientes_a = _clientes_hasta(montos, total, UMBRALES_ABC['A'], top)
+    return {
+        'total': total,
+        'num_clientes': int(len(montos)),
+        'clientes_a': clientes_a,
+        'clientes_b': _clientes_hasta(montos, total, UMBRALES_ABC['B'], clientes_a),
+        'top': pd.DataFrame({
+            'cliente': nombres[primera_fila[indices]],
+            'ventas': montos[indices],
+            'proyectos': conteos[indices],
+            'participacion': participacion,
+            'participacion_acumulada': acumulada,
+            'clase': clase,
+        }),
+    }
@@ -0,0 +1,527 @@
+"""
+Motor de captura (alta, edición, borrado, búsqueda, tabla y Excel) por esquema
+
+Cada página de captura declara su tabla con ``TablaCRUD`` y una lista de
+``Campo``; la carga en caché, el índice del modo servidor, la búsqueda, el
+payload del componente, la exportación a Excel y los diálogos son los mismos
+para todas las tablas.
+"""
+import random
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import streamlit as st
+
+from styles.table_helpers import dataframe_to_excel
+from styles.table_query import LIMITE_CELDAS_NAVEGADOR, TableIndex, consulta_tabla, guardar_consulta
+from styles.table_render import accion, celda_moneda, tabla_columnar, tabla_html
+from styles.tablejs import estilo_tabla_js
+from .supabase_client import get_supabase_client
+
+ICON_EDIT = '<svg viewBox="0 0 16 16" fill="currentColor"><path d="M12.146.146a.5.5 0 0 1 .708 0l3 3a.5.5 0 0 1 0 .708l-10 10a.5.5 0 0 1-.168.11l-5 2a.5.5 0 0 1-.65-.65l2-5a.5.5 0 0 1 .11-.168zm.708 1.707L11.207 3.5l1.293 1.293 1.647-1.647zM10.5 4.207 3.5 11.207v.5h.5l7-7z"/></svg>'
+ICON_DELETE = '<svg viewBox="0 0 16 16" fill="currentColor"><path d="M5.5 5.5A.5.5 0 0 1 6 6v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5m2.5 0a.5.5 0 0 1 .5.5v6a.5.5 0 0 1-1 0V6a.5.5 0 0 1 .5-.5m3 .5a.5.5 0 0 0-1 0v6a.5.5 0 0 0 1 0z"/><path d="M14.5 3a1 1 0 0 1-1 1H13v9a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V4h-.5a1 1 0 0 1-1-1V2a1 1 0 0 1 1-1H6a1 1 0 0 1 1-1h2a1 1 0 0 1 1 1h3.5a1 1 0 0 1 1 1zM4.118 4 4 4.059V13a1 1 0 0 0 1 1h6a1 1 0 0 0 1-1V4.059L11.882 4zM2.5 3h11V2h-11z"/></svg>'
+
+ACCIONES = [
+    accion('edit', ICON_EDIT, 'Editar'),
+    accion('delete', ICON_DELETE, 'Eliminar', 'btn-icon btn-icon-danger'),
+]
+
+# Columnas de Supabase que nunca se muestran
+COLUMNAS_SISTEMA = ['id', 'created_at', 'updated_at']
+
+TIPOS = ('id', 'texto', 'texto_largo', 'opcion', 'fecha', 'moneda')
+
+
+def generar_id():
+    """ID de registro visible para el usuario (ID-<13 dígitos>)"""
+    numero = random.randint(1000000000000, 9999999999999)
+    return f"ID-{numero}"
+
+
+def _a_fecha(valor):
+    """Valor guardado (texto ISO, fecha o vacío) a date; None si no se puede leer"""
+    if valor is None or valor == "" or (not isinstance(valor, (str, date)) and pd.isna(valor)):
+        return None
+    try:
+        return pd.to_datetime(valor).date()
+    except (ValueError, TypeError):
+        return None
+
+
+class Campo:
+    """
+    Columna de una tabla de captura
+
+    Ejemplo:
+        Campo('asesor', 'ASESOR', 'Asesor', tipo='opcion', opciones=ASESORES, requerido=True)
+        Campo('motivo_perdida', 'MOTIVO DE PÉRDIDA', 'Motivo de Pérdida', tipo='opcion',
+              opciones=MOTIVOS_PERDIDA, requerido=True, visible_si=('status', 'PERDIDO'))
+    """
+
+    def __init__(self, columna, nombre, etiqueta, tipo='texto', opciones=None, requerido=False,
+                 mayusculas=True, por_defecto=None, visible_si=None, en_tabla=True, en_excel=True,
+                 buscar=False, formato=None, excel=None, ayuda=None):
+        """
+        Args:
+            columna: Columna en Supabase ('asesor')
+            nombre: Columna mostrada en la tabla ('ASESOR')
+            etiqueta: Etiqueta del formulario ('Asesor'; se agrega * si es requerido)
+            tipo: 'id', 'texto', 'texto_largo', 'opcion', 'fecha' o 'moneda'
+            opciones: Valores de un campo 'opcion' (p. ej. de utils.opciones)
+            requerido: Si el formulario exige el valor
+            mayusculas: Si el texto se guarda en mayúsculas; 'alta' solo al
+                dar de alta (la edición lo guarda como se capturó)
+            por_defecto: Valor inicial en el alta (un callable se evalúa al pintar,
+                p. ej. date.today)
+            visible_si: (columna, valor): el campo solo aplica si otro campo
+                vale eso; si no, se guarda vacío
+            en_tabla: Si la columna se muestra en la tabla
+            en_excel: Si la columna se exporta
+            buscar: Si la búsqueda de la página mira esta columna
+            formato: Formato de celda de styles.table_render (por defecto según el tipo)
+            excel: Encabezado en el Excel (por defecto la etiqueta)
+            ayuda: Texto de ayuda del widget
+        """
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de campo desconocido: {tipo}")
+        self.columna = columna
+        self.nombre = nombre
+        self.etiqueta = etiqueta
+        self.tipo = tipo
+        self.opciones = list(opciones or [])
+        self.requerido = requerido
+        self.mayusculas = mayusculas
+        self.por_defecto = por_defecto
+        self.visible_si = visible_si
+        self.en_tabla = en_tabla
+        self.en_excel = en_excel
+        self.buscar = buscar
+        self.formato = formato or {'moneda': celda_moneda}.get(tipo)
+        self.excel = excel or etiqueta
+        self.ayuda = ayuda
+
+    def vacio(self):
+        """Valor guardado cuando el campo no aplica o no se llenó"""
+        return None if self.tipo in ('fecha', 'moneda') else ""
+
+    def widget(self, actual, key, alta=False):
+        """
+        Pinta el widget del campo
+
+        Args:
+            actual: Valor del registro que se edita (None en un alta)
+            key: Key del widget
+            alta: Si es el formulario de alta (una opción sin valor por
+                defecto arranca en la primera)
+
+        Returns:
+            Valor capturado (texto, date o float; None si una opción queda sin elegir)
+        """
+        etiqueta = f"{self.etiqueta} *" if self.requerido else self.etiqueta
+        if actual is None or (not isinstance(actual, (str, date)) and pd.isna(actual)):
+            actual = self.por_defecto() if callable(self.por_defecto) else self.por_defecto
+
+        if self.tipo == 'opcion':
+            # Al editar, un valor guardado que no está entre las opciones no se
+            # cambia en silencio por la primera: cae al valor por defecto o queda
+            # sin elegir (y el requerido lo rechaza al guardar)
+            actual = str(actual or "").upper()
+            if actual not in self.opciones:
+                actual = self.por_defecto
+            if actual in self.opciones:
+                indice = self.opciones.index(actual)
+            else:
+                indice = 0 if alta else None
+            return st.selectbox(etiqueta, self.opciones, index=indice, key=key, help=self.ayuda)
+        if self.tipo == 'fecha':
+            return st.date_input(etiqueta, value=_a_fecha(actual), key=key, help=self.ayuda)
+        if self.tipo == 'moneda':
+            numero = pd.to_numeric(actual, errors='coerce')
+            return st.number_input(etiqueta, min_value=0.0, step=0.01, key=key, help=self.ayuda,
+                                   value=0.0 if pd.isna(numero) else float(numero))
+        widget = st.text_area if self.tipo == 'texto_largo' else st.text_input
+        return widget(etiqueta, value=str(actual or ""), key=key, help=self.ayuda)
+
+    def a_registro(self, valor, alta=True):
+        """Valor capturado al formato que se guarda en Supabase"""
+        if valor is None or valor == "":
+            return self.vacio()
+        if self.tipo == 'fecha':
+            return valor.isoformat()
+        if self.tipo == 'moneda':
+            return float(valor)
+        if self.mayusculas is True or (alta and self.mayusculas == 'alta'):
+            return valor.upper()
+        return valor
+
+
+@st.cache_data(ttl=5)
+def _leer_tabla(tabla, renombres):
+    """Lee una tabla de Supabase con las columnas renombradas para mostrarse"""
+    try:
+        response = get_supabase_client().select(tabla).execute()
+        if response.data:
+            return pd.DataFrame(response.data).rename(columns=dict(renombres))
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"Error al cargar datos: {str(e)}")
+        return pd.DataFrame()
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _indice_tabla(tabla, data, columnas, _mapeos):
+    """Índice para paginar, ordenar y filtrar en el servidor; se reconstruye solo si cambian los datos"""
+    return TableIndex(data, list(columnas), mapeos=_mapeos)
+
+
+class TablaCRUD:
+    """
+    Tabla de captura descrita por su esquema
+
+    Ejemplo:
+        citas = TablaCRUD(
+            'citas', campos, singular='cita', plural='citas', femenino=True, hoja='Citas',
+            disposicion=[['asesor', 'fecha'], ['prospecto', 'giro'], ['accion_seguir']],
+            resumen=['PROSPECTO', 'ASESOR', 'FECHA'],
+        )
+        citas.formulario_alta()
+        data = citas.cargar()
+        citas.mostrar_tabla(data, placeholder="Buscar por prospecto...")
+    """
+
+    def __init__(self, tabla, campos, singular, plural, femenino=False, hoja=None,
+                 disposicion=None, resumen=None, formatos=None, exportar=None):
+        """
+        Args:
+            tabla: Tabla de Supabase ('citas')
+            campos: Lista de Campo; el de tipo 'id' es el ID visible del registro
+            singular: Nombre de un registro ('cita'), para los mensajes
+            plural: Nombre de varios registros ('citas')
+            femenino: Concordancia de los mensajes ('agregada', 'esta cita')
+            hoja: Nombre de la hoja del Excel (por defecto el plural)
+            disposicion: Columnas de Supabase del formulario por columna de la
+                página; los campos que no aparecen van debajo, a todo lo ancho
+            resumen: Columnas mostradas al confirmar un borrado
+            formatos: Formatos de columnas que no son campos (p. ej. derivadas)
+            exportar: Columnas de Supabase en el orden de las columnas del Excel
+                (por defecto los campos con en_excel, en su orden)
+        """
+        self.tabla = tabla
+        self.campos = campos
+        self.singular = singular
+        self.plural = plural
+        self.femenino = femenino
+        self.hoja = hoja or plural.capitalize()
+        self.disposicion = disposicion or [[c.columna for c in campos if c.tipo != 'id']]
+        self.resumen = resumen or []
+        por_columna = {c.columna: c for c in campos}
+        self.exportar = [por_columna[col] for col in exportar] if exportar else [c for c in campos if c.en_excel]
+        self.id_campo = next(c for c in campos if c.tipo == 'id')
+        self.formatos = {c.nombre: c.formato for c in campos if c.formato}
+        self.formatos.update(formatos or {})
+        # El índice del modo servidor filtra por el valor mostrado (p. ej. el nombre corto del asesor)
+        self.mapeos = {col: formato.mapeo for col, formato in self.formatos.items() if getattr(formato, 'mapeo', None)}
+        self.ocultas = COLUMNAS_SISTEMA + [self.id_campo.nombre] + [c.nombre for c in campos if not c.en_tabla]
+
+    def _concordar(self, masculino, femenino):
+        return femenino if self.femenino else masculino
+
+    # ── DATOS ─────────────────────────────────────────
+    def cargar(self):
+        """
+        Registros de la tabla (en caché unos segundos)
+
+        Returns:
+            pd.DataFrame: Columnas con su nombre mostrado más id/created_at
+        """
+        return _leer_tabla(self.tabla, tuple((c.columna, c.nombre) for c in self.campos))
+
+    def guardar(self, registro, row_id=None):
+        """
+        Inserta o actualiza un registro
+
+        Args:
+            registro: Diccionario columna de Supabase -> valor
+            row_id: id de Supabase si es una edición
+
+        Returns:
+            bool: True si se guardó
+        """
+        try:
+            client = get_supabase_client()
+            if row_id:
+                client.update(self.tabla, registro, {"id": row_id})
+            else:
+                client.insert(self.tabla, registro)
+            st.cache_data.clear()
+            return True
+        except Exception as e:
+            st.error(f"Error al guardar datos: {str(e)}")
+            return False
+
+    def eliminar(self, row_id):
+        """
+        Borra un registro
+
+        Args:
+            row_id: id de Supabase
+
+        Returns:
+            bool: True si se borró
+        """
+        try:
+            get_supabase_client().delete(self.tabla, {"id": row_id})
+            st.cache_data.clear()
+            return True
+        except Exception as e:
+            st.error(f"Error al eliminar datos: {str(e)}")
+            return False
+
+    def buscar(self, data, texto):
+        """
+        Filas que contienen el texto en alguna columna de búsqueda
+
+        Args:
+            data: DataFrame de la tabla
+            texto: Texto buscado (sin distinguir mayúsculas)
+
+        Returns:
+            pd.DataFrame: Filas que coinciden (todas si no hay texto)
+        """
+        if not texto:
+            return data
+        mascara = pd.Series(False, index=data.index)
+        for campo in self.campos:
+            if campo.buscar and campo.nombre in data.columns:
+                mascara |= data[campo.nombre].fillna("").astype(str).str.contains(texto, case=False, regex=False)
+        return data[mascara]
+
+    # ── FORMULARIOS ───────────────────────────────────
+    def _formulario(self, fila, prefijo):
+        """Pinta los campos según la disposición y devuelve los valores capturados"""
+        valores = {}
+
+        def pintar(campo):
+            if campo.visible_si and valores.get(campo.visible_si[0]) != campo.visible_si[1]:
+                return
+            actual = None if fila is None else fila.get(campo.nombre)
+            valores[campo.columna] = campo.widget(actual, f"{prefijo}_{campo.columna}", alta=fila is None)
+
+        por_columna = {c.columna: c for c in self.campos}
+        dispuestos = {col for grupo in self.disposicion for col in grupo}
+        for contenedor, grupo in zip(st.columns(len(self.disposicion)), self.disposicion):
+            with contenedor:
+                for columna in grupo:
+                    pintar(por_columna[columna])
+        for campo in self.campos:
+            if campo.tipo != 'id' and campo.columna not in dispuestos:
+                pintar(campo)
+        return valores
+
+    def _registro(self, valores, id_visible, alta):
+        """Valida lo capturado y arma el registro; None (con el error mostrado) si falta algo"""
+        registro = {self.id_campo.columna: id_visible}
+        for campo in self.campos:
+            if campo.tipo == 'id':
+                continue
+            if campo.columna not in valores:
+                registro[campo.columna] = campo.vacio()
+                continue
+            valor = valores[campo.columna]
+            if campo.requerido and (valor is None or valor == ""):
+                st.error(":material/warning: Por favor completa los campos obligatorios (*)")
+                return None
+            registro[campo.columna] = campo.a_registro(valor, alta)
+        return registro
+
+    def formulario_alta(self):
+        """Formulario para agregar un registro"""
+        singular = self.singular.capitalize()
+        with st.container():
+            valores = self._formulario(None, f"nuevo_{self.tabla}")
+            if st.button(f":material/save: Guardar {singular}", key=f"guardar_{self.tabla}",
+                         type="primary", use_container_width=True):
+                registro = self._registro(valores, generar_id(), alta=True)
+                if registro and self.guardar(registro):
+                    st.success(f":material/check_circle: {singular} "
+                               f"{self._concordar('agregado', 'agregada')} exitosamente!")
+                    time.sleep(1)
+                    st.rerun()
+
+    def _editar(self, idx):
+        data = self.cargar()
+        if idx not in data.index:
+            st.error("Registro no encontrado")
+            return
+
+        row = data.loc[idx]
+        st.info(f"**ID:** {row.get(self.id_campo.nombre, '')}")
+        valores = self._formulario(row, f"editar_{self.tabla}_{idx}")
+
+        col_btn1, col_btn2 = st.columns(2)
+        with col_btn1:
+            guardar = st.button(":material/save: Guardar Cambios", use_container_width=True, type="primary",
+                                key=f"guardar_editar_{self.tabla}_{idx}")
+        with col_btn2:
+            cancelar = st.button(":material/cancel: Cancelar", use_container_width=True,
+                                 key=f"cancelar_editar_{self.tabla}_{idx}")
+
+        if guardar:
+            registro = self._registro(valores, row.get(self.id_campo.nombre, ''), alta=False)
+            if registro and self.guardar(registro, row.get('id', '')):
+                st.success(f":material/check_circle: {self.singular.capitalize()} "
+                           f"{self._concordar('actualizado', 'actualizada')} exitosamente!")
+                st.rerun()
+        if cancelar:
+            st.rerun()
+
+    def _confirmar_borrado(self, idx):
+        data = self.cargar()
+        if idx not in data.index:
+            st.error("Registro no encontrado")
+            return
+
+        row = data.loc[idx]
+        st.warning(f"¿Estás seguro de que deseas eliminar {self._concordar('este', 'esta')} {self.singular}?")
+        etiquetas = {c.nombre: c.etiqueta for c in self.campos}
+        st.info("\n\n".join(f"**{etiquetas.get(col, col)}:** {row.get(col, '')}" for col in self.resumen))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button(":material/delete: Sí, Eliminar", use_container_width=True, type="primary"):
+                row_id = row.get('id', '')
+                if row_id and self.eliminar(row_id):
+                    st.success(":material/check_circle: Registro eliminado exitosamente")
+                    time.sleep(1)
+                    st.rerun()
+        with col2:
+            if st.button(":material/cancel: Cancelar", use_container_width=True):
+                st.rerun()
+
+    def dialogo_editar(self, idx):
+        """Abre el diálogo de edición del registro en la posición idx de cargar()"""
+        st.dialog(f":material/edit: Editar {self.singular.capitalize()}")(self._editar)(idx)
+
+    def dialogo_eliminar(self, idx):
+        """Abre la confirmación de borrado del registro en la posición idx de cargar()"""
+        st.dialog(":material/warning: Confirmar Eliminación")(self._confirmar_borrado)(idx)
+
+    # ── TABLA Y EXCEL ─────────────────────────────────
+    def columnas_visibles(self, data):
+        """Columnas de data que se muestran en la tabla, en su orden"""
+        return [col for col in data.columns if col not in self.ocultas]
+
+    def generar_tabla(self, data, columnar=False, acciones=ACCIONES):
+        """
+        HTML de la tabla (modo servidor) o payload columnar (modo de datos)
+
+        Args:
+            data: Filas a pintar
+            columnar: Si se arma el payload por columnas
+            acciones: Botones por fila creados con accion()
+
+        Returns:
+            str | dict: HTML o payload de tabla_columnar
+        """
+        generador = tabla_columnar if columnar else tabla_html
+        return generador(data, self.columnas_visibles(data), self.formatos, acciones, id_col=self.id_campo.nombre)
+
+    def to_excel(self, data):
+        """
+        Exporta las columnas exportables con sus encabezados de formulario
+
+        Args:
+            data: Filas a exportar
+
+        Returns:
+            bytes: Archivo .xlsx
+        """
+        campos = [c for c in self.exportar if c.nombre in data.columns]
+        export_df = pd.DataFrame({c.excel: data[c.nombre] for c in campos})
+        for campo in campos:
+            if campo.tipo == 'moneda':
+                export_df[campo.excel] = pd.to_numeric(export_df[campo.excel], errors='coerce').fillna(0).astype(float)
+            elif campo.tipo in ('id', 'texto', 'texto_largo', 'opcion'):
+                export_df[campo.excel] = export_df[campo.excel].fillna("").astype(str).str.upper()
+        return dataframe_to_excel(export_df, sheet_name=self.hoja,
+                                  currency_cols=[c.excel for c in campos if c.tipo == 'moneda'])
+
+    def mostrar_tabla(self, data, placeholder="Buscar..."):
+        """
+        Búsqueda, descarga a Excel, tabla y diálogos de sus botones
+
+        Args:
+            data: Registros a mostrar (cargar() más columnas derivadas, si hay)
+            placeholder: Texto de ayuda del buscador
+        """
+        col_search, col_download = st.columns([5, 1], vertical_alignment="bottom")
+        with col_search:
+            busqueda = st.text_input(":material/search: Buscar", placeholder=placeholder,
+                                     key=f"search_input_{self.tabla}")
+
+        data_filtrada = self.buscar(data, busqueda).copy()
+        for campo in self.campos:
+            if campo.tipo == 'fecha' and campo.nombre in data_filtrada.columns:
+                data_filtrada[campo.nombre] = data_filtrada[campo.nombre].fillna("")
+
+        with col_download:
+            st.download_button(
+                label=":material/download: Excel",
+                data=self.to_excel(data_filtrada),
+                file_name=f"{self.tabla}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                width='stretch'
+            )
+
+        # Hasta LIMITE_CELDAS_NAVEGADOR celdas la tabla completa viaja en formato
+        # columnar y el navegador pagina, ordena y filtra; con más, la consulta se
+        # resuelve en el servidor y solo viaja la página pedida. La key es fija: al
+        # buscar o editar, el componente recibe los datos nuevos sin volver a montarse.
+        table_key = f"table_{self.tabla}"
+        columnas = tuple(self.columnas_visibles(data_filtrada))
+        if len(data_filtrada) * len(columnas) <= LIMITE_CELDAS_NAVEGADOR:
+            payload = self.generar_tabla(data_filtrada, columnar=True)
+        else:
+            consulta = consulta_tabla(self.tabla, busqueda)
+            indice = _indice_tabla(self.tabla, data_filtrada, columnas, self.mapeos)
+            pagina = indice.consultar(consulta['pagina'], consulta['tamano'], consulta.get('orden'), consulta.get('filtros'))
+            paragraph_html = self.generar_tabla(data_filtrada.iloc[pagina['filas']])
+            payload = indice.payload(paragraph_html, pagina, consulta)
+
+        material_table = st.components.v2.component(
+            name=f"material_table_{self.tabla}",
+            js=estilo_tabla_js(),
+            isolate_styles=False,
+        )
+        resultado = material_table(
+            data=payload,
+            on_clicked_change=lambda: None,
+            on_consulta_change=lambda: guardar_consulta(self.tabla, table_key),
+            key=table_key
+        )
+
+        # Botones de la fila: el data-link trae "<acción>_<ID visible>"
+        if resultado and resultado.get("clicked"):
+            prefijo, _, id_visible = resultado["clicked"].partition("_")
+            match = data[data[self.id_campo.nombre] == id_visible]
+            if match.empty:
+                return
+            if prefijo == "edit":
+                self.dialogo_editar(match.index[0])
+            elif prefijo == "delete":
+                self.dialogo_eliminar(match.index[0])
+
+    def mostrar_vacio(self, icono):
+        """Aviso de tabla sin registros"""
+        st.markdown(f"""
+    <div style="text-align:center;padding:52px 24px;border:2px dashed #cbd5e1;
+                border-radius:14px;background:#f8fafc;margin:24px 0;">
+        <div style="font-size:3.2rem;margin-bottom:12px;line-height:1;">{icono}</div>
+        <div style="font-size:1.1rem;font-weight:600;color:#334155;margin-bottom:8px;">
+            No hay {self.plural} {self._concordar('registrados', 'registradas')}
+        </div>
+        <div style="font-size:.9rem;color:#94a3b8;">
+            Agrega tu {self._concordar('primer', 'primera')} {self.singular} usando el formulario de arriba.
+        </div>
+    </div>""", unsafe_allow_html=True)
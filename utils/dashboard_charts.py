@@ -128,16 +128,18 @@ def mostrar_metricas_ventas_cotizaciones(metricas_ventas):
         )
 
 
-def mostrar_metricas_ventas_trimestrales(metricas_trimestre):
+def mostrar_metricas_ventas_trimestrales(metricas_trimestre, pronostico=None):
     """
     Muestra las métricas de ventas trimestrales
     
     Args:
         metricas_trimestre: Diccionario con métricas de ventas trimestrales
+        pronostico: Resumen de sales_forecast.resumen_pronostico (opcional);
+            si se da, agrega la proyección al cierre del trimestre
     """
     st.markdown(f"#### :material/calendar_month: Ventas Trimestrales - Q{metricas_trimestre['trimestre_actual']}")
     
-    col_t1, col_t2 = st.columns(2)
+    col_t1, col_t2, *col_pronostico = st.columns(3 if pronostico else 2)
     
     with col_t1:
         st.metric(
@@ -152,6 +154,614 @@ def mostrar_metricas_ventas_trimestrales(metricas_trimestre):
             delta=metricas_trimestre['delta_ventas'],
             delta_color=metricas_trimestre['color_ventas']
         )
+    
+    if pronostico:
+        with col_pronostico[0]:
+            mostrar_proyeccion(pronostico, 'trimestre', ":material/query_stats: Proyección Cierre de Trimestre")
+
+
+def mostrar_proyeccion(pronostico, periodo, label):
+    """
+    Muestra la proyección de ventas al cierre de un periodo
+    
+    Args:
+        pronostico: Resumen de sales_forecast.resumen_pronostico
+        periodo: 'mes' o 'trimestre'
+        label: Etiqueta de la tarjeta
+    """
+    datos = pronostico[periodo]
+    st.metric(
+        label=label,
+        value=f"${datos['proyeccion_combinada']:,.2f}",
+        delta=datos['delta'],
+        delta_color=datos['color'],
+        help=(
+            f"Ventas del periodo más el mayor de dos estimados de lo que falta. "
+            f"Por ritmo (${datos['run_rate']:,.2f} por día hábil, {datos['dias_transcurridos']} "
+            f"transcurridos, {datos['dias_restantes']} restantes): ${datos['proyeccion']:,.2f}. "
+            f"Con el pipeline en proceso ponderado por tasa de cierre que se espera cierre "
+            f"en el periodo (cotización + {pronostico['ciclo_p50']:.0f} días de ciclo p50; "
+            f"${datos['pipeline_ponderado']:,.2f} de ${pronostico['pipeline_ponderado']:,.2f}): "
+            f"${datos['proyeccion_pipeline']:,.2f}"
+        )
+    )
+
+
+def mostrar_simulacion_trimestre(simulacion):
+    """
+    Muestra la probabilidad de alcanzar la meta del trimestre y la
+    distribución simulada del total
+    
+    Args:
+        simulacion: Diccionario devuelto por MetricsCalculator.simulacion_trimestre
+    """
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        probabilidad = simulacion['probabilidad_meta']
+        st.metric(
+            label=":material/casino: Probabilidad de Alcanzar la Meta",
+            value=f"{probabilidad:.1f}%" if probabilidad is not None else "Sin meta definida",
+            help=f"{len(simulacion['totales']):,} simulaciones sobre {simulacion['cotizaciones_abiertas']} "
+                 f"cotizaciones en proceso (${simulacion['monto_abierto']:,.2f}), cada una con la tasa "
+                 f"histórica de cierre de su asesor"
+        )
+    
+    with col2:
+        st.metric(
+            label=":material/equalizer: Cierre Esperado (P50)",
+            value=f"${simulacion['p50']:,.2f}"
+        )
+    
+    with col3:
+        st.metric(
+            label=":material/swap_vert: Rango P10 – P90",
+            value=f"${simulacion['p10']:,.0f} – ${simulacion['p90']:,.0f}"
+        )
+    
+    if simulacion['cotizaciones_abiertas'] > 0:
+        fig = px.histogram(x=simulacion['totales'], nbins=50, labels={'x': 'Total del trimestre'})
+        if simulacion['meta_trimestre'] > 0:
+            fig.add_vline(
+                x=simulacion['meta_trimestre'], line_dash='dash', line_color='#E74C3C',
+                annotation_text='Meta'
+            )
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20),
+            yaxis_title='Simulaciones',
+            showlegend=False
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def mostrar_ciclo_venta(metricas_ciclo):
+    """
+    Muestra el ciclo de venta: percentiles, histograma y tablas por asesor y por mes
+    
+    Args:
+        metricas_ciclo: Diccionario devuelto por MetricsCalculator.metricas_ciclo_venta
+    """
+    if metricas_ciclo['ventas'] == 0:
+        st.info("No hay proyectos ganados con fecha de cotización y de facturación")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(label=":material/receipt_long: Ventas Medidas", value=metricas_ciclo['ventas'])
+    
+    with col2:
+        st.metric(label=":material/avg_pace: Ciclo Promedio", value=f"{metricas_ciclo['promedio']:.1f} días")
+    
+    with col3:
+        st.metric(
+            label=":material/timer: Ciclo Mediano (P50)",
+            value=f"{metricas_ciclo['p50']:.0f} días",
+            help="La mitad de las ventas se factura en este número de días o menos"
+        )
+    
+    with col4:
+        st.metric(
+            label=":material/hourglass_bottom: Ciclo P90",
+            value=f"{metricas_ciclo['p90']:.0f} días",
+            help="El 90% de las ventas se factura en este número de días o menos"
+        )
+    
+    fig = px.histogram(x=metricas_ciclo['dias'], nbins=40, labels={'x': 'Días de cotización a facturación'})
+    for percentil, color in (('p50', '#0069b4'), ('p90', '#E74C3C')):
+        fig.add_vline(
+            x=metricas_ciclo[percentil], line_dash='dash', line_color=color,
+            annotation_text=percentil.upper()
+        )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#334155'),
+        margin=dict(l=20, r=20, t=20, b=20),
+        yaxis_title='Ventas',
+        showlegend=False
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    columnas_ciclo = {
+        "ventas": st.column_config.NumberColumn("Ventas"),
+        "promedio": st.column_config.NumberColumn("Promedio (días)", format="%.1f"),
+        "p50": st.column_config.NumberColumn("P50 (días)", format="%.0f"),
+        "p90": st.column_config.NumberColumn("P90 (días)", format="%.0f"),
+    }
+    
+    col_asesor, col_cohorte = st.columns(2)
+    
+    with col_asesor:
+        st.markdown("##### Por Asesor")
+        st.dataframe(
+            metricas_ciclo['por_asesor'],
+            width='stretch',
+            hide_index=True,
+            column_config={"asesor": "Asesor", **columnas_ciclo}
+        )
+    
+    with col_cohorte:
+        st.markdown("##### Por Mes de Cotización")
+        st.dataframe(
+            metricas_ciclo['por_cohorte'].sort_values('cohorte', ascending=False),
+            width='stretch',
+            hide_index=True,
+            column_config={"cohorte": st.column_config.DateColumn("Mes", format="MMM YYYY"), **columnas_ciclo}
+        )
+
+
+def mostrar_analisis_perdidas(metricas_perdidas):
+    """
+    Muestra las pérdidas por motivo, por asesor y su tendencia mensual
+    
+    Args:
+        metricas_perdidas: Diccionario devuelto por MetricsCalculator.metricas_perdidas
+    """
+    if metricas_perdidas['num_perdidos'] == 0:
+        st.info("No hay proyectos perdidos en el periodo")
+        return
+    
+    colores_motivo = {
+        'PRECIO': '#E74C3C',
+        'STOCK/INVENTARIO': '#FFA500',
+        'OTRO': '#0069b4',
+        'SIN MOTIVO': '#94a3b8'
+    }
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric(
+            label=":material/money_off: Monto Perdido",
+            value=f"${metricas_perdidas['monto_perdido']:,.2f}"
+        )
+    
+    with col2:
+        st.metric(
+            label=":material/cancel: Proyectos Perdidos",
+            value=metricas_perdidas['num_perdidos']
+        )
+    
+    col_motivo, col_tendencia = st.columns([1, 2])
+    
+    with col_motivo:
+        st.markdown("##### Por Motivo")
+        por_motivo = metricas_perdidas['por_motivo']
+        fig = px.pie(
+            por_motivo[por_motivo['cantidad'] > 0],
+            values='monto',
+            names='motivo',
+            color='motivo',
+            color_discrete_map=colores_motivo,
+            hole=0.4
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20),
+            showlegend=False
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col_tendencia:
+        st.markdown("##### Tendencia Mensual")
+        fig = px.line(
+            metricas_perdidas['tendencia'],
+            x='mes',
+            y='monto',
+            color='motivo',
+            color_discrete_map=colores_motivo,
+            markers=True,
+            labels={'mes': 'Mes', 'monto': 'Monto perdido', 'motivo': 'Motivo'}
+        )
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20),
+            legend=dict(orientation='h', yanchor='bottom', y=-0.3)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("##### Por Asesor")
+    por_asesor = metricas_perdidas['por_asesor']
+    st.dataframe(
+        por_asesor,
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "asesor": "Asesor",
+            **{
+                columna: st.column_config.NumberColumn(columna.title(), format="$ %.2f")
+                for columna in por_asesor.columns if columna != 'asesor'
+            }
+        }
+    )
+
+
+def mostrar_metricas_por_giro(metricas_giro, top=15):
+    """
+    Muestra citas, conversión y ventas por giro de negocio
+    
+    Args:
+        metricas_giro: DataFrame devuelto por MetricsCalculator.metricas_por_giro
+        top: Número de giros a graficar
+    """
+    if len(metricas_giro) == 0:
+        st.info("No hay citas para analizar por giro")
+        return
+    
+    fig = px.bar(
+        metricas_giro.head(top).iloc[::-1],
+        x='citas',
+        y='giro',
+        orientation='h',
+        color='tasa_conversion',
+        color_continuous_scale='Blues',
+        labels={'citas': 'Citas', 'giro': '', 'tasa_conversion': 'Conversión %'}
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#334155'),
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=max(300, 28 * min(top, len(metricas_giro)))
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        metricas_giro,
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "giro": "Giro",
+            "citas": st.column_config.NumberColumn("Citas"),
+            "prospectos": st.column_config.NumberColumn("Prospectos"),
+            "convertidos": st.column_config.NumberColumn("Con Proyecto"),
+            "tasa_conversion": st.column_config.ProgressColumn(
+                "Conversión", format="%.1f%%", min_value=0, max_value=100
+            ),
+            "proyectos": st.column_config.NumberColumn("Proyectos"),
+            "ventas": st.column_config.NumberColumn("Ventas", format="$ %.2f"),
+        }
+    )
+
+
+def mostrar_pareto_clientes(pareto):
+    """
+    Muestra la concentración de ventas por cliente: clientes que hacen el
+    80% y 95% de las ventas y el top de clientes con su clase ABC
+    
+    Args:
+        pareto: Diccionario devuelto por MetricsCalculator.analisis_pareto
+    """
+    if pareto['total'] <= 0:
+        st.info("No hay ventas ganadas en el periodo")
+        return
+    
+    num_clientes = pareto['num_clientes']
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(label=":material/groups: Clientes con Venta", value=num_clientes)
+    
+    with col2:
+        st.metric(
+            label=":material/star: Clientes A (80% de ventas)",
+            value=pareto['clientes_a'],
+            delta=f"{pareto['clientes_a'] / num_clientes * 100:.1f}% de los clientes",
+            delta_color="off"
+        )
+    
+    with col3:
+        st.metric(
+            label=":material/stacked_bar_chart: Clientes A+B (95% de ventas)",
+            value=pareto['clientes_b'],
+            delta=f"{pareto['clientes_b'] / num_clientes * 100:.1f}% de los clientes",
+            delta_color="off"
+        )
+    
+    top = pareto['top']
+    fig = px.bar(
+        top,
+        x='cliente',
+        y='ventas',
+        color='clase',
+        color_discrete_map={'A': '#0069b4', 'B': '#FFA500', 'C': '#94a3b8'},
+        hover_data={'participacion_acumulada': ':.1f'},
+        labels={'cliente': '', 'ventas': 'Ventas', 'clase': 'Clase',
+                'participacion_acumulada': '% acumulado'}
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#334155'),
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis={'categoryorder': 'total descending'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        top,
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "cliente": "Cliente",
+            "ventas": st.column_config.NumberColumn("Ventas", format="$ %.2f"),
+            "proyectos": st.column_config.NumberColumn("Proyectos Ganados"),
+            "participacion": st.column_config.NumberColumn("% Ventas", format="%.1f%%"),
+            "participacion_acumulada": st.column_config.ProgressColumn(
+                "% Acumulado", format="%.1f%%", min_value=0, max_value=100
+            ),
+            "clase": "Clase",
+        }
+    )
+
+
+def mostrar_cohortes_clientes(cohortes, ultimas=24):
+    """
+    Muestra las cohortes de clientes por mes de primera venta: recompra,
+    valor acumulado por cliente y la tabla de LTV
+    
+    Args:
+        cohortes: Diccionario devuelto por MetricsCalculator.cohortes_clientes
+        ultimas: Número de cohortes recientes a graficar
+    """
+    resumen = cohortes['cohortes']
+    if len(resumen) == 0:
+        st.info("No hay ventas ganadas para construir cohortes")
+        return
+    
+    ltv = cohortes['ltv']
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(label=":material/groups: Clientes con Venta", value=len(ltv))
+    
+    with col2:
+        st.metric(
+            label=":material/replay: Tasa de Recompra",
+            value=f"{resumen['recompra'].sum() / resumen['clientes'].sum() * 100:.1f}%"
+        )
+    
+    with col3:
+        st.metric(label=":material/savings: LTV Promedio", value=f"${ltv['valor'].mean():,.2f}")
+    
+    col_recompra, col_curva = st.columns(2)
+    
+    with col_recompra:
+        st.markdown("##### Recompra por Cohorte")
+        fig = px.bar(
+            resumen.tail(ultimas),
+            x='cohorte',
+            y='tasa_recompra',
+            hover_data={'clientes': True, 'recompra': True},
+            color_discrete_sequence=['#0069b4'],
+            labels={'cohorte': 'Mes de primera venta', 'tasa_recompra': 'Recompra %',
+                    'clientes': 'Clientes', 'recompra': 'Recompraron'}
+        )
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col_curva:
+        st.markdown("##### Valor Acumulado por Cliente")
+        curva = cohortes['valor_acumulado'].tail(ultimas)
+        curva.index = curva.index.strftime('%Y-%m')
+        fig = px.imshow(
+            curva,
+            color_continuous_scale='Blues',
+            aspect='auto',
+            labels={'x': 'Meses desde la primera venta', 'y': 'Cohorte', 'color': 'Valor por cliente'}
+        )
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("##### Valor de Vida por Cliente (LTV)")
+    st.dataframe(
+        ltv,
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "cliente": "Cliente",
+            "cohorte": st.column_config.DateColumn("Primera Venta", format="YYYY-MM"),
+            "ultima_compra": st.column_config.DateColumn("Última Venta", format="YYYY-MM"),
+            "compras": st.column_config.NumberColumn("Proyectos Ganados"),
+            "meses_con_compra": st.column_config.NumberColumn("Meses con Compra"),
+            "valor": st.column_config.NumberColumn("Valor Total", format="$ %.2f"),
+            "ticket_promedio": st.column_config.NumberColumn("Ticket Promedio", format="$ %.2f"),
+        }
+    )
+
+
+def mostrar_embudo_enlazado(embudo):
+    """
+    Muestra el embudo enlazado por prospecto/cliente: entidades por etapa,
+    conversión entre etapas y días hasta llegar a cada etapa
+    
+    Args:
+        embudo: DataFrame devuelto por MetricsCalculator.embudo_enlazado
+    """
+    if len(embudo) == 0 or embudo['entidades'].iloc[0] == 0:
+        st.info("No hay prospectos con citas en el periodo para construir el embudo")
+        return
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        fig = px.funnel(
+            embudo,
+            x='entidades',
+            y='etapa',
+            color_discrete_sequence=['#005fa3']
+        )
+        fig.update_traces(textinfo='value+percent initial')
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#334155'),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.dataframe(
+            embudo,
+            width='stretch',
+            hide_index=True,
+            column_config={
+                "etapa": "Etapa",
+                "entidades": st.column_config.NumberColumn("Prospectos"),
+                "conversion_etapa": st.column_config.NumberColumn("Conv. vs Etapa Anterior", format="%.1f%%"),
+                "conversion_total": st.column_config.NumberColumn("Conv. vs Citas", format="%.1f%%"),
+                "dias_mediana": st.column_config.NumberColumn("Días (Mediana)", format="%.0f"),
+                "dias_promedio": st.column_config.NumberColumn("Días (Promedio)", format="%.1f"),
+            }
+        )
+        st.caption("Cada prospecto se enlaza entre tablas por asesor y nombre normalizado; "
+                   "los días se miden desde la primera fecha en la etapa anterior.")
+
+
+def _texto_delta(delta, referencia):
+    """Formatea un delta porcentual contra un periodo de referencia"""
+    if delta is None:
+        return f"Sin datos {referencia}"
+    return f"{delta:+.1f}% {referencia}"
+
+
+def mostrar_comparativo_periodos(comparativo):
+    """
+    Muestra los KPIs del periodo contra el periodo anterior y el año anterior
+    
+    Args:
+        comparativo: Diccionario devuelto por MetricsCalculator.comparativo_periodos
+    """
+    inicio, fin = comparativo['periodos']['actual']
+    inicio_ant, fin_ant = comparativo['periodos']['anterior']
+    st.caption(
+        f"Periodo {inicio:%d/%m/%Y} – {fin:%d/%m/%Y} contra {inicio_ant:%d/%m/%Y} – {fin_ant:%d/%m/%Y} "
+        f"y contra el mismo periodo del año anterior"
+    )
+    
+    tarjetas = [
+        ('ventas', ":material/attach_money: Ventas", "${:,.2f}"),
+        ('total_citas', ":material/event: Citas", "{:,.0f}"),
+        ('total_prospectos', ":material/group: Prospectos", "{:,.0f}"),
+        ('citas_semanales', ":material/date_range: Citas por Semana", "{:,.1f}"),
+    ]
+    
+    for col, (kpi, label, formato) in zip(st.columns(len(tarjetas)), tarjetas):
+        valores = comparativo[kpi]
+        with col:
+            st.metric(
+                label=label,
+                value=formato.format(valores['actual']),
+                delta=_texto_delta(valores['delta_anterior'], "vs periodo anterior"),
+                delta_color="normal" if valores['delta_anterior'] is not None else "off",
+                help=f"{_texto_delta(valores['delta_ano_anterior'], 'vs año anterior')} "
+                     f"({formato.format(valores['ano_anterior'])})"
+            )
+    
+    with st.expander("Ver todos los KPIs"):
+        nombres = {
+            'ventas': 'Ventas', 'meta': 'Meta', 'total_citas': 'Citas',
+            'total_prospectos': 'Prospectos', 'citas_semanales': 'Citas por Semana'
+        }
+        tabla = pd.DataFrame([
+            {
+                'KPI': nombre,
+                'Actual': comparativo[kpi]['actual'],
+                'Periodo Anterior': comparativo[kpi]['anterior'],
+                'Δ vs Anterior': comparativo[kpi]['delta_anterior'],
+                'Año Anterior': comparativo[kpi]['ano_anterior'],
+                'Δ vs Año Anterior': comparativo[kpi]['delta_ano_anterior'],
+            }
+            for kpi, nombre in nombres.items()
+        ])
+        st.dataframe(
+            tabla,
+            width='stretch',
+            hide_index=True,
+            column_config={
+                "Actual": st.column_config.NumberColumn(format="%.2f"),
+                "Periodo Anterior": st.column_config.NumberColumn(format="%.2f"),
+                "Δ vs Anterior": st.column_config.NumberColumn(format="%+.1f%%"),
+                "Año Anterior": st.column_config.NumberColumn(format="%.2f"),
+                "Δ vs Año Anterior": st.column_config.NumberColumn(format="%+.1f%%"),
+            }
+        )
+
+
+def mostrar_ranking_asesores(ranking):
+    """
+    Muestra el ranking de asesores con sus métricas comparadas
+    
+    Args:
+        ranking: DataFrame devuelto por MetricsCalculator.metricas_por_asesor
+    """
+    if len(ranking) == 0:
+        st.info("No hay asesores para comparar")
+        return
+    
+    st.dataframe(
+        ranking[[
+            'ranking', 'asesor', 'meta', 'ventas', 'cumplimiento_ventas', 'cotizaciones',
+            'ticket_promedio', 'tasa_conversion', 'promedio_citas', 'cumplimiento_citas'
+        ]],
+        width='stretch',
+        hide_index=True,
+        column_config={
+            "ranking": st.column_config.NumberColumn("#", format="%d"),
+            "asesor": "Asesor",
+            "meta": st.column_config.NumberColumn("Meta", format="$ %.2f"),
+            "ventas": st.column_config.NumberColumn("Ventas", format="$ %.2f"),
+            "cumplimiento_ventas": st.column_config.ProgressColumn(
+                "Cumplimiento de Meta", format="%.0f%%", min_value=0, max_value=100
+            ),
+            "cotizaciones": st.column_config.NumberColumn("Cotizaciones", format="$ %.2f"),
+            "ticket_promedio": st.column_config.NumberColumn("Ticket Promedio", format="$ %.2f"),
+            "tasa_conversion": st.column_config.NumberColumn("Conversión", format="%.1f%%"),
+            "promedio_citas": st.column_config.NumberColumn("Citas/Semana", format="%.1f"),
+            "cumplimiento_citas": st.column_config.ProgressColumn(
+                "Cumplimiento de Citas", format="%.0f%%", min_value=0, max_value=100
+            ),
+        }
+    )
 
 
 def mostrar_graficos(total_citas, total_prospectos, total_proyectos):
@@ -207,12 +817,16 @@ def mostrar_graficos(total_citas, total_prospectos, total_proyectos):
         st.plotly_chart(fig, use_container_width=True)
 
 
-def mostrar_grafico_proyectos_estado(proyectos_filtrados):
+def figura_proyectos_estado(proyectos_filtrados):
     """
-    Muestra un gráfico de pie con la distribución de proyectos por estado
+    Construye el gráfico de dona con la distribución de proyectos por estado
     
     Args:
         proyectos_filtrados: DataFrame de proyectos filtrados
+    
+    Returns:
+        tuple: (figura, mensaje) — figura es None y mensaje explica por qué
+        cuando no hay datos para graficar
     """
     if len(proyectos_filtrados) > 0 and 'status' in proyectos_filtrados.columns:
         # Normalizar estados a mayúsculas para el conteo
@@ -223,8 +837,6 @@ def mostrar_grafico_proyectos_estado(proyectos_filtrados):
         proyectos_por_estado = proyectos_temp.groupby('status_upper').size().reset_index(name='Cantidad')
         proyectos_por_estado.rename(columns={'status_upper': 'status'}, inplace=True)
         
-        st.markdown("#### :material/donut_small: Distribución de Proyectos por Estado")
-        
         # Definir colores según el estado
         color_map = {
             'EN PROCESO': '#FFA500',  # Naranja
@@ -233,9 +845,6 @@ def mostrar_grafico_proyectos_estado(proyectos_filtrados):
             'PERDIDO': '#E74C3C'   # Rojo
         }
         
-        # Crear lista de colores basada en los estados presentes
-        colores = [color_map.get(estado, '#95A5A6') for estado in proyectos_por_estado['status']]
-        
         fig = px.pie(
             proyectos_por_estado,
             values='Cantidad',
@@ -253,17 +862,38 @@ def mostrar_grafico_proyectos_estado(proyectos_filtrados):
             margin=dict(l=20, r=20, t=40, b=20),
             legend=dict(orientation='h', yanchor='bottom', y=-0.2)
         )
+        return fig, None
+    
+    return None, "No hay proyectos para mostrar la distribución por estado"
+
+
+def mostrar_grafico_proyectos_estado(proyectos_filtrados, figura=None):
+    """
+    Muestra un gráfico de pie con la distribución de proyectos por estado
+    
+    Args:
+        proyectos_filtrados: DataFrame de proyectos filtrados
+        figura: Resultado ya calculado de figura_proyectos_estado (opcional)
+    """
+    fig, mensaje = figura if figura is not None else figura_proyectos_estado(proyectos_filtrados)
+    
+    if fig is not None:
+        st.markdown("#### :material/donut_small: Distribución de Proyectos por Estado")
         st.plotly_chart(fig, use_container_width=True)
     else:
-        st.info("No hay proyectos para mostrar la distribución por estado")
+        st.info(mensaje)
 
 
-def mostrar_grafico_citas_por_mes(citas_filtradas):
+def figura_citas_por_mes(citas_filtradas):
     """
-    Muestra un gráfico de área con el número de citas por mes
+    Construye el gráfico de área con el número de citas por mes
     
     Args:
         citas_filtradas: DataFrame de citas filtradas
+    
+    Returns:
+        tuple: (figura, mensaje) — figura es None y mensaje explica por qué
+        cuando no hay datos para graficar
     """
     if len(citas_filtradas) > 0 and 'fecha' in citas_filtradas.columns:
         # Crear una copia para no modificar el DataFrame original
@@ -336,11 +966,27 @@ def mostrar_grafico_citas_por_mes(citas_filtradas):
             fig.update_xaxes(showgrid=False, tickangle=-30)
             fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(0,0,0,0.06)')
             
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No hay citas con fechas válidas para mostrar la evolución mensual")
+            return fig, None
+        
+        return None, "No hay citas con fechas válidas para mostrar la evolución mensual"
+    
+    return None, "No hay citas disponibles para mostrar la evolución mensual"
+
+
+def mostrar_grafico_citas_por_mes(citas_filtradas, figura=None):
+    """
+    Muestra un gráfico de área con el número de citas por mes
+    
+    Args:
+        citas_filtradas: DataFrame de citas filtradas
+        figura: Resultado ya calculado de figura_citas_por_mes (opcional)
+    """
+    fig, mensaje = figura if figura is not None else figura_citas_por_mes(citas_filtradas)
+    
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
     else:
-        st.info("No hay citas disponibles para mostrar la evolución mensual")
+        st.info(mensaje)
 
 
 def mostrar_actividad_reciente(citas_filtradas, prospeccion_filtrada, proyectos_filtrados):
@@ -1,14 +1,27 @@
 """
 Cálculo de métricas para el Dashboard
 """
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from .derived_columns import normalizar_asesor, preparar_citas, preparar_proyectos, semana_iso_ordinal
+from .period_comparison import PeriodAggregates
+from .sales_forecast import pronostico_ventas
+from .pipeline_simulation import simular_trimestre
+from .sales_cycle import metricas_ciclo_venta
+from .loss_analysis import metricas_perdidas
+from .industry_analysis import metricas_por_giro
+from .funnel import FunnelIndex
+from .client_concentration import analisis_pareto
+from .client_cohorts import cohortes_clientes
+
 
 class MetricsCalculator:
     """Calculador de métricas del dashboard"""
     
-    def __init__(self, citas_data, prospeccion_data, proyectos_data, metas_data):
+    def __init__(self, citas_data, prospeccion_data, proyectos_data, metas_data, agregados_periodo=None,
+                 indice_embudo=None):
         """
         Inicializa el calculador de métricas
         
@@ -17,11 +30,17 @@ class MetricsCalculator:
             prospeccion_data: DataFrame de prospección
             proyectos_data: DataFrame de proyectos
             metas_data: DataFrame de metas
+            agregados_periodo: PeriodAggregates ya construido para estos datos
+                (opcional; si no se da, se construye al primer comparativo)
+            indice_embudo: FunnelIndex ya construido para estos datos
+                (opcional; si no se da, se construye al primer embudo)
         """
         self.citas_data = citas_data
         self.prospeccion_data = prospeccion_data
         self.proyectos_data = proyectos_data
         self.metas_data = metas_data
+        self._agregados_periodo = agregados_periodo
+        self._indice_embudo = indice_embudo
     
     def metricas_principales(self, citas_filtradas, prospeccion_filtrada, proyectos_filtrados):
         """
@@ -53,46 +72,73 @@ class MetricsCalculator:
             'total_cartera': total_cartera
         }
     
+    def matriz_citas_semanales(self, fecha_inicio, fecha_fin, asesor_seleccionado):
+        """
+        Construye la matriz de conteo de citas asesor × semana ISO
+
+        Las semanas sin citas quedan como columnas en cero, de modo que
+        cuentan en los promedios en lugar de desaparecer.
+
+        Returns:
+            tuple: (asesores, semana_inicial, matriz) donde matriz[i, j] es el
+            número de citas del asesor i en la semana semana_inicial + j
+        """
+        citas = self.citas_data
+        if 'semana_iso' not in citas.columns or 'asesor_norm' not in citas.columns:
+            citas = preparar_citas(citas)
+
+        semanas = citas['semana_iso'].to_numpy() if 'semana_iso' in citas.columns else np.full(len(citas), -1)
+        asesores = citas['asesor_norm'].to_numpy() if 'asesor_norm' in citas.columns else np.full(len(citas), '')
+        mask = semanas >= 0
+
+        if fecha_inicio is not None and fecha_fin is not None:
+            fecha_inicio_dt = pd.to_datetime(fecha_inicio)
+            fecha_fin_dt = pd.to_datetime(fecha_fin)
+            if 'fecha_dt' in citas.columns:
+                fechas = citas['fecha_dt']
+                mask &= ((fechas >= fecha_inicio_dt) & (fechas <= fecha_fin_dt)).to_numpy()
+            semana_inicial = int(semana_iso_ordinal(pd.Series([fecha_inicio_dt]))[0])
+            semana_final = int(semana_iso_ordinal(pd.Series([fecha_fin_dt]))[0])
+        elif mask.any():
+            semana_inicial = int(semanas[mask].min())
+            semana_final = int(semanas[mask].max())
+        else:
+            semana_inicial, semana_final = 0, -1
+
+        if asesor_seleccionado and asesor_seleccionado != "Todos":
+            asesor_norm = asesor_seleccionado.strip().upper()
+            mask &= asesores == asesor_norm
+            codigos = np.zeros(int(mask.sum()), dtype=np.int64)
+            nombres = np.array([asesor_norm])
+        else:
+            codigos, nombres = pd.factorize(asesores[mask])
+            nombres = np.asarray(nombres)
+
+        total_semanas = max(semana_final - semana_inicial + 1, 0)
+        celdas = codigos * total_semanas + (semanas[mask] - semana_inicial)
+        matriz = np.bincount(
+            celdas, minlength=len(nombres) * total_semanas
+        ).reshape(len(nombres), total_semanas)
+
+        return nombres, semana_inicial, matriz
+
     def metricas_citas_semanales(self, fecha_inicio, fecha_fin, asesor_seleccionado):
         """
         Calcula las métricas de citas semanales
         
+        El promedio es de citas por semana del asesor seleccionado (o del
+        equipo completo en "Todos"), contando en cero las semanas sin citas.
+        
         Returns:
             dict: Diccionario con métricas de citas semanales
         """
         if 'fecha_dt' in self.citas_data.columns or 'fecha' in self.citas_data.columns:
-            citas_con_fecha = self.citas_data.copy()
-            if 'fecha_dt' not in citas_con_fecha.columns:
-                citas_con_fecha['fecha_dt'] = pd.to_datetime(
-                    citas_con_fecha['fecha'], dayfirst=False, errors='coerce'
-                )
-            
-            # Aplicar filtros
-            citas_analisis = citas_con_fecha.copy()
-            if fecha_inicio is not None and fecha_fin is not None:
-                fecha_inicio_dt = pd.to_datetime(fecha_inicio)
-                fecha_fin_dt = pd.to_datetime(fecha_fin)
-                mask = (
-                    (citas_analisis['fecha_dt'].notna()) &
-                    (citas_analisis['fecha_dt'] >= fecha_inicio_dt) &
-                    (citas_analisis['fecha_dt'] <= fecha_fin_dt)
-                )
-                citas_analisis = citas_analisis[mask]
-            
-            if asesor_seleccionado and asesor_seleccionado != "Todos":
-                citas_analisis = citas_analisis[
-                    citas_analisis['asesor'].astype(str).str.strip().str.upper() == asesor_seleccionado.upper()
-                ]
-            
-            # Calcular semana del año
-            citas_analisis['semana'] = citas_analisis['fecha_dt'].dt.isocalendar().week
-            citas_analisis['ano'] = citas_analisis['fecha_dt'].dt.year
-            
-            # Contar citas por asesor y semana
-            citas_por_semana = citas_analisis.groupby(['asesor', 'ano', 'semana']).size().reset_index(name='citas')
+            _, _, matriz = self.matriz_citas_semanales(fecha_inicio, fecha_fin, asesor_seleccionado)
             
-            # Calcular promedio
-            promedio_general = citas_por_semana['citas'].mean() if len(citas_por_semana) > 0 else 0
+            # Citas por semana (sumando asesores) y promedio sobre todas las semanas del rango
+            citas_por_semana = matriz.sum(axis=0)
+            total_semanas = len(citas_por_semana)
+            promedio_general = float(citas_por_semana.mean()) if total_semanas > 0 else 0
             
             # Determinar meta
             meta_citas = 20 if asesor_seleccionado == "Todos" else 5
@@ -111,10 +157,6 @@ class MetricsCalculator:
             else:
                 delta_color = "inverse"
             
-            # Total de semanas analizadas
-            semanas_unicas = citas_por_semana[['ano', 'semana']].drop_duplicates()
-            total_semanas = len(semanas_unicas)
-            
             return {
                 'promedio_general': promedio_general,
                 'delta_text': delta_text,
@@ -301,6 +343,265 @@ class MetricsCalculator:
             'color_cot': color_cot
         }
     
+    def _metas_en_rango(self, fecha_inicio=None, fecha_fin=None):
+        """
+        Filtra las metas de los meses comprendidos en el rango de fechas
+        (o del mes actual si no hay rango)
+        
+        Returns:
+            pd.DataFrame: Metas filtradas
+        """
+        if len(self.metas_data) == 0:
+            return pd.DataFrame(columns=['asesor', 'mes', 'ano', 'meta'])
+        
+        if fecha_inicio is not None and fecha_fin is not None:
+            fecha_inicio_dt = pd.to_datetime(fecha_inicio)
+            fecha_fin_dt = pd.to_datetime(fecha_fin)
+        else:
+            fecha_inicio_dt = fecha_fin_dt = pd.Timestamp(datetime.now())
+        
+        mes_inicio = fecha_inicio_dt.year * 12 + fecha_inicio_dt.month
+        mes_fin = fecha_fin_dt.year * 12 + fecha_fin_dt.month
+        mes_meta = self.metas_data['ano'].astype(int) * 12 + self.metas_data['mes'].astype(int)
+        
+        return self.metas_data[(mes_meta >= mes_inicio) & (mes_meta <= mes_fin)]
+    
+    def metricas_por_asesor(self, todos_asesores, fecha_inicio=None, fecha_fin=None):
+        """
+        Calcula el ranking de asesores en una sola pasada agrupada
+        
+        Usa las mismas fórmulas que metricas_ventas_cotizaciones (meta del rango,
+        ventas por fecha de facturación), metricas_principales (ticket promedio)
+        y metricas_citas_semanales (cumplimiento sobre 5 citas/semana), pero
+        agrupando por asesor en lugar de llamar a cada método una vez por asesor.
+        La tasa de conversión es ganados / (en proceso + ganados).
+        
+        Args:
+            todos_asesores: Lista de todos los asesores
+            fecha_inicio: Fecha de inicio del filtro (opcional)
+            fecha_fin: Fecha de fin del filtro (opcional)
+        
+        Returns:
+            pd.DataFrame: Una fila por asesor, ordenada por ranking
+        """
+        nombres = pd.Series(todos_asesores, dtype=object)
+        asesores = pd.DataFrame({'asesor': nombres, 'asesor_norm': normalizar_asesor(nombres)})
+        asesores = asesores.drop_duplicates('asesor_norm').set_index('asesor_norm')
+        
+        # Metas del rango por asesor
+        metas = self._metas_en_rango(fecha_inicio, fecha_fin)
+        meta = metas.groupby(normalizar_asesor(metas['asesor']))['meta'].sum() if len(metas) > 0 else pd.Series(dtype=float)
+        
+        # Proyectos: una sola agrupación con todas las sumas y conteos
+        proyectos = self.proyectos_data
+        if len(proyectos) > 0 and 'es_venta' not in proyectos.columns:
+            proyectos = preparar_proyectos(proyectos)
+        
+        if len(proyectos) > 0 and 'asesor_norm' in proyectos.columns and 'es_venta' in proyectos.columns:
+            total = pd.to_numeric(proyectos['total'], errors='coerce').fillna(0).to_numpy()
+            es_venta = proyectos['es_venta'].to_numpy()
+            en_rango = np.ones(len(proyectos), dtype=bool)
+            if fecha_inicio is not None and fecha_fin is not None:
+                fecha_venta = proyectos['fecha_venta']
+                en_rango = (
+                    (fecha_venta >= pd.to_datetime(fecha_inicio)) &
+                    (fecha_venta <= pd.to_datetime(fecha_fin))
+                ).to_numpy()
+            
+            agregados = pd.DataFrame({
+                'asesor_norm': proyectos['asesor_norm'].to_numpy(),
+                'ventas': np.where(es_venta & en_rango, total, 0.0),
+                'cotizaciones': total,
+                'monto_vendido': np.where(es_venta, total, 0.0),
+                'num_vendidos': es_venta.astype(np.int64),
+                'num_proceso': (proyectos['status_norm'] == 'EN PROCESO').to_numpy().astype(np.int64),
+            }).groupby('asesor_norm').sum()
+        else:
+            agregados = pd.DataFrame(
+                columns=['ventas', 'cotizaciones', 'monto_vendido', 'num_vendidos', 'num_proceso'],
+                dtype=float
+            )
+        
+        # Citas: filas de la matriz asesor × semana
+        nombres_citas, _, matriz = self.matriz_citas_semanales(fecha_inicio, fecha_fin, "Todos")
+        promedio_citas = pd.Series(
+            matriz.mean(axis=1) if matriz.shape[1] > 0 else np.zeros(len(nombres_citas)),
+            index=pd.Index(nombres_citas, dtype=object)
+        )
+        
+        ranking = asesores.join(agregados, how='left')
+        ranking['meta'] = meta.reindex(ranking.index)
+        ranking['promedio_citas'] = promedio_citas.reindex(ranking.index)
+        ranking = ranking.fillna({
+            'meta': 0, 'ventas': 0, 'cotizaciones': 0, 'monto_vendido': 0,
+            'num_vendidos': 0, 'num_proceso': 0, 'promedio_citas': 0
+        })
+        
+        num_vendidos = ranking['num_vendidos'].to_numpy(dtype=float)
+        oportunidades = num_vendidos + ranking['num_proceso'].to_numpy(dtype=float)
+        meta_total = ranking['meta'].to_numpy(dtype=float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ranking['ticket_promedio'] = np.where(num_vendidos > 0, ranking['monto_vendido'] / num_vendidos, 0.0)
+            ranking['tasa_conversion'] = np.where(oportunidades > 0, num_vendidos / oportunidades * 100, 0.0)
+            ranking['cumplimiento_ventas'] = np.where(meta_total > 0, ranking['ventas'] / meta_total * 100, 0.0)
+        ranking['cumplimiento_citas'] = ranking['promedio_citas'] / 5 * 100
+        
+        # Primero quienes tienen meta (por % de cumplimiento), después por ventas
+        ranking['_tiene_meta'] = meta_total > 0
+        ranking = ranking.sort_values(
+            ['_tiene_meta', 'cumplimiento_ventas', 'ventas'], ascending=[False, False, False]
+        ).drop(columns=['_tiene_meta', 'monto_vendido', 'num_vendidos', 'num_proceso'])
+        ranking.insert(0, 'ranking', np.arange(1, len(ranking) + 1))
+        
+        return ranking.reset_index(drop=True)
+    
+    def comparativo_periodos(self, fecha_inicio=None, fecha_fin=None, asesor_seleccionado="Todos"):
+        """
+        Compara los KPIs del periodo contra el periodo anterior (MoM/QoQ) y el
+        mismo periodo del año anterior (YoY)
+        
+        Cubre los KPIs de las tarjetas que dependen del rango de fechas, con la
+        misma definición que metricas_ventas_cotizaciones (ventas, meta),
+        metricas_principales (citas, prospectos) y metricas_citas_semanales.
+        Todos los periodos se leen del mismo agregado por asesor y día, que se
+        construye una sola vez por calculador.
+        
+        Args:
+            fecha_inicio: Fecha de inicio del filtro (opcional, por defecto el mes en curso)
+            fecha_fin: Fecha de fin del filtro (opcional)
+            asesor_seleccionado: Asesor seleccionado en filtros
+        
+        Returns:
+            dict: Comparativo por KPI (ver PeriodAggregates.comparar)
+        """
+        if self._agregados_periodo is None:
+            self._agregados_periodo = PeriodAggregates(
+                self.citas_data, self.prospeccion_data, self.proyectos_data, self.metas_data
+            )
+        return self._agregados_periodo.comparar(fecha_inicio, fecha_fin, asesor_seleccionado)
+    
+    def pronostico_ventas(self, todos_asesores, hoy=None):
+        """
+        Proyecta las ventas al cierre del mes y del trimestre en curso para
+        todos los asesores a la vez (ritmo por día hábil + pipeline ponderado)
+        
+        Args:
+            todos_asesores: Lista de todos los asesores
+            hoy: Fecha de corte (opcional, por defecto hoy)
+        
+        Returns:
+            pd.DataFrame: Pronóstico por asesor (ver sales_forecast.pronostico_ventas)
+        """
+        return pronostico_ventas(self.proyectos_data, self.metas_data, todos_asesores, hoy)
+    
+    def simulacion_trimestre(self, todos_asesores, asesor_seleccionado="Todos", simulaciones=10_000, semilla=0):
+        """
+        Simula (Monte Carlo) el cierre del pipeline EN PROCESO para estimar la
+        probabilidad de alcanzar la meta del trimestre en curso
+        
+        Args:
+            todos_asesores: Lista de todos los asesores
+            asesor_seleccionado: Asesor seleccionado en filtros
+            simulaciones: Número de simulaciones
+            semilla: Semilla del generador (resultados reproducibles)
+        
+        Returns:
+            dict: Distribución del total del trimestre (ver pipeline_simulation.simular_trimestre)
+        """
+        return simular_trimestre(
+            self.proyectos_data, self.metas_data, todos_asesores, asesor_seleccionado,
+            simulaciones, semilla
+        )
+    
+    def metricas_ciclo_venta(self, proyectos_filtrados, fecha_inicio=None, fecha_fin=None):
+        """
+        Calcula el ciclo de venta (días de cotización a facturación) de los
+        proyectos ganados, global, por asesor y por mes de cotización
+        
+        Args:
+            proyectos_filtrados: DataFrame de proyectos filtrados
+            fecha_inicio: Fecha de inicio del filtro (opcional)
+            fecha_fin: Fecha de fin del filtro (opcional)
+        
+        Returns:
+            dict: Distribución del ciclo (ver sales_cycle.metricas_ciclo_venta)
+        """
+        return metricas_ciclo_venta(proyectos_filtrados, fecha_inicio, fecha_fin)
+    
+    def metricas_perdidas(self, proyectos_filtrados, fecha_inicio=None, fecha_fin=None):
+        """
+        Calcula el monto y número de proyectos perdidos por motivo, por
+        asesor y por mes
+        
+        Args:
+            proyectos_filtrados: DataFrame de proyectos filtrados
+            fecha_inicio: Fecha de inicio del filtro (opcional)
+            fecha_fin: Fecha de fin del filtro (opcional)
+        
+        Returns:
+            dict: Desgloses de pérdidas (ver loss_analysis.metricas_perdidas)
+        """
+        return metricas_perdidas(proyectos_filtrados, fecha_inicio, fecha_fin)
+    
+    def metricas_por_giro(self, citas_filtradas, proyectos_filtrados):
+        """
+        Calcula citas, conversión a proyecto y ventas por giro de negocio
+        
+        Args:
+            citas_filtradas: DataFrame de citas filtradas
+            proyectos_filtrados: DataFrame de proyectos filtrados
+        
+        Returns:
+            pd.DataFrame: Una fila por giro (ver industry_analysis.metricas_por_giro)
+        """
+        return metricas_por_giro(citas_filtradas, proyectos_filtrados)
+    
+    def analisis_pareto(self, proyectos_filtrados, fecha_inicio=None, fecha_fin=None, top=20):
+        """
+        Calcula la concentración de ventas GANADO por cliente (Pareto / ABC)
+        
+        Args:
+            proyectos_filtrados: DataFrame de proyectos filtrados
+            fecha_inicio: Fecha de inicio del filtro (opcional)
+            fecha_fin: Fecha de fin del filtro (opcional)
+            top: Número de clientes en la tabla top-K
+        
+        Returns:
+            dict: Resumen y top-K de clientes (ver client_concentration.analisis_pareto)
+        """
+        return analisis_pareto(proyectos_filtrados, fecha_inicio, fecha_fin, top)
+    
+    def cohortes_clientes(self, hoy=None):
+        """
+        Agrupa a los clientes por mes de su primera venta sobre toda la
+        historia: tasa de recompra, valor acumulado y LTV por cliente
+        
+        Args:
+            hoy: Fecha de corte (opcional, por defecto hoy)
+        
+        Returns:
+            dict: cohortes, valor_acumulado y ltv (ver client_cohorts.cohortes_clientes)
+        """
+        return cohortes_clientes(self.proyectos_data, hoy)
+    
+    def embudo_enlazado(self, fecha_inicio=None, fecha_fin=None, asesor_seleccionado="Todos"):
+        """
+        Calcula el embudo citas → prospección → proyectos → ganados enlazando
+        registros por asesor y nombre de prospecto/cliente
+        
+        Args:
+            fecha_inicio: Inicio del periodo de la primera cita (opcional)
+            fecha_fin: Fin del periodo de la primera cita (opcional)
+            asesor_seleccionado: Asesor seleccionado en filtros
+        
+        Returns:
+            pd.DataFrame: Una fila por etapa (ver FunnelIndex.embudo)
+        """
+        if self._indice_embudo is None:
+            self._indice_embudo = FunnelIndex(self.citas_data, self.prospeccion_data, self.proyectos_data)
+        return self._indice_embudo.embudo(fecha_inicio, fecha_fin, asesor_seleccionado)
+    
     def metricas_ventas_trimestrales(self, proyectos_filtrados):
         """
         Calcula las métricas de ventas trimestrales agregadas de todos los asesores
@@ -1,11 +1,70 @@
 """
 Carga de datos desde Supabase
 """
+import uuid
+
 import pandas as pd
 from .supabase_client import get_supabase_client
+from .derived_columns import preparar_citas, preparar_proyectos
+from .entity_resolution import EntityResolver, asignar_entidades
 import streamlit as st
 
 
+@st.cache_resource(show_spinner=False)
+def obtener_resolver():
+    """
+    Resolvedor de entidades compartido por todas las sesiones
+
+    Vive mientras el proceso esté activo: en cada recarga solo se resuelven
+    los nombres nuevos, y los IDs ya asignados no cambian.
+
+    Returns:
+        EntityResolver: Resolvedor de prospectos/clientes
+    """
+    return EntityResolver()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cargar_tablas():
+    """
+    Lee las tablas de Supabase y precalcula las columnas derivadas
+    
+    El resultado queda en caché hasta que expira el TTL o hasta que una página
+    de captura guarda cambios (``st.cache_data.clear()``); la versión
+    identifica esa carga para que los cálculos derivados se cacheen por versión.
+    
+    Returns:
+        tuple: (citas_data, prospeccion_data, proyectos_data, metas_data, version)
+    """
+    client = get_supabase_client()
+    
+    # Cargar CITAS
+    citas_response = client.select("citas").execute()
+    citas_data = pd.DataFrame(citas_response.data) if citas_response.data else pd.DataFrame()
+    citas_data = preparar_citas(citas_data)
+    
+    # Cargar PROSPECCION
+    prospeccion_response = client.select("prospeccion").execute()
+    prospeccion_data = pd.DataFrame(prospeccion_response.data) if prospeccion_response.data else pd.DataFrame()
+    
+    # Cargar PROYECTOS
+    proyectos_response = client.select("proyectos").execute()
+    proyectos_data = pd.DataFrame(proyectos_response.data) if proyectos_response.data else pd.DataFrame()
+    proyectos_data = preparar_proyectos(proyectos_data)
+    
+    # Cargar METAS
+    metas_response = client.select("metas").execute()
+    metas_data = pd.DataFrame(metas_response.data) if metas_response.data else pd.DataFrame()
+    
+    # ID canónico de prospecto/cliente compartido entre tablas
+    resolver = obtener_resolver()
+    citas_data = asignar_entidades(resolver, citas_data, 'prospecto', 'prospecto_norm')
+    prospeccion_data = asignar_entidades(resolver, prospeccion_data, 'prospecto', 'prospecto_norm')
+    proyectos_data = asignar_entidades(resolver, proyectos_data, 'cliente', 'cliente_norm')
+    
+    return citas_data, prospeccion_data, proyectos_data, metas_data, uuid.uuid4().hex
+
+
 class DataLoader:
     """Manejador de conexión y carga de datos desde Supabase"""
     
@@ -18,6 +77,7 @@ class DataLoader:
         self.prospeccion_data = None
         self.proyectos_data = None
         self.metas_data = None
+        self.version = None
     
     def cargar_todos_datos(self):
         """
@@ -27,25 +87,14 @@ class DataLoader:
             tuple: (citas_data, prospeccion_data, proyectos_data, metas_data)
         """
         try:
-            # Cargar CITAS
-            citas_response = self.client.select("citas").execute()
-            self.citas_data = pd.DataFrame(citas_response.data) if citas_response.data else pd.DataFrame()
-            
-            # Cargar PROSPECCION
-            prospeccion_response = self.client.select("prospeccion").execute()
-            self.prospeccion_data = pd.DataFrame(prospeccion_response.data) if prospeccion_response.data else pd.DataFrame()
-            
-            # Cargar PROYECTOS
-            proyectos_response = self.client.select("proyectos").execute()
-            self.proyectos_data = pd.DataFrame(proyectos_response.data) if proyectos_response.data else pd.DataFrame()
-            
-            # Cargar METAS
-            metas_response = self.client.select("metas").execute()
-            self.metas_data = pd.DataFrame(metas_response.data) if metas_response.data else pd.DataFrame()
+            (self.citas_data, self.prospeccion_data, self.proyectos_data,
+             self.metas_data, self.version) = cargar_tablas()
             
             return self.citas_data, self.prospeccion_data, self.proyectos_data, self.metas_data
         except Exception as e:
             st.error(f"Error al cargar datos desde Supabase: {str(e)}")
+            self.citas_data = self.prospeccion_data = self.proyectos_data = self.metas_data = pd.DataFrame()
+            self.version = None
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
     
     def obtener_lista_asesores(self):
@@ -0,0 +1,197 @@
+"""
+Columnas derivadas que se precalculan una sola vez al cargar los datos
+"""
+import numpy as np
+import pandas as pd
+
+from .opciones import MOTIVOS_PERDIDA, giros_negocio
+
+
+# Categorías de motivo_perdida_cat: los motivos del catálogo más proyectos perdidos sin motivo
+SIN_MOTIVO = "SIN MOTIVO"
+CATEGORIAS_MOTIVO = MOTIVOS_PERDIDA + [SIN_MOTIVO]
+
+# Categorías de giro_cat: el catálogo de giros más citas sin giro capturado
+SIN_GIRO = "SIN GIRO"
+CATEGORIAS_GIRO = list(giros_negocio) + [SIN_GIRO]
+
+
+def normalizar_asesor(serie):
+    """
+    Normaliza nombres de asesor para compararlos (sin espacios extremos, en mayúsculas)
+
+    Args:
+        serie: Serie con nombres de asesor
+
+    Returns:
+        pd.Series: Serie normalizada
+    """
+    return serie.astype(str).str.strip().str.upper()
+
+
+def quitar_acentos(serie):
+    """
+    Quita acentos y diacríticos (Á -> A, Ñ -> N) de una serie de texto
+
+    Args:
+        serie: Serie de texto
+
+    Returns:
+        pd.Series: Serie sin acentos
+    """
+    return serie.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+
+
+def normalizar_nombre(serie):
+    """
+    Normaliza nombres libres (prospectos, clientes) para cruzarlos entre tablas
+
+    Args:
+        serie: Serie con nombres
+
+    Returns:
+        pd.Series: Nombres en mayúsculas, sin acentos y con espacios colapsados
+    """
+    nombres = quitar_acentos(serie.fillna('').astype(str).str.upper())
+    return nombres.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def categorizar_giro(serie):
+    """
+    Convierte el giro capturado a un categórico fijo construido con giros_negocio
+
+    Los giros fuera del catálogo cuentan como OTRO y los vacíos como SIN GIRO.
+
+    Args:
+        serie: Serie con giros capturados como texto libre
+
+    Returns:
+        pd.Categorical: Giro con categorías CATEGORIAS_GIRO
+    """
+    giro = normalizar_nombre(serie)
+    giro = giro.where(giro.isin(CATEGORIAS_GIRO) | (giro == ''), 'OTRO').replace('', SIN_GIRO)
+    return pd.Categorical(giro, categories=CATEGORIAS_GIRO)
+
+
+def semana_iso_ordinal(fechas):
+    """
+    Convierte fechas a un ordinal de semana ISO (semanas completas desde el lunes 1969-12-29)
+
+    Dos fechas comparten ordinal si y solo si caen en la misma semana ISO, y
+    semanas consecutivas tienen ordinales consecutivos, por lo que el ordinal
+    sirve directamente como índice de columna en una matriz de conteos.
+
+    Args:
+        fechas: Serie datetime64 (puede contener NaT)
+
+    Returns:
+        np.ndarray: Ordinal int64 por fila (-1 para fechas nulas)
+    """
+    fechas = pd.Series(fechas)
+    nulas = fechas.isna().to_numpy()
+    dias = fechas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    # El 1970-01-01 fue jueves: desplazar 3 días deja el lunes como inicio de semana
+    semanas = (dias + 3) // 7
+    semanas[nulas] = -1
+    return semanas
+
+
+def preparar_citas(citas_data):
+    """
+    Agrega a citas las columnas derivadas usadas por las métricas
+
+    Columnas agregadas:
+        fecha_dt: fecha parseada a datetime
+        semana_iso: ordinal de semana ISO (-1 si no hay fecha)
+        asesor_norm: asesor normalizado
+        prospecto_norm: prospecto normalizado (ver normalizar_nombre)
+        giro_cat: giro como categórico del catálogo (ver categorizar_giro)
+
+    Args:
+        citas_data: DataFrame de citas
+
+    Returns:
+        pd.DataFrame: Copia de citas con las columnas derivadas
+    """
+    citas = citas_data.copy()
+    if len(citas) == 0:
+        return citas
+
+    if 'fecha' in citas.columns and 'fecha_dt' not in citas.columns:
+        citas['fecha_dt'] = pd.to_datetime(citas['fecha'], dayfirst=False, errors='coerce')
+
+    if 'fecha_dt' in citas.columns:
+        citas['semana_iso'] = semana_iso_ordinal(citas['fecha_dt'])
+
+    if 'asesor' in citas.columns:
+        citas['asesor_norm'] = normalizar_asesor(citas['asesor'])
+
+    if 'prospecto' in citas.columns:
+        citas['prospecto_norm'] = normalizar_nombre(citas['prospecto'])
+
+    if 'giro' in citas.columns:
+        citas['giro_cat'] = categorizar_giro(citas['giro'])
+
+    return citas
+
+
+def preparar_proyectos(proyectos_data):
+    """
+    Agrega a proyectos las columnas derivadas usadas por las métricas
+
+    Columnas agregadas:
+        fecha_venta: fecha_facturacion, o fecha_cotizacion/fecha si no hay facturación
+        cohorte: primer día del mes de cotización
+        dias_ciclo: días de cotización a facturación (NaN si falta alguna o es negativo)
+        status_norm: status normalizado
+        asesor_norm: asesor normalizado
+        cliente_norm: cliente normalizado (ver normalizar_nombre)
+        es_venta: True para proyectos GANADO o VENDIDO
+        motivo_perdida_cat: motivo de pérdida como categórico (textos fuera del
+            catálogo cuentan como OTRO; vacío es SIN MOTIVO)
+
+    Args:
+        proyectos_data: DataFrame de proyectos
+
+    Returns:
+        pd.DataFrame: Copia de proyectos con las columnas derivadas
+    """
+    proyectos = proyectos_data.copy()
+    if len(proyectos) == 0:
+        return proyectos
+
+    if 'fecha_facturacion' in proyectos.columns:
+        fecha_facturacion = pd.to_datetime(proyectos['fecha_facturacion'], errors='coerce')
+    else:
+        fecha_facturacion = pd.Series(pd.NaT, index=proyectos.index, dtype='datetime64[ns]')
+
+    if 'fecha_cotizacion' in proyectos.columns:
+        fecha_cotizacion = pd.to_datetime(proyectos['fecha_cotizacion'], errors='coerce')
+    elif 'fecha' in proyectos.columns:
+        fecha_cotizacion = pd.to_datetime(proyectos['fecha'], dayfirst=False, errors='coerce')
+    else:
+        fecha_cotizacion = pd.Series(pd.NaT, index=proyectos.index, dtype='datetime64[ns]')
+
+    proyectos['fecha_venta'] = fecha_facturacion.fillna(fecha_cotizacion)
+
+    # Ciclo de venta: se calcula aquí una vez para no re-parsear fechas en cada ejecución
+    proyectos['cohorte'] = fecha_cotizacion.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]').astype('datetime64[ns]')
+    dias_ciclo = (fecha_facturacion - fecha_cotizacion).dt.days.astype(float)
+    proyectos['dias_ciclo'] = dias_ciclo.where(dias_ciclo >= 0)
+
+    if 'status' in proyectos.columns:
+        proyectos['status_norm'] = proyectos['status'].fillna('').astype(str).str.strip().str.upper()
+        proyectos['es_venta'] = proyectos['status_norm'].isin(['GANADO', 'VENDIDO'])
+
+    if 'asesor' in proyectos.columns:
+        proyectos['asesor_norm'] = normalizar_asesor(proyectos['asesor'])
+
+    if 'cliente' in proyectos.columns:
+        proyectos['cliente_norm'] = normalizar_nombre(proyectos['cliente'])
+
+    if 'motivo_perdida' in proyectos.columns:
+        motivo = proyectos['motivo_perdida'].fillna('').astype(str).str.strip().str.upper()
+        motivo = motivo.where(motivo.isin(CATEGORIAS_MOTIVO) | (motivo == ''), 'OTRO').replace('', SIN_MOTIVO)
+        proyectos['motivo_perdida_cat'] = pd.Categorical(motivo, categories=CATEGORIAS_MOTIVO)
+
+    return proyectos
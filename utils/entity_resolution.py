@@ -0,0 +1,206 @@
+"""
+Resolución de entidades: asigna un ID canónico a nombres de prospectos/clientes
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .derived_columns import normalizar_nombre
+
+
+# Sufijos de razón social que se quitan al final del nombre (ya sin puntos ni comas)
+_SUFIJOS_LEGALES = re.compile(
+    r'(\s+(SA|SAB|SAPI|S|SC|SRL|RL|AC|IAP|DE|CV|INC|LLC|LTD|CORP))+$'
+)
+_PUNTUACION = re.compile(r'[^\w\s]')
+
+# Tokens demasiado comunes para usarse como claves de bloque
+TOKENS_COMUNES = {'DE', 'DEL', 'LA', 'LAS', 'EL', 'LOS', 'Y', 'E', 'GRUPO', 'CIA', 'COMPANIA'}
+
+
+def normalizar_razon_social(serie):
+    """
+    Normaliza razones sociales para compararlas
+
+    Quita acentos, puntuación y sufijos legales ("SA DE CV", "S DE RL",
+    "SAPI DE CV", "AC", ...), de modo que "Grupo ABC, S.A. de C.V." y
+    "GRUPO ABC" quedan iguales.
+
+    Args:
+        serie: Serie con nombres
+
+    Returns:
+        pd.Series: Nombres normalizados
+    """
+    nombres = normalizar_nombre(serie).str.replace(r'[.,]', '', regex=True)
+    nombres = nombres.str.replace(_PUNTUACION, ' ', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+    return nombres.str.replace(_SUFIJOS_LEGALES, '', regex=True)
+
+
+def _trigramas(nombre):
+    """Conjunto de trigramas de caracteres (con bordes) de un nombre"""
+    texto = f"  {nombre} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _claves_bloque(nombre):
+    """Claves del índice de bloques: tokens significativos y prefijos de 4 letras"""
+    claves = set()
+    for token in nombre.split():
+        if token in TOKENS_COMUNES or len(token) < 2:
+            continue
+        claves.add(token)
+        if len(token) >= 5:
+            claves.add(token[:4] + '*')
+    return claves
+
+
+class EntityResolver:
+    """
+    Asigna IDs canónicos a nombres escritos libremente
+
+    Cada nombre se normaliza (``normalizar_razon_social``); nombres
+    normalizados iguales comparten ID. Para los demás, un índice de bloques
+    (token → entidades) limita las comparaciones a entidades que comparten
+    algún token, y se unen si la similitud de Jaccard de sus trigramas de
+    caracteres supera el umbral. Así se evita comparar todos contra todos.
+
+    Es incremental: ``agregar`` solo procesa nombres nuevos, de modo que el
+    mismo resolvedor puede reutilizarse cuando se insertan registros.
+
+    Ejemplo:
+        resolver = EntityResolver()
+        ids = resolver.resolver(proyectos['cliente'])
+        resolver.nombre_canonico(ids[0])
+    """
+
+    def __init__(self, umbral=0.75, max_bloque=500):
+        """
+        Inicializa el resolvedor vacío
+
+        Args:
+            umbral: Similitud mínima (0–1) para considerar dos nombres la misma entidad
+            max_bloque: Bloques con más entidades que esto no se usan para buscar
+                candidatos (tokens demasiado frecuentes)
+        """
+        self.umbral = umbral
+        self.max_bloque = max_bloque
+        self._ids = {}
+        self._canonicos = []
+        self._trigramas = []
+        self._bloques = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Número de entidades canónicas"""
+        return len(self._canonicos)
+
+    def _buscar(self, nombre, trigramas):
+        """Busca en el índice de bloques la entidad más parecida (o None)"""
+        candidatos = set()
+        for clave in _claves_bloque(nombre):
+            bloque = self._bloques.get(clave)
+            if bloque is not None and len(bloque) <= self.max_bloque:
+                candidatos.update(bloque)
+
+        mejor, mejor_similitud = None, self.umbral
+        for candidato in candidatos:
+            otros = self._trigramas[candidato]
+            similitud = len(trigramas & otros) / len(trigramas | otros)
+            if similitud >= mejor_similitud:
+                mejor, mejor_similitud = candidato, similitud
+        return mejor
+
+    def _nueva_entidad(self, nombre, trigramas):
+        """Registra una entidad canónica y la indexa en sus bloques"""
+        entidad = len(self._canonicos)
+        self._canonicos.append(nombre)
+        self._trigramas.append(trigramas)
+        for clave in _claves_bloque(nombre):
+            self._bloques.setdefault(clave, []).append(entidad)
+        return entidad
+
+    def agregar(self, nombres):
+        """
+        Incorpora nombres al resolvedor (solo se procesan los no vistos)
+
+        Args:
+            nombres: Serie o lista de nombres
+        """
+        normalizados = normalizar_razon_social(pd.Series(nombres, dtype=object))
+        with self._lock:
+            for nombre in pd.unique(normalizados):
+                if not nombre or nombre in self._ids:
+                    continue
+                trigramas = _trigramas(nombre)
+                entidad = self._buscar(nombre, trigramas)
+                if entidad is None:
+                    entidad = self._nueva_entidad(nombre, trigramas)
+                self._ids[nombre] = entidad
+
+    def resolver(self, nombres):
+        """
+        Devuelve el ID canónico de cada nombre, agregando los que falten
+
+        Args:
+            nombres: Serie o lista de nombres
+
+        Returns:
+            np.ndarray: ID int64 por nombre (-1 para nombres vacíos)
+        """
+        nombres = pd.Series(nombres, dtype=object)
+        self.agregar(nombres)
+        normalizados = normalizar_razon_social(nombres)
+        return normalizados.map(self._ids).fillna(-1).to_numpy(dtype=np.int64)
+
+    def nombre_canonico(self, entidad):
+        """
+        Nombre normalizado con el que se registró por primera vez una entidad
+
+        Args:
+            entidad: ID canónico
+
+        Returns:
+            str: Nombre canónico ('' si el ID es -1)
+        """
+        return self._canonicos[entidad] if entidad >= 0 else ''
+
+    def nombres_canonicos(self, entidades):
+        """
+        Versión vectorizada de ``nombre_canonico``
+
+        Args:
+            entidades: Arreglo de IDs canónicos
+
+        Returns:
+            np.ndarray: Nombre canónico por ID
+        """
+        canonicos = np.array(self._canonicos + [''], dtype=object)
+        return canonicos[np.asarray(entidades, dtype=np.int64)]
+
+
+def asignar_entidades(resolver, datos, columna_nombre, columna_norm):
+    """
+    Agrega ``entidad_id`` y reemplaza el nombre normalizado por el canónico
+
+    Así los cruces por nombre (embudo, giros, cohortes) unen variantes del
+    mismo cliente sin cambiar su código.
+
+    Args:
+        resolver: EntityResolver compartido
+        datos: DataFrame con la columna de nombre
+        columna_nombre: Columna con el nombre capturado ('prospecto' o 'cliente')
+        columna_norm: Columna derivada a sobrescribir con el nombre canónico
+
+    Returns:
+        pd.DataFrame: Copia con entidad_id (-1 si no hay nombre) y columna_norm
+    """
+    if len(datos) == 0 or columna_nombre not in datos.columns:
+        return datos
+    datos = datos.copy()
+    entidades = resolver.resolver(datos[columna_nombre])
+    datos['entidad_id'] = entidades
+    datos[columna_norm] = resolver.nombres_canonicos(entidades)
+    return datos
@@ -0,0 +1,177 @@
+"""
+Embudo comercial enlazado: citas → prospección → proyectos → ganados
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import normalizar_asesor, normalizar_nombre, preparar_citas, preparar_proyectos
+
+
+# Etapas del embudo, en orden
+ETAPAS = ['citas', 'prospeccion', 'proyectos', 'ganados']
+NOMBRES_ETAPA = {
+    'citas': 'Citas',
+    'prospeccion': 'Prospección',
+    'proyectos': 'Proyecto/Cotización',
+    'ganados': 'Ganado',
+}
+
+# Día "sin registro" en los arreglos de primera fecha por entidad
+SIN_FECHA = np.iinfo(np.int64).max
+
+
+def _dias(fechas):
+    """Fechas a días desde 1970-01-01 (SIN_FECHA para nulas)"""
+    fechas = pd.to_datetime(pd.Series(fechas), errors='coerce')
+    dias = fechas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    dias[fechas.isna().to_numpy()] = SIN_FECHA
+    return dias
+
+
+class FunnelIndex:
+    """
+    Índice hash de entidades (asesor + nombre normalizado) a través de las tablas
+
+    Si los datos vienen de ``cargar_tablas``, el nombre normalizado ya es el
+    canónico del resolvedor de entidades, así que variantes de un mismo
+    cliente cuentan como una sola entidad.
+
+    Se construye una vez por versión de datos: las claves de las cuatro
+    etapas se factorizan juntas (``pd.factorize``, tabla hash en tiempo
+    lineal) y para cada entidad se guarda la primera fecha en que aparece
+    en cada etapa. Consultar el embudo de cualquier periodo o asesor es
+    entonces una operación vectorizada sobre esos arreglos.
+    """
+
+    def __init__(self, citas_data, prospeccion_data, proyectos_data):
+        """
+        Construye el índice
+
+        Args:
+            citas_data: DataFrame de citas
+            prospeccion_data: DataFrame de prospección
+            proyectos_data: DataFrame de proyectos
+        """
+        if len(citas_data) > 0 and 'prospecto_norm' not in citas_data.columns:
+            citas_data = preparar_citas(citas_data)
+        if len(proyectos_data) > 0 and 'cliente_norm' not in proyectos_data.columns:
+            proyectos_data = preparar_proyectos(proyectos_data)
+
+        registros = {etapa: (np.array([], dtype=object), np.array([], dtype=object), np.array([], dtype=np.int64))
+                     for etapa in ETAPAS}
+
+        if len(citas_data) > 0 and 'prospecto_norm' in citas_data.columns:
+            registros['citas'] = (
+                citas_data['asesor_norm'].to_numpy(dtype=object),
+                citas_data['prospecto_norm'].to_numpy(dtype=object),
+                _dias(citas_data['fecha_dt'])
+            )
+
+        if len(prospeccion_data) > 0 and 'prospecto' in prospeccion_data.columns:
+            fecha_prospeccion = prospeccion_data['fecha'] if 'fecha' in prospeccion_data.columns \
+                else pd.Series(pd.NaT, index=prospeccion_data.index)
+            registros['prospeccion'] = (
+                normalizar_asesor(prospeccion_data['asesor']).to_numpy(dtype=object),
+                (prospeccion_data['prospecto_norm'] if 'prospecto_norm' in prospeccion_data.columns
+                 else normalizar_nombre(prospeccion_data['prospecto'])).to_numpy(dtype=object),
+                _dias(fecha_prospeccion)
+            )
+
+        if len(proyectos_data) > 0 and 'cliente_norm' in proyectos_data.columns:
+            fecha_cotizacion = proyectos_data['fecha_venta']
+            if 'fecha_cotizacion' in proyectos_data.columns:
+                fecha_cotizacion = pd.to_datetime(proyectos_data['fecha_cotizacion'], errors='coerce') \
+                    .fillna(fecha_cotizacion)
+            registros['proyectos'] = (
+                proyectos_data['asesor_norm'].to_numpy(dtype=object),
+                proyectos_data['cliente_norm'].to_numpy(dtype=object),
+                _dias(fecha_cotizacion)
+            )
+            ganados = proyectos_data[proyectos_data['es_venta']]
+            registros['ganados'] = (
+                ganados['asesor_norm'].to_numpy(dtype=object),
+                ganados['cliente_norm'].to_numpy(dtype=object),
+                _dias(ganados['fecha_venta'])
+            )
+
+        # Una sola factorización para todas las etapas: mismo código = misma entidad
+        asesores = np.concatenate([registros[etapa][0] for etapa in ETAPAS])
+        nombres = np.concatenate([registros[etapa][1] for etapa in ETAPAS])
+        validos = nombres != ''
+        claves = pd.Series(asesores, dtype=object).str.cat(pd.Series(nombres, dtype=object), sep='\x1f')
+        codigos, entidades = pd.factorize(claves.where(validos))
+
+        self.num_entidades = len(entidades)
+        self.asesor = np.empty(self.num_entidades, dtype=object)
+        self.nombre = np.empty(self.num_entidades, dtype=object)
+        if self.num_entidades > 0:
+            partes = pd.Series(entidades).str.split('\x1f', n=1, expand=True)
+            self.asesor[:] = partes[0].to_numpy()
+            self.nombre[:] = partes[1].to_numpy()
+
+        # Primera fecha de cada entidad en cada etapa
+        self.primera_fecha = {}
+        inicio = 0
+        for etapa in ETAPAS:
+            fin = inicio + len(registros[etapa][2])
+            codigos_etapa = codigos[inicio:fin]
+            dias = registros[etapa][2]
+            con_clave = codigos_etapa >= 0
+            primera = np.full(self.num_entidades, SIN_FECHA, dtype=np.int64)
+            np.minimum.at(primera, codigos_etapa[con_clave], dias[con_clave])
+            # Entidades con registro pero sin fecha: presentes, con fecha desconocida
+            presente = np.zeros(self.num_entidades, dtype=bool)
+            presente[codigos_etapa[con_clave]] = True
+            self.primera_fecha[etapa] = (primera, presente)
+            inicio = fin
+
+    def embudo(self, fecha_inicio=None, fecha_fin=None, asesor_seleccionado="Todos"):
+        """
+        Calcula el embudo de las entidades que entraron por citas en el periodo
+
+        Una entidad alcanza una etapa si tiene registros en ella y alcanzó la
+        anterior. El tiempo en etapa son los días entre la primera fecha de
+        una etapa y la primera de la siguiente (solo diferencias no negativas).
+
+        Args:
+            fecha_inicio: Inicio del periodo de la primera cita (opcional)
+            fecha_fin: Fin del periodo de la primera cita (opcional)
+            asesor_seleccionado: Asesor o "Todos"
+
+        Returns:
+            pd.DataFrame: etapa, entidades, conversion_etapa (%), conversion_total (%),
+            dias_mediana y dias_promedio (tiempo hasta llegar a la etapa)
+        """
+        primera_cita, en_citas = self.primera_fecha['citas']
+        alcanzadas = en_citas.copy()
+        if fecha_inicio is not None and fecha_fin is not None:
+            alcanzadas &= (primera_cita >= _dias([fecha_inicio])[0]) & (primera_cita <= _dias([fecha_fin])[0])
+        if asesor_seleccionado and asesor_seleccionado != "Todos":
+            alcanzadas &= self.asesor == asesor_seleccionado.strip().upper()
+
+        filas = []
+        entrada = int(alcanzadas.sum())
+        anteriores, fecha_anterior = alcanzadas, primera_cita
+        for etapa in ETAPAS:
+            fecha, presente = self.primera_fecha[etapa]
+            alcanzadas = anteriores & presente
+            if etapa == ETAPAS[0]:
+                dias = np.array([], dtype=float)
+            else:
+                con_fechas = alcanzadas & (fecha != SIN_FECHA) & (fecha_anterior != SIN_FECHA)
+                dias = (fecha[con_fechas] - fecha_anterior[con_fechas]).astype(float)
+                dias = dias[dias >= 0]
+
+            total = int(alcanzadas.sum())
+            previas = int(anteriores.sum())
+            filas.append({
+                'etapa': NOMBRES_ETAPA[etapa],
+                'entidades': total,
+                'conversion_etapa': total / previas * 100 if previas > 0 else 0.0,
+                'conversion_total': total / entrada * 100 if entrada > 0 else 0.0,
+                'dias_mediana': float(np.median(dias)) if len(dias) > 0 else None,
+                'dias_promedio': float(dias.mean()) if len(dias) > 0 else None,
+            })
+            anteriores, fecha_anterior = alcanzadas, fecha
+
+        return pd.DataFrame(filas)
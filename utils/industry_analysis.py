@@ -0,0 +1,87 @@
+"""
+Análisis de citas, conversión y ventas por giro de negocio
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import CATEGORIAS_GIRO, preparar_citas, preparar_proyectos
+
+
+def metricas_por_giro(citas_data, proyectos_data, fecha_inicio=None, fecha_fin=None):
+    """
+    Calcula por giro: citas, prospectos, prospectos convertidos y ventas
+
+    Todas las sumas se hacen con ``np.bincount`` sobre los códigos del
+    categórico ``giro_cat``. Un prospecto se considera convertido si su
+    nombre normalizado aparece como cliente en proyectos; sus ventas son el
+    total GANADO de ese cliente (contado una vez por giro).
+
+    Args:
+        citas_data: DataFrame de citas (con o sin columnas derivadas)
+        proyectos_data: DataFrame de proyectos (con o sin columnas derivadas)
+        fecha_inicio: Fecha de inicio del filtro de citas (opcional)
+        fecha_fin: Fecha de fin del filtro de citas (opcional)
+
+    Returns:
+        pd.DataFrame: giro, citas, prospectos, convertidos, tasa_conversion,
+        proyectos, ventas; solo giros con citas, ordenado por citas
+    """
+    columnas = ['giro', 'citas', 'prospectos', 'convertidos', 'tasa_conversion', 'proyectos', 'ventas']
+    if len(citas_data) > 0 and 'giro_cat' not in citas_data.columns:
+        citas_data = preparar_citas(citas_data)
+    if len(citas_data) == 0 or 'giro_cat' not in citas_data.columns:
+        return pd.DataFrame(columns=columnas)
+
+    if fecha_inicio is not None and fecha_fin is not None and 'fecha_dt' in citas_data.columns:
+        citas_data = citas_data[
+            (citas_data['fecha_dt'] >= pd.Timestamp(fecha_inicio)) &
+            (citas_data['fecha_dt'] <= pd.Timestamp(fecha_fin))
+        ]
+
+    num_giros = len(CATEGORIAS_GIRO)
+    codigos = citas_data['giro_cat'].cat.codes.to_numpy()
+    citas_por_giro = np.bincount(codigos, minlength=num_giros)
+
+    # Prospectos únicos por giro
+    prospectos = pd.DataFrame({
+        'giro': codigos,
+        'prospecto': citas_data['prospecto_norm'].to_numpy() if 'prospecto_norm' in citas_data.columns else ''
+    }).drop_duplicates()
+    prospectos = prospectos[prospectos['prospecto'] != '']
+
+    # Clientes de proyectos: número de proyectos y monto ganado por nombre normalizado
+    if len(proyectos_data) > 0 and 'cliente_norm' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+    if len(proyectos_data) > 0 and 'cliente_norm' in proyectos_data.columns:
+        total = pd.to_numeric(proyectos_data['total'], errors='coerce').fillna(0)
+        clientes = pd.DataFrame({
+            'cliente': proyectos_data['cliente_norm'].to_numpy(),
+            'proyectos': 1,
+            'ventas': total.where(proyectos_data['es_venta'], 0).to_numpy(dtype=float)
+        }).groupby('cliente').sum()
+    else:
+        clientes = pd.DataFrame(columns=['proyectos', 'ventas'], dtype=float)
+
+    cruce = clientes.reindex(prospectos['prospecto'].to_numpy())
+    convertido = cruce['proyectos'].notna().to_numpy()
+    giros_prospecto = prospectos['giro'].to_numpy()
+
+    resultado = pd.DataFrame({
+        'giro': CATEGORIAS_GIRO,
+        'citas': citas_por_giro,
+        'prospectos': np.bincount(giros_prospecto, minlength=num_giros),
+        'convertidos': np.bincount(giros_prospecto, weights=convertido, minlength=num_giros).astype(np.int64),
+        'proyectos': np.bincount(
+            giros_prospecto, weights=cruce['proyectos'].fillna(0).to_numpy(dtype=float), minlength=num_giros
+        ).astype(np.int64),
+        'ventas': np.bincount(
+            giros_prospecto, weights=cruce['ventas'].fillna(0).to_numpy(dtype=float), minlength=num_giros
+        ),
+    })
+    resultado['tasa_conversion'] = np.divide(
+        resultado['convertidos'] * 100.0, resultado['prospectos'],
+        out=np.zeros(num_giros), where=resultado['prospectos'].to_numpy() > 0
+    )
+
+    resultado = resultado[resultado['citas'] > 0].sort_values(['citas', 'ventas'], ascending=False)
+    return resultado[columnas].reset_index(drop=True)
@@ -0,0 +1,87 @@
+"""
+Análisis de proyectos perdidos por motivo de pérdida
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import CATEGORIAS_MOTIVO, SIN_MOTIVO, preparar_proyectos
+
+
+def metricas_perdidas(proyectos_data, fecha_inicio=None, fecha_fin=None):
+    """
+    Calcula el monto y número de proyectos perdidos por motivo, asesor y mes
+
+    Se hace un único ``groupby`` sobre los códigos categóricos de motivo y
+    asesor y el ordinal de mes; los desgloses por motivo, por asesor y la
+    tendencia mensual se obtienen sumando ese cubo.
+
+    Args:
+        proyectos_data: DataFrame de proyectos (con o sin columnas derivadas)
+        fecha_inicio: Fecha de inicio del filtro (opcional)
+        fecha_fin: Fecha de fin del filtro (opcional)
+
+    Returns:
+        dict: monto_perdido, num_perdidos, por_motivo (motivo, monto, cantidad,
+        porcentaje_monto), por_asesor (asesor x motivo, monto) y tendencia
+        (mes, motivo, monto, cantidad)
+    """
+    if len(proyectos_data) > 0 and 'motivo_perdida_cat' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+
+    if len(proyectos_data) > 0 and 'status_norm' in proyectos_data.columns:
+        mascara = proyectos_data['status_norm'] == 'PERDIDO'
+        if fecha_inicio is not None and fecha_fin is not None:
+            mascara &= (
+                (proyectos_data['fecha_venta'] >= pd.Timestamp(fecha_inicio)) &
+                (proyectos_data['fecha_venta'] <= pd.Timestamp(fecha_fin))
+            )
+        perdidos = proyectos_data[mascara]
+    else:
+        perdidos = proyectos_data.iloc[0:0]
+
+    n = len(perdidos)
+    if n > 0:
+        motivos = perdidos['motivo_perdida_cat'].cat.codes.to_numpy() if 'motivo_perdida_cat' in perdidos.columns \
+            else np.full(n, CATEGORIAS_MOTIVO.index(SIN_MOTIVO))
+        asesores = pd.Categorical(perdidos['asesor_norm'])
+        fechas = perdidos['fecha_venta'].to_numpy(dtype='datetime64[M]')
+        meses = np.where(np.isnat(fechas), -1, fechas.astype(np.int64))
+        montos = pd.to_numeric(perdidos['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        cubo = pd.DataFrame({
+            'motivo': motivos, 'asesor': asesores.codes, 'mes': meses, 'monto': montos
+        }).groupby(['motivo', 'asesor', 'mes'], sort=False)['monto'].agg(monto='sum', cantidad='size').reset_index()
+
+        cubo['motivo'] = pd.Categorical.from_codes(cubo['motivo'], categories=CATEGORIAS_MOTIVO)
+        cubo['asesor'] = asesores.categories.to_numpy()[cubo['asesor'].to_numpy()]
+    else:
+        cubo = pd.DataFrame({
+            'motivo': pd.Categorical([], categories=CATEGORIAS_MOTIVO),
+            'asesor': pd.Series(dtype=object),
+            'mes': pd.Series(dtype=np.int64),
+            'monto': pd.Series(dtype=float),
+            'cantidad': pd.Series(dtype=np.int64),
+        })
+
+    monto_perdido = float(cubo['monto'].sum())
+
+    por_motivo = cubo.groupby('motivo', observed=False)[['monto', 'cantidad']].sum().reset_index()
+    por_motivo['porcentaje_monto'] = por_motivo['monto'] / monto_perdido * 100 if monto_perdido > 0 else 0.0
+
+    por_asesor = cubo.pivot_table(
+        index='asesor', columns='motivo', values='monto', aggfunc='sum', fill_value=0, observed=False
+    )
+    por_asesor['TOTAL'] = por_asesor.sum(axis=1)
+    por_asesor = por_asesor.sort_values('TOTAL', ascending=False).reset_index()
+    por_asesor.columns = [str(columna) for columna in por_asesor.columns]
+
+    tendencia = cubo[cubo['mes'] >= 0].groupby(['mes', 'motivo'], observed=True)[['monto', 'cantidad']].sum().reset_index()
+    tendencia['mes'] = tendencia['mes'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+
+    return {
+        'monto_perdido': monto_perdido,
+        'num_perdidos': int(cubo['cantidad'].sum()),
+        'por_motivo': por_motivo,
+        'por_asesor': por_asesor,
+        'tendencia': tendencia.sort_values('mes'),
+    }
@@ -0,0 +1,126 @@
+"""
+Registro perezoso de métricas con dependencias
+"""
+import inspect
+
+
+class MetricRegistry:
+    """
+    Registro de métricas nombradas que se calculan solo cuando se piden
+
+    Cada métrica declara sus dependencias con los nombres de sus parámetros;
+    al pedirla se resuelven primero esas dependencias (valores registrados u
+    otras métricas) y el resultado se memoiza, de modo que una sección que no
+    se muestra nunca paga el cálculo y dos secciones que piden la misma
+    métrica la calculan una sola vez.
+
+    Ejemplo:
+        registro = MetricRegistry()
+        registro.valor('proyectos_filtrados', proyectos_filtrados)
+
+        @registro.metrica('metricas_estado')
+        def _(calculator, proyectos_filtrados):
+            return calculator.metricas_proyectos_por_estado(proyectos_filtrados)
+
+        registro.obtener('metricas_estado')
+    """
+
+    def __init__(self):
+        """Inicializa el registro vacío"""
+        self._definiciones = {}
+        self._resultados = {}
+        self._en_calculo = set()
+
+    def valor(self, nombre, valor):
+        """
+        Registra un valor ya calculado (entradas como filtros o DataFrames)
+
+        Args:
+            nombre: Nombre con el que las métricas lo piden
+            valor: Valor a registrar
+        """
+        self._definiciones.pop(nombre, None)
+        self.invalidar(nombre)
+        self._resultados[nombre] = valor
+
+    def registrar(self, nombre, funcion, depende_de=None):
+        """
+        Registra una métrica perezosa
+
+        Args:
+            nombre: Nombre de la métrica
+            funcion: Función que calcula la métrica
+            depende_de: Nombres de las dependencias, en el orden de los
+                parámetros de la función (por defecto, los nombres de sus parámetros)
+        """
+        if depende_de is None:
+            depende_de = list(inspect.signature(funcion).parameters)
+        self.invalidar(nombre)
+        self._definiciones[nombre] = (funcion, list(depende_de))
+
+    def metrica(self, nombre, depende_de=None):
+        """
+        Decorador equivalente a ``registrar``
+
+        Args:
+            nombre: Nombre de la métrica
+            depende_de: Nombres de las dependencias (opcional)
+        """
+        def decorador(funcion):
+            self.registrar(nombre, funcion, depende_de)
+            return funcion
+        return decorador
+
+    def obtener(self, nombre):
+        """
+        Devuelve una métrica, calculándola (junto con sus dependencias) si hace falta
+
+        Args:
+            nombre: Nombre de la métrica o valor
+
+        Returns:
+            Resultado de la métrica
+        """
+        if nombre in self._resultados:
+            return self._resultados[nombre]
+
+        if nombre not in self._definiciones:
+            raise KeyError(f"Métrica no registrada: {nombre}")
+        if nombre in self._en_calculo:
+            raise ValueError(f"Dependencia circular al calcular la métrica: {nombre}")
+
+        funcion, dependencias = self._definiciones[nombre]
+        self._en_calculo.add(nombre)
+        try:
+            argumentos = [self.obtener(dependencia) for dependencia in dependencias]
+            resultado = funcion(*argumentos)
+        finally:
+            self._en_calculo.discard(nombre)
+
+        self._resultados[nombre] = resultado
+        return resultado
+
+    def __getitem__(self, nombre):
+        """Atajo para ``obtener``"""
+        return self.obtener(nombre)
+
+    def calculadas(self):
+        """
+        Devuelve los nombres de las métricas ya calculadas
+
+        Returns:
+            list: Nombres de las métricas con resultado memoizado
+        """
+        return [nombre for nombre in self._resultados if nombre in self._definiciones]
+
+    def invalidar(self, nombre):
+        """
+        Descarta el resultado de una métrica y de todas las que dependen de ella
+
+        Args:
+            nombre: Nombre de la métrica o valor que cambió
+        """
+        self._resultados.pop(nombre, None)
+        for dependiente, (_, dependencias) in self._definiciones.items():
+            if nombre in dependencias and dependiente in self._resultados:
+                self.invalidar(dependiente)
@@ -5,6 +5,8 @@ ASESORES = [
     "MAURICIO GUTIÉRREZ PÉREZ PALMA",
 ]
 
+MOTIVOS_PERDIDA = ["PRECIO", "STOCK/INVENTARIO", "OTRO"]
+
 giros_negocio = [
     "AEROLINEAS",
     "AGROINDUSTRIAL",
@@ -0,0 +1,250 @@
+"""
+Agregados por periodo para comparar KPIs contra el periodo anterior y el año anterior
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from .derived_columns import normalizar_asesor, preparar_citas, preparar_proyectos, semana_iso_ordinal
+
+
+# Series diarias que se acumulan por asesor
+SERIES_DIARIAS = ['ventas', 'citas', 'prospectos']
+
+
+def _dias(fechas):
+    """Convierte una serie de fechas a días desde 1970-01-01, junto con la máscara de fechas válidas"""
+    fechas = pd.Series(fechas)
+    validas = fechas.notna().to_numpy()
+    dias = fechas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    return dias, validas
+
+
+def _dia(fecha):
+    """Convierte una fecha suelta a días desde 1970-01-01"""
+    return int(np.datetime64(pd.Timestamp(fecha).date(), 'D').astype(np.int64))
+
+
+def _mes(fecha):
+    """Ordinal de mes (año * 12 + mes - 1)"""
+    fecha = pd.Timestamp(fecha)
+    return fecha.year * 12 + fecha.month - 1
+
+
+def _acumular(codigos, posiciones, valores, filas, columnas):
+    """Matriz filas × (columnas + 1) de sumas acumuladas por fila (la columna 0 queda en cero)"""
+    matriz = np.zeros((filas, columnas + 1))
+    np.add.at(matriz, (codigos, posiciones + 1), valores)
+    return np.cumsum(matriz, axis=1)
+
+
+def periodos_comparables(fecha_inicio, fecha_fin):
+    """
+    Calcula el periodo anterior y el mismo periodo del año anterior
+
+    Si el rango cubre meses completos (del día 1 al último día del mes), el
+    periodo anterior son los mismos meses inmediatamente previos (MoM, QoQ);
+    si no, es la ventana de la misma duración que termina un día antes.
+
+    Args:
+        fecha_inicio: Fecha de inicio del periodo
+        fecha_fin: Fecha de fin del periodo
+
+    Returns:
+        dict: {'actual': (inicio, fin), 'anterior': (inicio, fin), 'ano_anterior': (inicio, fin)}
+    """
+    inicio = pd.Timestamp(fecha_inicio).normalize()
+    fin = pd.Timestamp(fecha_fin).normalize()
+
+    if inicio.day == 1 and fin.is_month_end:
+        meses = (fin.year - inicio.year) * 12 + fin.month - inicio.month + 1
+        anterior = (inicio - pd.DateOffset(months=meses), inicio - pd.Timedelta(days=1))
+    else:
+        duracion = fin - inicio
+        anterior = (inicio - duracion - pd.Timedelta(days=1), inicio - pd.Timedelta(days=1))
+
+    ano_anterior = (inicio - pd.DateOffset(years=1), fin - pd.DateOffset(years=1))
+
+    return {'actual': (inicio, fin), 'anterior': anterior, 'ano_anterior': ano_anterior}
+
+
+class PeriodAggregates:
+    """
+    Agregado compartido por asesor y día para consultar KPIs de cualquier periodo
+
+    Se construye una vez por versión de datos: cada serie queda como una
+    matriz asesor × día observado de sumas acumuladas, de modo que el total de
+    cualquier rango es una resta de dos columnas. Solo hay columna para los
+    días (y meses de meta) que aparecen en los datos, así que una fecha
+    errónea lejana no agranda la matriz. Comparar contra otros periodos no
+    vuelve a filtrar ni agrupar los DataFrames.
+
+    Los KPIs son los de las tarjetas de MetricsCalculator que dependen del
+    rango de fechas, con la misma definición: ventas (GANADO/VENDIDO por
+    fecha_venta) y meta de metricas_ventas_cotizaciones, citas y prospectos
+    por su fecha (como DashboardFilters) y el promedio de citas por semana
+    ISO de metricas_citas_semanales. Cotizaciones, proyectos, ticket promedio
+    y cartera se calculan sobre todos los proyectos del asesor, sin rango de
+    fechas, así que no tienen periodo con el cual compararse.
+    """
+
+    def __init__(self, citas_data, prospeccion_data, proyectos_data, metas_data):
+        """
+        Construye los acumulados por día y por mes
+
+        Args:
+            citas_data: DataFrame de citas
+            prospeccion_data: DataFrame de prospección
+            proyectos_data: DataFrame de proyectos
+            metas_data: DataFrame de metas
+        """
+        if len(citas_data) > 0 and 'semana_iso' not in citas_data.columns:
+            citas_data = preparar_citas(citas_data)
+        if len(proyectos_data) > 0 and 'es_venta' not in proyectos_data.columns:
+            proyectos_data = preparar_proyectos(proyectos_data)
+
+        eventos = {}
+
+        if len(proyectos_data) > 0 and 'asesor_norm' in proyectos_data.columns:
+            total = pd.to_numeric(proyectos_data['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+            asesores = proyectos_data['asesor_norm'].to_numpy()
+            es_venta = proyectos_data['es_venta'].to_numpy(dtype=bool) if 'es_venta' in proyectos_data.columns \
+                else np.zeros(len(proyectos_data), dtype=bool)
+
+            dias_venta, validas_venta = _dias(proyectos_data['fecha_venta'])
+            validas_venta = validas_venta & es_venta
+            eventos['ventas'] = (asesores[validas_venta], dias_venta[validas_venta], total[validas_venta])
+
+        if len(citas_data) > 0 and 'fecha_dt' in citas_data.columns:
+            dias_citas, validas_citas = _dias(citas_data['fecha_dt'])
+            asesores_citas = citas_data['asesor_norm'].to_numpy()
+            eventos['citas'] = (asesores_citas[validas_citas], dias_citas[validas_citas], 1.0)
+
+        if len(prospeccion_data) > 0 and 'fecha' in prospeccion_data.columns:
+            dias_prosp, validas_prosp = _dias(pd.to_datetime(prospeccion_data['fecha'], errors='coerce'))
+            asesores_prosp = normalizar_asesor(prospeccion_data['asesor']).to_numpy()
+            eventos['prospectos'] = (asesores_prosp[validas_prosp], dias_prosp[validas_prosp], 1.0)
+
+        # Catálogo común de asesores para todas las series
+        todos = [asesores for asesores, _, _ in eventos.values()]
+        if len(metas_data) > 0:
+            todos.append(normalizar_asesor(metas_data['asesor']).to_numpy())
+        self.asesores = pd.Index(pd.unique(np.concatenate(todos))) if todos else pd.Index([], dtype=object)
+
+        # Columnas: solo los días con algún evento
+        todos_dias = [dias for _, dias, _ in eventos.values()]
+        self.dias = np.unique(np.concatenate(todos_dias)) if todos_dias else np.zeros(0, dtype=np.int64)
+
+        self._acumulados = {}
+        for serie in SERIES_DIARIAS:
+            if serie in eventos:
+                asesores, dias, valores = eventos[serie]
+                codigos = self.asesores.get_indexer(asesores)
+                posiciones = np.searchsorted(self.dias, dias)
+            else:
+                codigos = posiciones = np.zeros(0, dtype=np.int64)
+                valores = 0.0
+            self._acumulados[serie] = _acumular(codigos, posiciones, valores, len(self.asesores), len(self.dias))
+
+        # Metas por mes con meta, también acumuladas
+        if len(metas_data) > 0:
+            meses = metas_data['ano'].astype(int).to_numpy() * 12 + metas_data['mes'].astype(int).to_numpy() - 1
+            self.meses = np.unique(meses)
+            codigos = self.asesores.get_indexer(normalizar_asesor(metas_data['asesor']))
+            metas = pd.to_numeric(metas_data['meta'], errors='coerce').fillna(0).to_numpy(dtype=float)
+            self._metas_acumuladas = _acumular(
+                codigos, np.searchsorted(self.meses, meses), metas, len(self.asesores), len(self.meses)
+            )
+        else:
+            self.meses = np.zeros(0, dtype=np.int64)
+            self._metas_acumuladas = np.zeros((len(self.asesores), 1))
+
+    def _filas(self, asesor_seleccionado):
+        """Filas de la matriz que corresponden al asesor seleccionado (o a todos)"""
+        if asesor_seleccionado and asesor_seleccionado != "Todos":
+            return self.asesores == asesor_seleccionado.strip().upper()
+        return slice(None)
+
+    @staticmethod
+    def _suma_rango(acumulados, filas, llaves, inicio, fin):
+        """Suma de las columnas cuya llave (día o mes observado) cae en [inicio, fin] para las filas dadas"""
+        desde = int(np.searchsorted(llaves, inicio, side='left'))
+        hasta = int(np.searchsorted(llaves, fin, side='right'))
+        if hasta <= desde:
+            return 0.0
+        return float((acumulados[filas, hasta] - acumulados[filas, desde]).sum())
+
+    def totales(self, fecha_inicio, fecha_fin, asesor_seleccionado="Todos"):
+        """
+        Calcula los KPIs de un periodo
+
+        Args:
+            fecha_inicio: Fecha de inicio del periodo
+            fecha_fin: Fecha de fin del periodo
+            asesor_seleccionado: Asesor o "Todos"
+
+        Returns:
+            dict: ventas, meta, total_citas, total_prospectos y citas_semanales
+            del periodo
+        """
+        filas = self._filas(asesor_seleccionado)
+        dia_inicio, dia_fin = _dia(fecha_inicio), _dia(fecha_fin)
+
+        resultado = {
+            serie: self._suma_rango(self._acumulados[serie], filas, self.dias, dia_inicio, dia_fin)
+            for serie in SERIES_DIARIAS
+        }
+        meta = self._suma_rango(self._metas_acumuladas, filas, self.meses, _mes(fecha_inicio), _mes(fecha_fin))
+
+        # Semanas ISO que toca el rango, contando las que no tienen citas
+        semana_inicio, semana_fin = semana_iso_ordinal(pd.Series(pd.to_datetime([fecha_inicio, fecha_fin])))
+        semanas = max(int(semana_fin) - int(semana_inicio) + 1, 0)
+        return {
+            'ventas': resultado['ventas'],
+            'meta': meta,
+            'total_citas': int(resultado['citas']),
+            'total_prospectos': int(resultado['prospectos']),
+            'citas_semanales': resultado['citas'] / semanas if semanas > 0 else 0,
+        }
+
+    def comparar(self, fecha_inicio=None, fecha_fin=None, asesor_seleccionado="Todos"):
+        """
+        Compara los KPIs del periodo contra el periodo anterior y el año anterior
+
+        Sin rango de fechas se compara el mes en curso hasta hoy.
+
+        Args:
+            fecha_inicio: Fecha de inicio del periodo (opcional)
+            fecha_fin: Fecha de fin del periodo (opcional)
+            asesor_seleccionado: Asesor o "Todos"
+
+        Returns:
+            dict: {kpi: {'actual', 'anterior', 'ano_anterior', 'delta_anterior',
+            'delta_ano_anterior'}} más 'periodos' con los rangos usados; los
+            deltas son porcentajes (None si el valor de referencia es cero)
+        """
+        if fecha_inicio is None or fecha_fin is None:
+            hoy = pd.Timestamp(datetime.now()).normalize()
+            fecha_inicio, fecha_fin = hoy.replace(day=1), hoy
+
+        periodos = periodos_comparables(fecha_inicio, fecha_fin)
+        valores = {
+            nombre: self.totales(inicio, fin, asesor_seleccionado)
+            for nombre, (inicio, fin) in periodos.items()
+        }
+
+        def delta(actual, referencia):
+            return (actual - referencia) / abs(referencia) * 100 if referencia else None
+
+        comparativo = {'periodos': periodos}
+        for kpi, actual in valores['actual'].items():
+            anterior = valores['anterior'][kpi]
+            ano_anterior = valores['ano_anterior'][kpi]
+            comparativo[kpi] = {
+                'actual': actual,
+                'anterior': anterior,
+                'ano_anterior': ano_anterior,
+                'delta_anterior': delta(actual, anterior),
+                'delta_ano_anterior': delta(actual, ano_anterior),
+            }
+        return comparativo
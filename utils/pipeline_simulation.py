@@ -0,0 +1,115 @@
+"""
+Simulación Monte Carlo del pipeline EN PROCESO contra la meta del trimestre
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from .derived_columns import preparar_proyectos
+from .sales_forecast import tasas_cierre, pronostico_ventas
+
+
+# Ensayos (simulaciones x cotizaciones) por bloque: mantiene la matriz en caché y acota la memoria
+BLOQUE_ENSAYOS = 2_000_000
+
+
+def simular_totales(montos, probabilidades, simulaciones=10_000, semilla=0):
+    """
+    Simula el monto ganado de un conjunto de cotizaciones abiertas
+
+    Cada simulación es una fila de ensayos de Bernoulli (uno por cotización):
+    se sortean enteros de 16 bits contra el umbral ``probabilidad * 2**16`` y
+    el total de la fila es el producto de la matriz de ganados por los montos.
+    Las cotizaciones con probabilidad 0 o 1 no se sortean: nunca o siempre
+    suman su monto. Los totales se acumulan en float64 y las simulaciones se
+    generan por bloques para acotar la memoria.
+
+    Args:
+        montos: Monto de cada cotización abierta
+        probabilidades: Probabilidad de cierre de cada cotización
+        simulaciones: Número de simulaciones
+        semilla: Semilla del generador (resultados reproducibles)
+
+    Returns:
+        np.ndarray: Monto ganado en cada simulación
+    """
+    montos = np.asarray(montos, dtype=float)
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    seguras = probabilidades >= 1
+    totales = np.full(simulaciones, montos[seguras].sum())
+    inciertas = (probabilidades > 0) & ~seguras
+    montos, probabilidades = montos[inciertas], probabilidades[inciertas]
+    if len(montos) == 0:
+        return totales
+
+    rng = np.random.default_rng(semilla)
+    umbrales = np.clip(np.rint(probabilidades * 65536), 0, 65535).astype(np.uint16)
+    filas_bloque = max(1, BLOQUE_ENSAYOS // len(montos))
+    for inicio in range(0, simulaciones, filas_bloque):
+        fin = min(inicio + filas_bloque, simulaciones)
+        sorteos = rng.integers(0, 65536, size=(fin - inicio, len(montos)), dtype=np.uint16)
+        ganados = (sorteos < umbrales).astype(float)
+        totales[inicio:fin] += ganados @ montos
+    return totales
+
+
+def simular_trimestre(proyectos_data, metas_data, todos_asesores, asesor_seleccionado="Todos",
+                      simulaciones=10_000, semilla=0, hoy=None):
+    """
+    Estima la probabilidad de alcanzar la meta del trimestre en curso
+
+    Supone que cada cotización EN PROCESO se cierra dentro del trimestre con
+    la tasa histórica de cierre de su asesor (ver ``tasas_cierre``) y suma
+    el resultado a lo ya vendido en el trimestre.
+
+    Args:
+        proyectos_data: DataFrame de proyectos
+        metas_data: DataFrame de metas
+        todos_asesores: Lista de todos los asesores
+        asesor_seleccionado: Asesor o "Todos"
+        simulaciones: Número de simulaciones (10k–100k)
+        semilla: Semilla del generador
+        hoy: Fecha de corte (por defecto, hoy)
+
+    Returns:
+        dict: totales (monto del trimestre por simulación), ventas_trimestre,
+        meta_trimestre, probabilidad_meta (%), percentiles p10/p50/p90,
+        cotizaciones_abiertas y monto_abierto
+    """
+    hoy = pd.Timestamp(hoy if hoy is not None else datetime.now()).normalize()
+    if len(proyectos_data) > 0 and 'es_venta' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+
+    asesores = todos_asesores
+    if asesor_seleccionado and asesor_seleccionado != "Todos":
+        asesores = [asesor_seleccionado]
+    pronostico = pronostico_ventas(proyectos_data, metas_data, asesores, hoy)
+    ventas_trimestre = float(pronostico['ventas_trimestre'].sum())
+    meta_trimestre = float(pronostico['meta_trimestre'].sum())
+
+    if len(proyectos_data) > 0 and 'status_norm' in proyectos_data.columns:
+        abiertos = proyectos_data[
+            (proyectos_data['status_norm'] == 'EN PROCESO') &
+            proyectos_data['asesor_norm'].isin(pronostico.index)
+        ]
+        montos = pd.to_numeric(abiertos['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        tasas, tasa_global = tasas_cierre(proyectos_data)
+        probabilidades = tasas.reindex(abiertos['asesor_norm']).fillna(tasa_global).to_numpy(dtype=float)
+    else:
+        montos = np.zeros(0)
+        probabilidades = np.zeros(0)
+
+    totales = ventas_trimestre + simular_totales(montos, probabilidades, simulaciones, semilla)
+    p10, p50, p90 = np.percentile(totales, [10, 50, 90])
+
+    return {
+        'totales': totales,
+        'ventas_trimestre': ventas_trimestre,
+        'meta_trimestre': meta_trimestre,
+        'probabilidad_meta': float((totales >= meta_trimestre).mean() * 100) if meta_trimestre > 0 else None,
+        'p10': float(p10),
+        'p50': float(p50),
+        'p90': float(p90),
+        'cotizaciones_abiertas': int(len(montos)),
+        'monto_abierto': float(montos.sum()),
+    }
@@ -0,0 +1,74 @@
+"""
+Ciclo de venta: días de cotización a facturación
+"""
+import numpy as np
+import pandas as pd
+
+from .derived_columns import preparar_proyectos
+
+
+PERCENTILES_CICLO = {'p50': 0.5, 'p90': 0.9}
+
+
+def _resumen_por(ciclos, columna):
+    """Número de ventas, promedio y percentiles del ciclo agrupados por una columna"""
+    if len(ciclos) == 0:
+        return pd.DataFrame(columns=[columna, 'ventas', 'promedio', *PERCENTILES_CICLO])
+    agrupado = ciclos.groupby(columna, sort=True)['dias_ciclo']
+    resumen = agrupado.agg(ventas='size', promedio='mean')
+    percentiles = agrupado.quantile(list(PERCENTILES_CICLO.values())).unstack()
+    percentiles.columns = list(PERCENTILES_CICLO)
+    return resumen.join(percentiles).reset_index()
+
+
+def metricas_ciclo_venta(proyectos_data, fecha_inicio=None, fecha_fin=None):
+    """
+    Calcula la distribución del ciclo de venta de los proyectos ganados
+
+    Usa la columna derivada ``dias_ciclo`` (ver preparar_proyectos), de modo
+    que las fechas se parsean una sola vez al cargar los datos.
+
+    Args:
+        proyectos_data: DataFrame de proyectos (con o sin columnas derivadas)
+        fecha_inicio: Inicio del rango de cotización (opcional)
+        fecha_fin: Fin del rango de cotización (opcional)
+
+    Returns:
+        dict: dias (np.ndarray para el histograma), ventas, promedio, p50,
+        p90, por_asesor y por_cohorte (DataFrames con ventas, promedio, p50 y p90)
+    """
+    if len(proyectos_data) > 0 and 'dias_ciclo' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+
+    if len(proyectos_data) == 0 or 'dias_ciclo' not in proyectos_data.columns:
+        ciclos = pd.DataFrame({
+            'asesor': pd.Series(dtype=object),
+            'cohorte': pd.Series(dtype='datetime64[ns]'),
+            'dias_ciclo': pd.Series(dtype=float)
+        })
+    else:
+        mascara = proyectos_data['es_venta'] & proyectos_data['dias_ciclo'].notna()
+        if fecha_inicio is not None and fecha_fin is not None:
+            mascara &= (
+                (proyectos_data['cohorte'] >= pd.Timestamp(fecha_inicio).replace(day=1)) &
+                (proyectos_data['cohorte'] <= pd.Timestamp(fecha_fin))
+            )
+        ciclos = proyectos_data.loc[mascara, ['asesor_norm', 'cohorte', 'dias_ciclo']] \
+            .rename(columns={'asesor_norm': 'asesor'})
+
+    dias = ciclos['dias_ciclo'].to_numpy(dtype=float)
+    if len(dias) > 0:
+        p50, p90 = np.percentile(dias, [50, 90])
+        promedio = float(dias.mean())
+    else:
+        p50 = p90 = promedio = 0.0
+
+    return {
+        'dias': dias,
+        'ventas': int(len(dias)),
+        'promedio': promedio,
+        'p50': float(p50),
+        'p90': float(p90),
+        'por_asesor': _resumen_por(ciclos, 'asesor'),
+        'por_cohorte': _resumen_por(ciclos, 'cohorte'),
+    }
@@ -0,0 +1,229 @@
+"""
+Proyección de ventas al cierre de mes y de trimestre
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from .derived_columns import normalizar_asesor, preparar_proyectos
+from .sales_cycle import metricas_ciclo_venta
+
+
+def tasas_cierre(proyectos_data):
+    """
+    Calcula la tasa histórica de cierre (ganados / (ganados + perdidos)) por asesor
+
+    Los asesores sin proyectos cerrados toman la tasa global.
+
+    Args:
+        proyectos_data: DataFrame de proyectos con columnas derivadas
+
+    Returns:
+        tuple: (pd.Series de tasas indexada por asesor normalizado, tasa global)
+    """
+    if len(proyectos_data) == 0 or 'status_norm' not in proyectos_data.columns:
+        return pd.Series(dtype=float), 0.0
+
+    ganados = proyectos_data['es_venta'].to_numpy(dtype=np.int64)
+    perdidos = (proyectos_data['status_norm'] == 'PERDIDO').to_numpy(dtype=np.int64)
+    conteos = pd.DataFrame(
+        {'ganados': ganados, 'cerrados': ganados + perdidos},
+        index=proyectos_data['asesor_norm'].to_numpy()
+    ).groupby(level=0).sum()
+
+    total_cerrados = conteos['cerrados'].sum()
+    tasa_global = conteos['ganados'].sum() / total_cerrados if total_cerrados > 0 else 0.0
+
+    tasas = (conteos['ganados'] / conteos['cerrados'].where(conteos['cerrados'] > 0)).fillna(tasa_global)
+    return tasas, float(tasa_global)
+
+
+def _periodo_actual(hoy):
+    """Inicio y fin (como datetime64[D]) del mes y del trimestre que contienen a hoy"""
+    hoy = pd.Timestamp(hoy).normalize()
+    inicio_mes = hoy.replace(day=1)
+    fin_mes = inicio_mes + pd.offsets.MonthEnd(0)
+    mes_inicio_trimestre = 3 * ((hoy.month - 1) // 3) + 1
+    inicio_trimestre = hoy.replace(month=mes_inicio_trimestre, day=1)
+    fin_trimestre = inicio_trimestre + pd.offsets.MonthEnd(3)
+    return {
+        'mes': (np.datetime64(inicio_mes.date()), np.datetime64(fin_mes.date())),
+        'trimestre': (np.datetime64(inicio_trimestre.date()), np.datetime64(fin_trimestre.date())),
+    }
+
+
+def pronostico_ventas(proyectos_data, metas_data, asesores, hoy=None):
+    """
+    Proyecta las ventas al cierre del mes y del trimestre de todos los asesores a la vez
+
+    La proyección por ritmo extiende las ventas del periodo con su promedio
+    por día hábil transcurrido (``np.busday_count``) a los días hábiles que
+    faltan. El pipeline ponderado es el monto EN PROCESO de cada asesor por
+    su tasa histórica de cierre; cada periodo cuenta solo las cotizaciones
+    cuyo cierre esperado (fecha de cotización más el p50 del ciclo de
+    venta, ver ``metricas_ciclo_venta``) cae antes de su fin. Las vencidas
+    o sin fecha se esperan de inmediato. La proyección combinada suma a las
+    ventas el mayor de los dos estimados de lo que falta por vender (ritmo
+    o pipeline ponderado del periodo): sumar ambos contaría dos veces los
+    cierres que el ritmo ya anticipa.
+
+    Args:
+        proyectos_data: DataFrame de proyectos
+        metas_data: DataFrame de metas
+        asesores: Lista de asesores a incluir
+        hoy: Fecha de corte (por defecto, hoy)
+
+    Returns:
+        pd.DataFrame: Una fila por asesor (índice normalizado) con, para
+        ``mes`` y ``trimestre``: ventas, meta, run rate diario, proyección
+        por ritmo, pipeline ponderado que cierra en el periodo, proyección
+        con pipeline y proyección combinada; además pipeline_proceso,
+        tasa_cierre, pipeline_ponderado (todo el EN PROCESO) y los días
+        hábiles transcurridos/restantes y el ciclo p50 en ``attrs``
+    """
+    hoy = pd.Timestamp(hoy if hoy is not None else datetime.now()).normalize()
+    manana = np.datetime64((hoy + pd.Timedelta(days=1)).date())
+    periodos = _periodo_actual(hoy)
+
+    indice = pd.Index(pd.unique(normalizar_asesor(pd.Series(list(asesores), dtype=object))), name='asesor')
+    pronostico = pd.DataFrame(index=indice)
+
+    if len(proyectos_data) > 0 and 'es_venta' not in proyectos_data.columns:
+        proyectos_data = preparar_proyectos(proyectos_data)
+    hay_proyectos = len(proyectos_data) > 0 and 'es_venta' in proyectos_data.columns
+
+    if hay_proyectos:
+        total = pd.to_numeric(proyectos_data['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        codigos = indice.get_indexer(proyectos_data['asesor_norm'])
+        en_indice = codigos >= 0
+        es_venta = proyectos_data['es_venta'].to_numpy(dtype=bool) & en_indice
+        fecha_venta = proyectos_data['fecha_venta'].to_numpy(dtype='datetime64[D]')
+
+    if len(metas_data) > 0:
+        meses_meta = metas_data['ano'].astype(int).to_numpy() * 12 + metas_data['mes'].astype(int).to_numpy() - 1
+        codigos_meta = indice.get_indexer(normalizar_asesor(metas_data['asesor']))
+        valores_meta = pd.to_numeric(metas_data['meta'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    dias = {}
+    for periodo, (inicio, fin) in periodos.items():
+        transcurridos = int(np.busday_count(inicio, manana))
+        restantes = int(np.busday_count(manana, fin + 1)) if manana <= fin else 0
+        dias[periodo] = (transcurridos, restantes)
+
+        if hay_proyectos:
+            # NaT compara como False, así que las fechas nulas quedan fuera
+            en_periodo = es_venta & (fecha_venta >= inicio) & (fecha_venta < manana)
+            ventas = np.bincount(codigos[en_periodo], weights=total[en_periodo], minlength=len(indice))
+        else:
+            ventas = np.zeros(len(indice))
+
+        if len(metas_data) > 0:
+            inicio_ts, fin_ts = pd.Timestamp(inicio), pd.Timestamp(fin)
+            en_rango = (
+                (meses_meta >= inicio_ts.year * 12 + inicio_ts.month - 1) &
+                (meses_meta <= fin_ts.year * 12 + fin_ts.month - 1) &
+                (codigos_meta >= 0)
+            )
+            meta = np.bincount(codigos_meta[en_rango], weights=valores_meta[en_rango], minlength=len(indice))
+        else:
+            meta = np.zeros(len(indice))
+
+        run_rate = ventas / transcurridos if transcurridos > 0 else np.zeros(len(indice))
+        pronostico[f'ventas_{periodo}'] = ventas
+        pronostico[f'meta_{periodo}'] = meta
+        pronostico[f'run_rate_{periodo}'] = run_rate
+        pronostico[f'proyeccion_{periodo}'] = ventas + run_rate * restantes
+
+    # Pipeline EN PROCESO ponderado por la tasa de cierre de cada asesor
+    ciclo_p50 = 0.0
+    if hay_proyectos:
+        en_proceso = (proyectos_data['status_norm'] == 'EN PROCESO').to_numpy() & en_indice
+        pipeline = np.bincount(codigos[en_proceso], weights=total[en_proceso], minlength=len(indice))
+        tasas, tasa_global = tasas_cierre(proyectos_data)
+        tasa = tasas.reindex(indice).fillna(tasa_global).to_numpy(dtype=float)
+
+        # Cierre esperado: cotización + p50 del ciclo; las vencidas o sin fecha, mañana
+        ciclo_p50 = metricas_ciclo_venta(proyectos_data)['p50']
+        cotizacion = pd.to_datetime(proyectos_data['fecha_cotizacion'], errors='coerce') \
+            if 'fecha_cotizacion' in proyectos_data.columns else pd.Series(pd.NaT, index=proyectos_data.index)
+        cierre_esperado = (cotizacion + pd.Timedelta(days=round(ciclo_p50))).to_numpy(dtype='datetime64[D]')
+        cierre_esperado = np.where(np.isnat(cierre_esperado), manana, np.maximum(cierre_esperado, manana))
+    else:
+        pipeline = np.zeros(len(indice))
+        tasa = np.zeros(len(indice))
+
+    pronostico['pipeline_proceso'] = pipeline
+    pronostico['tasa_cierre'] = tasa
+    pronostico['pipeline_ponderado'] = pipeline * tasa
+    for periodo, (_, restantes) in dias.items():
+        if hay_proyectos:
+            cierra = en_proceso & (cierre_esperado <= periodos[periodo][1])
+            ponderado = np.bincount(codigos[cierra], weights=total[cierra], minlength=len(indice)) * tasa
+        else:
+            ponderado = np.zeros(len(indice))
+        por_ritmo = pronostico[f'run_rate_{periodo}'] * restantes
+        ventas = pronostico[f'ventas_{periodo}']
+        pronostico[f'pipeline_ponderado_{periodo}'] = ponderado
+        pronostico[f'proyeccion_pipeline_{periodo}'] = ventas + ponderado
+        pronostico[f'proyeccion_combinada_{periodo}'] = ventas + np.maximum(por_ritmo, ponderado)
+    pronostico.attrs['dias_habiles'] = dias
+    pronostico.attrs['ciclo_p50'] = ciclo_p50
+    pronostico.attrs['fecha_corte'] = hoy
+    return pronostico
+
+
+def resumen_pronostico(pronostico, asesor_seleccionado="Todos"):
+    """
+    Resume el pronóstico de un asesor o de todo el equipo
+
+    Args:
+        pronostico: DataFrame devuelto por ``pronostico_ventas``
+        asesor_seleccionado: Asesor o "Todos"
+
+    Returns:
+        dict: Para ``mes`` y ``trimestre``: ventas, meta, run_rate, proyeccion
+        (por ritmo), pipeline_ponderado (lo que se espera cierre en el
+        periodo), proyeccion_pipeline, proyeccion_combinada,
+        porcentaje_proyeccion (de la combinada), dias_transcurridos,
+        dias_restantes, delta y color; además pipeline_ponderado (todo el
+        EN PROCESO) y ciclo_p50
+    """
+    if asesor_seleccionado and asesor_seleccionado != "Todos":
+        filas = pronostico.loc[pronostico.index == asesor_seleccionado.strip().upper()]
+    else:
+        filas = pronostico
+    totales = filas.sum(numeric_only=True)
+
+    resumen = {
+        'pipeline_ponderado': float(totales.get('pipeline_ponderado', 0.0)),
+        'ciclo_p50': float(pronostico.attrs.get('ciclo_p50', 0.0)),
+    }
+    for periodo, (transcurridos, restantes) in pronostico.attrs.get('dias_habiles', {}).items():
+        meta = float(totales.get(f'meta_{periodo}', 0.0))
+        proyeccion = float(totales.get(f'proyeccion_{periodo}', 0.0))
+        combinada = float(totales.get(f'proyeccion_combinada_{periodo}', proyeccion))
+
+        if meta > 0:
+            porcentaje = combinada / meta * 100
+            delta = f"{porcentaje:.1f}% de la meta proyectado"
+            color = "normal" if porcentaje >= 100 else "inverse"
+        else:
+            porcentaje = 0
+            delta = "Sin meta definida"
+            color = "off"
+
+        resumen[periodo] = {
+            'ventas': float(totales.get(f'ventas_{periodo}', 0.0)),
+            'meta': meta,
+            'run_rate': float(totales.get(f'run_rate_{periodo}', 0.0)),
+            'proyeccion': proyeccion,
+            'pipeline_ponderado': float(totales.get(f'pipeline_ponderado_{periodo}', 0.0)),
+            'proyeccion_pipeline': float(totales.get(f'proyeccion_pipeline_{periodo}', 0.0)),
+            'proyeccion_combinada': combinada,
+            'porcentaje_proyeccion': porcentaje,
+            'dias_transcurridos': transcurridos,
+            'dias_restantes': restantes,
+            'delta': delta,
+            'color': color,
+        }
+    return resumen
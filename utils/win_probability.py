@@ -0,0 +1,272 @@
+"""
+Modelo de probabilidad de cierre para cotizaciones EN PROCESO
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from .derived_columns import preparar_proyectos
+
+
+# Antigüedades (días) a las que se observa cada cotización cerrada al entrenar
+HITOS_ANTIGUEDAD = [0, 7, 15, 30, 45, 60, 90, 120, 180, 270, 365]
+
+
+def _normalizar(serie):
+    """Normaliza texto libre (clientes) para agrupar"""
+    return serie.fillna('').astype(str).str.strip().str.upper()
+
+
+def fecha_decision(proyectos_data):
+    """
+    Fecha en que se decidió cada proyecto cerrado
+
+    GANADO/VENDIDO usa la fecha de facturación y PERDIDO la última
+    modificación (``updated_at``, que se actualiza al cambiar el status).
+    Un ganado sin facturación también cae en ``updated_at``.
+
+    Args:
+        proyectos_data: DataFrame de proyectos con columnas derivadas
+
+    Returns:
+        pd.Series: Fecha de decisión (NaT para abiertos o sin fecha)
+    """
+    vacia = pd.Series(pd.NaT, index=proyectos_data.index, dtype='datetime64[ns]')
+    if 'status_norm' not in proyectos_data.columns:
+        return vacia
+    facturacion = pd.to_datetime(proyectos_data['fecha_facturacion'], errors='coerce') \
+        if 'fecha_facturacion' in proyectos_data.columns else vacia
+    modificacion = pd.to_datetime(proyectos_data['updated_at'], errors='coerce') \
+        if 'updated_at' in proyectos_data.columns else vacia
+    if getattr(modificacion.dt, 'tz', None) is not None:
+        modificacion = modificacion.dt.tz_localize(None)
+    modificacion = modificacion.dt.normalize()
+    ganado = proyectos_data['es_venta']
+    perdido = proyectos_data['status_norm'] == 'PERDIDO'
+    return facturacion.where(ganado).fillna(modificacion.where(ganado | perdido))
+
+
+class WinProbabilityModel:
+    """
+    Regresión logística (NumPy) entrenada con el historial GANADO/PERDIDO
+
+    Variables: asesor (one-hot), log del total, historial del cliente
+    (tasa de cierre suavizada hacia la global y número de cotizaciones
+    cerradas) y log de la antigüedad de la cotización. ``motivo_perdida``
+    solo existe en proyectos perdidos, así que no puede usarse para
+    puntuar cotizaciones abiertas.
+
+    La antigüedad de un abierto es su edad a la fecha de corte. Un cerrado
+    se mide hasta su fecha de decisión (ver ``fecha_decision``) y entra al
+    entrenamiento una vez por cada hito de ``HITOS_ANTIGUEDAD`` en que seguía
+    abierto, con peso 1/hitos: el modelo estima la probabilidad de ganar
+    dado que la cotización sigue abierta a esa edad. Si los perdidos no
+    tienen fecha de decisión, la variable no se usa (solo los ganados la
+    tendrían y delataría la etiqueta). El script
+    ``evaluar_probabilidad_cierre.py`` compara el modelo con y sin ella.
+
+    Ejemplo:
+        modelo = WinProbabilityModel().entrenar(proyectos)
+        probabilidades = modelo.puntuar(proyectos_en_proceso)
+    """
+
+    def __init__(self, regularizacion=1.0, suavizado_cliente=5.0, iteraciones=25, antiguedad=True):
+        """
+        Inicializa el modelo sin entrenar
+
+        Args:
+            regularizacion: Penalización L2 de los coeficientes
+            suavizado_cliente: Peso (en cotizaciones) de la tasa global al
+                estimar la tasa de cierre de cada cliente
+            iteraciones: Máximo de iteraciones de Newton
+            antiguedad: Si se usa la antigüedad como variable
+        """
+        self.regularizacion = regularizacion
+        self.suavizado_cliente = suavizado_cliente
+        self.iteraciones = iteraciones
+        self.antiguedad = antiguedad
+        self.antiguedad_mediana = 0.0
+        self.asesores = []
+        self.tasa_clientes = {}
+        self.cerrados_clientes = {}
+        self.tasa_global = 0.0
+        self.media = None
+        self.escala = None
+        self.coeficientes = None
+
+    @staticmethod
+    def _preparar(proyectos_data):
+        """Agrega columnas derivadas si faltan"""
+        if len(proyectos_data) > 0 and 'status_norm' not in proyectos_data.columns:
+            return preparar_proyectos(proyectos_data)
+        return proyectos_data
+
+    def _antiguedad(self, proyectos_data, fecha_corte):
+        """Días desde la cotización hasta la decisión (cerrados) o la fecha de corte (abiertos)"""
+        if not self.antiguedad or 'fecha_cotizacion' not in proyectos_data.columns:
+            return np.zeros(len(proyectos_data))
+        inicio = pd.to_datetime(proyectos_data['fecha_cotizacion'], errors='coerce')
+        abierto = ~(proyectos_data['es_venta'] | (proyectos_data['status_norm'] == 'PERDIDO'))
+        fin = fecha_decision(proyectos_data).mask(abierto, fecha_corte)
+        dias = np.clip((fin - inicio).dt.days.to_numpy(dtype=float), 0, None)
+        # Sin fechas se usa la mediana del entrenamiento, igual para ganados y perdidos
+        return np.nan_to_num(dias, nan=self.antiguedad_mediana)
+
+    def _matriz(self, proyectos_data, fecha_corte):
+        """Construye la matriz de variables (sin estandarizar) de los proyectos"""
+        n = len(proyectos_data)
+        asesores = proyectos_data['asesor_norm'].to_numpy() if n > 0 else np.array([], dtype=object)
+        one_hot = (asesores[:, None] == np.array(self.asesores, dtype=object)[None, :]).astype(float)
+
+        total = pd.to_numeric(proyectos_data['total'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        if 'cliente' in proyectos_data.columns:
+            clientes = _normalizar(proyectos_data['cliente'])
+            tasa_cliente = clientes.map(self.tasa_clientes).fillna(self.tasa_global)
+            cerrados_cliente = clientes.map(self.cerrados_clientes).fillna(0)
+        else:
+            tasa_cliente = pd.Series(self.tasa_global, index=proyectos_data.index)
+            cerrados_cliente = pd.Series(0, index=proyectos_data.index)
+
+        numericas = np.column_stack([
+            np.log1p(np.clip(total, 0, None)),
+            tasa_cliente.to_numpy(dtype=float),
+            np.log1p(cerrados_cliente.to_numpy(dtype=float)),
+            np.log1p(self._antiguedad(proyectos_data, fecha_corte)),
+        ])
+        return np.hstack([one_hot, numericas]) if n > 0 else np.zeros((0, one_hot.shape[1] + 4))
+
+    def entrenar(self, proyectos_data, fecha_corte=None):
+        """
+        Entrena el modelo con los proyectos GANADO/PERDIDO
+
+        Args:
+            proyectos_data: DataFrame de proyectos
+            fecha_corte: Fecha de corte del historial: se excluyen los
+                cerrados decididos después (por defecto, hoy)
+
+        Returns:
+            WinProbabilityModel: El propio modelo, entrenado
+        """
+        fecha_corte = pd.Timestamp(fecha_corte if fecha_corte is not None else datetime.now()).normalize()
+        proyectos_data = self._preparar(proyectos_data)
+        if len(proyectos_data) == 0 or 'status_norm' not in proyectos_data.columns:
+            return self
+
+        decision = fecha_decision(proyectos_data)
+        es_cerrado = (proyectos_data['es_venta'] | (proyectos_data['status_norm'] == 'PERDIDO')) & ~(decision > fecha_corte)
+        cerrados = proyectos_data[es_cerrado]
+        decision = decision[es_cerrado]
+        if len(cerrados) == 0:
+            return self
+        y = cerrados['es_venta'].to_numpy(dtype=float)
+
+        self.asesores = sorted(cerrados['asesor_norm'].unique())
+        self.tasa_global = float(y.mean())
+
+        # Si los perdidos no tienen fecha de decisión, la antigüedad solo variaría en los ganados
+        perdidos = ~cerrados['es_venta']
+        if self.antiguedad and perdidos.any() and decision[perdidos].isna().all():
+            self.antiguedad = False
+        if self.antiguedad:
+            self.antiguedad_mediana = np.nan
+            dias = self._antiguedad(cerrados, fecha_corte)
+            self.antiguedad_mediana = float(np.median(dias[~np.isnan(dias)])) if (~np.isnan(dias)).any() else 0.0
+
+        # Historial por cliente: tasa suavizada hacia la global y número de cerrados
+        if 'cliente' in cerrados.columns:
+            por_cliente = pd.DataFrame({
+                'cliente': _normalizar(cerrados['cliente']).to_numpy(), 'ganado': y
+            }).groupby('cliente')['ganado'].agg(['sum', 'count'])
+            tasa = (por_cliente['sum'] + self.suavizado_cliente * self.tasa_global) / \
+                   (por_cliente['count'] + self.suavizado_cliente)
+            self.tasa_clientes = tasa.to_dict()
+            self.cerrados_clientes = por_cliente['count'].to_dict()
+
+        X = self._matriz(cerrados, fecha_corte)
+        if 'cliente' in cerrados.columns:
+            # Al entrenar, el historial del cliente excluye la propia fila (evita fuga de la etiqueta)
+            clientes = _normalizar(cerrados['cliente']).to_numpy()
+            suma = por_cliente['sum'].reindex(clientes).to_numpy() - y
+            cuenta = por_cliente['count'].reindex(clientes).to_numpy() - 1
+            columna = len(self.asesores) + 1
+            X[:, columna] = (suma + self.suavizado_cliente * self.tasa_global) / (cuenta + self.suavizado_cliente)
+            X[:, columna + 1] = np.log1p(cuenta)
+
+        # Cada cerrado entra una vez por hito en que seguía abierto, con la
+        # antigüedad del hito: así se aprende P(ganar | sigue abierto a esa
+        # edad), que es lo que se pregunta al puntuar una cotización abierta
+        pesos = np.ones(len(y))
+        if self.antiguedad:
+            hitos = np.array(HITOS_ANTIGUEDAD, dtype=float)
+            abierto = hitos[None, :] <= np.expm1(X[:, -1])[:, None]
+            abierto[:, 0] = True
+            fila, hito = np.nonzero(abierto)
+            X = X[fila]
+            X[:, -1] = np.log1p(hitos[hito])
+            y = y[fila]
+            pesos = 1.0 / abierto.sum(axis=1)[fila]
+
+        self.media = X.mean(axis=0)
+        self.escala = X.std(axis=0)
+        self.escala[self.escala == 0] = 1.0
+        X = np.hstack([np.ones((len(X), 1)), (X - self.media) / self.escala])
+
+        # Newton-Raphson (IRLS) con penalización L2 fuera del intercepto
+        w = np.zeros(X.shape[1])
+        penalizacion = np.full(X.shape[1], self.regularizacion)
+        penalizacion[0] = 0.0
+        for _ in range(self.iteraciones):
+            p = 1.0 / (1.0 + np.exp(-X @ w))
+            gradiente = X.T @ (pesos * (p - y)) + penalizacion * w
+            hessiano = (X * (pesos * p * (1 - p))[:, None]).T @ X + np.diag(penalizacion) + 1e-9 * np.eye(len(w))
+            paso = np.linalg.solve(hessiano, gradiente)
+            w -= paso
+            if np.abs(paso).max() < 1e-6:
+                break
+        self.coeficientes = w
+        return self
+
+    def puntuar(self, proyectos_data, fecha_corte=None):
+        """
+        Calcula la probabilidad de cierre de cada proyecto en un solo lote
+
+        Args:
+            proyectos_data: DataFrame de proyectos a puntuar
+            fecha_corte: Fecha a la que se mide la antigüedad de los abiertos (por defecto, hoy)
+
+        Returns:
+            pd.Series: Probabilidad (0–1) por fila, con el índice de proyectos_data
+        """
+        if self.coeficientes is None:
+            return pd.Series(self.tasa_global, index=proyectos_data.index, dtype=float)
+
+        fecha_corte = pd.Timestamp(fecha_corte if fecha_corte is not None else datetime.now()).normalize()
+        proyectos_data = self._preparar(proyectos_data)
+        if len(proyectos_data) == 0:
+            return pd.Series(dtype=float, index=proyectos_data.index)
+
+        X = (self._matriz(proyectos_data, fecha_corte) - self.media) / self.escala
+        z = self.coeficientes[0] + X @ self.coeficientes[1:]
+        return pd.Series(1.0 / (1.0 + np.exp(-z)), index=proyectos_data.index)
+
+
+def probabilidad_cierre_abiertos(proyectos_data, fecha_corte=None):
+    """
+    Entrena con el historial y puntúa todas las cotizaciones EN PROCESO
+
+    Args:
+        proyectos_data: DataFrame de proyectos
+        fecha_corte: Fecha de referencia (por defecto, hoy)
+
+    Returns:
+        pd.Series: Probabilidad de cierre de las filas EN PROCESO (índice de proyectos_data)
+    """
+    proyectos_data = WinProbabilityModel._preparar(proyectos_data)
+    if len(proyectos_data) == 0 or 'status_norm' not in proyectos_data.columns:
+        return pd.Series(dtype=float)
+
+    modelo = WinProbabilityModel().entrenar(proyectos_data, fecha_corte)
+    abiertos = proyectos_data[proyectos_data['status_norm'] == 'EN PROCESO']
+    return modelo.puntuar(abiertos, fecha_corte)
+